@@ -0,0 +1,12 @@
+# coding=utf-8
+from .bitbucket import AsyncBitbucket
+from .confluence import AsyncConfluence
+from .jira import AsyncJira
+from .rest_client import AsyncAtlassianRestAPI
+
+__all__ = [
+    "AsyncAtlassianRestAPI",
+    "AsyncJira",
+    "AsyncConfluence",
+    "AsyncBitbucket",
+]
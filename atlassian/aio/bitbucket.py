@@ -0,0 +1,142 @@
+# coding=utf-8
+import logging
+
+from .rest_client import AsyncAtlassianRestAPI
+
+log = logging.getLogger(__name__)
+
+
+class AsyncBitbucket(AsyncAtlassianRestAPI):
+    """
+    Asyncio client for the Bitbucket REST API (Server and Cloud).
+    Covers the hot paths of ``atlassian.Bitbucket``, everything else is reachable
+    through the generic get/post/put/delete coroutines.
+    """
+
+    def __init__(self, url, *args, **kwargs):
+        if "cloud" not in kwargs and ("bitbucket.org" in url):
+            kwargs["cloud"] = True
+        if "api_version" not in kwargs:
+            kwargs["api_version"] = "2.0" if "cloud" in kwargs and kwargs["cloud"] else "1.0"
+        if "cloud" in kwargs:
+            kwargs["api_root"] = "" if "api.bitbucket.org" in url else "rest/api"
+
+        super(AsyncBitbucket, self).__init__(url, *args, **kwargs)
+
+    async def _get_paged(
+        self,
+        url,
+        params=None,
+        data=None,
+        flags=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Used to get the paged data
+
+        :param url: string:                        The url to retrieve
+        :param params: dict (default is None):     The parameter's
+        :param data: dict (default is None):       The data
+        :param flags: string[] (default is None):  The flags
+        :param trailing: bool (default is None):   If True, a trailing slash is added to the url
+        :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
+
+        :return: An async iterator for the data elements
+        """
+
+        if params is None:
+            params = {}
+
+        while True:
+            response = await self.get(
+                url,
+                trailing=trailing,
+                params=params,
+                data=data,
+                flags=flags,
+                absolute=absolute,
+            )
+            if "values" not in response:
+                return
+
+            for value in response.get("values", []):
+                yield value
+
+            if self.cloud:
+                url = response.get("next")
+                if url is None:
+                    break
+                # From now on we have absolute URLs with parameters
+                absolute = True
+                # Params are now provided by the url
+                params = {}
+                # Trailing should not be added as it is already part of the url
+                trailing = False
+            else:
+                if response.get("nextPageStart") is None:
+                    break
+                params["start"] = response.get("nextPageStart")
+
+    def _url_projects(self, api_root=None, api_version=None):
+        return self.resource_url("projects", api_root, api_version)
+
+    def _url_project(self, project_key, api_root=None, api_version=None):
+        return f"{self._url_projects(api_root, api_version)}/{project_key}"
+
+    def _url_repos(self, project_key, api_root=None, api_version=None):
+        return f"{self._url_project(project_key, api_root, api_version)}/repos"
+
+    def _url_repo(self, project_key, repo, api_root=None, api_version=None):
+        return f"{self._url_repos(project_key, api_root, api_version)}/{repo}"
+
+    def project_list(self, start=0, limit=None):
+        """
+        Provide the project list
+
+        :return: An async iterator for the projects
+        """
+        url = self._url_projects()
+        params = {}
+        if start:
+            params["start"] = start
+        if limit:
+            params["limit"] = limit
+        return self._get_paged(url, params=params)
+
+    async def project(self, key):
+        """
+        Provide project info
+        :param key: The project key
+        :return:
+        """
+        url = self._url_project(key)
+        return await self.get(url) or {}
+
+    def repo_list(self, project_key, start=0, limit=25):
+        """
+        Get repositories list from project
+
+        :param project_key: The project key
+        :param start:
+        :param limit:
+        :return: An async iterator for the repositories
+        """
+        url = self._url_repos(project_key)
+        params = {}
+        if start:
+            params["start"] = start
+        if limit:
+            params["limit"] = limit
+        return self._get_paged(url, params=params)
+
+    async def get_repo(self, project_key, repository_slug):
+        """
+        Get a specific repository from a project. This operates based on slug not name which may
+        be confusing to some users.
+        :param project_key: Key of the project you wish to look in.
+        :param repository_slug: url-compatible repository identifier
+        :return: Dictionary of request response
+        """
+        url = self._url_repo(project_key, repository_slug)
+        return await self.get(url)
@@ -0,0 +1,176 @@
+# coding=utf-8
+import logging
+
+from requests import HTTPError
+
+from ..confluence import Confluence
+from ..errors import ApiError, ApiValueError
+from .rest_client import AsyncAtlassianRestAPI
+
+log = logging.getLogger(__name__)
+
+
+class AsyncConfluence(AsyncAtlassianRestAPI):
+    """
+    Asyncio client for the Confluence REST API.
+    Covers the hot paths of ``atlassian.Confluence``, everything else is reachable
+    through the generic get/post/put/delete coroutines.
+    """
+
+    content_types = Confluence.content_types
+    raise_for_status = Confluence.raise_for_status
+
+    def __init__(self, url, *args, **kwargs):
+        if ("atlassian.net" in url or "jira.com" in url) and ("/wiki" not in url):
+            url = AsyncAtlassianRestAPI.url_joiner(url, "/wiki")
+            if "cloud" not in kwargs:
+                kwargs["cloud"] = True
+        super(AsyncConfluence, self).__init__(url, *args, **kwargs)
+
+    async def _get_paged(
+        self,
+        url,
+        params=None,
+        data=None,
+        flags=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Used to get the paged data
+
+        :param url: string:                        The url to retrieve
+        :param params: dict (default is None):     The parameter's
+        :param data: dict (default is None):       The data
+        :param flags: string[] (default is None):  The flags
+        :param trailing: bool (default is None):   If True, a trailing slash is added to the url
+        :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
+
+        :return: An async iterator for the data elements
+        """
+
+        if params is None:
+            params = {}
+
+        while True:
+            response = await self.get(
+                url,
+                trailing=trailing,
+                params=params,
+                data=data,
+                flags=flags,
+                absolute=absolute,
+            )
+            if "results" not in response:
+                return
+
+            for value in response.get("results", []):
+                yield value
+
+            url = response.get("_links", {}).get("next")
+            if url is None:
+                break
+            # From now on we have relative URLs with parameters
+            absolute = False
+            # Params are now provided by the url
+            params = {}
+            # Trailing should not be added as it is already part of the url
+            trailing = False
+
+    async def get_page_by_id(self, page_id, expand=None, status=None, version=None):
+        """
+        Returns a piece of Content.
+        :param page_id: Content ID
+        :param status: (str) list of Content statuses to filter results on. Default value: [current]
+        :param version: (int)
+        :param expand: OPTIONAL: Default value: history,space,version
+        :return:
+        """
+        params = {}
+        if expand:
+            params["expand"] = expand
+        if status:
+            params["status"] = status
+        if version:
+            params["version"] = version
+        url = f"rest/api/content/{page_id}"
+
+        try:
+            response = await self.get(url, params=params)
+        except HTTPError as e:
+            if e.response.status_code == 404:
+                # Raise ApiError as the documented reason is ambiguous
+                raise ApiError(
+                    "There is no content with the given id, "
+                    "or the calling user does not have permission to view the content",
+                    reason=e,
+                )
+
+            raise
+
+        return response
+
+    def get_page_child_by_type(self, page_id, type="page", start=None, limit=None, expand=None):
+        """
+        Provide content by type (page, blog, comment) as an async iterator over all pages of results
+        :param page_id: A string containing the id of the type content container.
+        :param type:
+        :param start: OPTIONAL: The start point of the collection to return. Default: None (0).
+        :param limit: OPTIONAL: The page size of each request. Default: Site limit 200.
+        :param expand: OPTIONAL: expand e.g. history
+        :return: An async iterator for the child content
+        """
+        params = {}
+        if start is not None:
+            params["start"] = int(start)
+        if limit is not None:
+            params["limit"] = int(limit)
+        if expand is not None:
+            params["expand"] = expand
+
+        url = f"rest/api/content/{page_id}/child/{type}"
+        return self._get_paged(url, params=params)
+
+    async def cql(
+        self,
+        cql,
+        start=0,
+        limit=None,
+        expand=None,
+        include_archived_spaces=None,
+        excerpt=None,
+    ):
+        """
+        Get results from cql search result with all related fields
+        :param cql:
+        :param start: OPTIONAL: The start point of the collection to return. Default: 0.
+        :param limit: OPTIONAL: The limit of the number of issues to return, this may be restricted by
+                        fixed system limits. Default by built-in method: 25
+        :param excerpt: the excerpt strategy to apply to the result, one of : indexed, highlight, none.
+        :param expand: OPTIONAL: the properties to expand on the search result
+        :param include_archived_spaces: OPTIONAL: whether to include content in archived spaces in the result
+        :return:
+        """
+        params = {}
+        if start is not None:
+            params["start"] = int(start)
+        if limit is not None:
+            params["limit"] = int(limit)
+        if cql is not None:
+            params["cql"] = cql
+        if expand is not None:
+            params["expand"] = expand
+        if include_archived_spaces is not None:
+            params["includeArchivedSpaces"] = include_archived_spaces
+        if excerpt is not None:
+            params["excerpt"] = excerpt
+
+        try:
+            response = await self.get("rest/api/search", params=params)
+        except HTTPError as e:
+            if e.response.status_code == 400:
+                raise ApiValueError("The query cannot be parsed", reason=e)
+
+            raise
+
+        return response
@@ -0,0 +1,212 @@
+# coding=utf-8
+import logging
+
+from .rest_client import AsyncAtlassianRestAPI
+
+log = logging.getLogger(__name__)
+
+
+class AsyncJira(AsyncAtlassianRestAPI):
+    """
+    Asyncio client for the Jira REST API.
+    Covers the hot paths of ``atlassian.Jira``, everything else is reachable
+    through the generic get/post/put/delete coroutines.
+    Reference: https://docs.atlassian.com/software/jira/docs/api/REST/8.5.0/#api/2
+    """
+
+    def __init__(self, url, *args, **kwargs):
+        if "api_version" not in kwargs:
+            kwargs["api_version"] = "2"
+
+        super(AsyncJira, self).__init__(url, *args, **kwargs)
+
+    async def _get_paged(
+        self,
+        url,
+        params=None,
+        data=None,
+        flags=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Used to get the paged data
+
+        :param url: string:                        The url to retrieve
+        :param params: dict (default is None):     The parameter's
+        :param data: dict (default is None):       The data
+        :param flags: string[] (default is None):  The flags
+        :param trailing: bool (default is None):   If True, a trailing slash is added to the url
+        :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
+
+        :return: An async iterator for the data elements
+        """
+
+        if not self.cloud:
+            raise ValueError("``_get_paged`` method is only available for Jira Cloud platform")
+
+        if params is None:
+            params = {}
+
+        while True:
+            response = await self.get(
+                url,
+                trailing=trailing,
+                params=params,
+                data=data,
+                flags=flags,
+                absolute=absolute,
+            )
+            values = response.get("values", [])
+            for value in values:
+                yield value
+
+            if response.get("isLast", False) or len(values) == 0:
+                break
+
+            url = response.get("nextPage")
+            if url is None:
+                break
+            # From now on we have absolute URLs with parameters
+            absolute = True
+            # Params are now provided by the url
+            params = {}
+            # Trailing should not be added as it is already part of the url
+            trailing = False
+
+    async def get_issue(self, issue_id_or_key, fields=None, properties=None, update_history=True, expand=None):
+        """
+        Returns a full representation of the issue for the given issue key
+        By default, all fields are returned in this get-issue resource
+
+        :param issue_id_or_key: str
+        :param fields: str
+        :param properties: str
+        :param update_history: bool
+        :param expand: str
+        :return: issue
+        """
+        base_url = self.resource_url("issue")
+        url = f"{base_url}/{issue_id_or_key}"
+        params = {}
+
+        if fields is not None:
+            if isinstance(fields, (list, tuple, set)):
+                fields = ",".join(fields)
+            params["fields"] = fields
+        if properties is not None:
+            params["properties"] = properties
+        if expand:
+            params["expand"] = expand
+        params["updateHistory"] = str(update_history).lower()
+        return await self.get(url, params=params)
+
+    async def create_issue(self, fields, update_history=False, update=None):
+        """
+        Creates an issue or a sub-task from a JSON representation
+        :param fields: JSON data
+                mandatory keys are issuetype, summary and project
+        :param update: JSON data
+                Use it to link issues or update worklog
+        :param update_history: bool (if true then the user's project history is updated)
+        :return:
+        """
+        url = self.resource_url("issue")
+        data = {"fields": fields}
+        if update:
+            data["update"] = update
+        params = {"updateHistory": "true" if update_history is True else "false"}
+        return await self.post(url, params=params, data=data)
+
+    async def update_issue_field(self, key, fields="*all", notify_users=True):
+        """
+        Update an issue's fields.
+        :param key: str Issue id or issue key
+        :param fields: dict with target fields as keys and new contents as values
+        :param notify_users: bool OPTIONAL if True, use project's default notification scheme to notify users via email.
+        """
+        base_url = self.resource_url("issue")
+        params = {"notifyUsers": "true" if notify_users else "false"}
+        return await self.put(
+            f"{base_url}/{key}",
+            data={"fields": fields},
+            params=params,
+        )
+
+    async def jql(
+        self,
+        jql,
+        fields="*all",
+        start=0,
+        limit=None,
+        expand=None,
+        validate_query=None,
+    ):
+        """
+        Get issues from jql search result with all related fields
+        :param jql:
+        :param fields: list of fields, for example: ['priority', 'summary', 'customfield_10007']
+        :param start: OPTIONAL: The start point of the collection to return. Default: 0.
+        :param limit: OPTIONAL: The limit of the number of issues to return, this may be restricted by
+                fixed system limits. Default by built-in method: 50
+        :param expand: OPTIONAL: expand the search result
+        :param validate_query: OPTIONAL: Whether to validate the JQL query
+        :return:
+        """
+        if self.cloud:
+            if start == 0:
+                return await self.enhanced_jql(jql=jql, fields=fields, limit=limit, expand=expand)
+            raise ValueError("The `jql` method is deprecated in Jira Cloud. Use `enhanced_jql` method instead.")
+        params = {}
+        if start is not None:
+            params["startAt"] = int(start)
+        if limit is not None:
+            params["maxResults"] = int(limit)
+        if fields is not None:
+            if isinstance(fields, (list, tuple, set)):
+                fields = ",".join(fields)
+            params["fields"] = fields
+        if jql is not None:
+            params["jql"] = jql
+        if expand is not None:
+            params["expand"] = expand
+        if validate_query is not None:
+            params["validateQuery"] = validate_query
+        url = self.resource_url("search")
+        return await self.get(url, params=params)
+
+    async def enhanced_jql(
+        self,
+        jql,
+        fields="*all",
+        nextPageToken=None,
+        limit=None,
+        expand=None,
+    ):
+        """
+        Get issues from jql search result with all related fields
+        :param jql:
+        :param fields: list of fields, for example: ['priority', 'summary', 'customfield_10007']
+        :param nextPageToken (Optional[str]): Token for paginated results. Default: None.
+        :param limit: OPTIONAL: The limit of the number of issues to return, this may be restricted by
+                fixed system limits. Default by built-in method: 50
+        :param expand: OPTIONAL: expand the search result
+        :return:
+        """
+        if not self.cloud:
+            raise ValueError("``enhanced_jql`` method is only available for Jira Cloud platform")
+        params = {}
+        if nextPageToken is not None:
+            params["nextPageToken"] = str(nextPageToken)
+        if limit is not None:
+            params["maxResults"] = int(limit)
+        if fields is not None:
+            if isinstance(fields, (list, tuple, set)):
+                fields = ",".join(fields)
+            params["fields"] = fields
+        if jql is not None:
+            params["jql"] = jql
+        if expand is not None:
+            params["expand"] = expand
+        url = self.resource_url("search/jql")
+        return await self.get(url, params=params)
@@ -0,0 +1,529 @@
+# coding=utf-8
+import asyncio
+import logging
+
+from requests import ConnectionError, HTTPError, Timeout
+
+from ..json_codec import default_json_codec
+from ..request_utils import CurlRequestFormatter
+from ..rest_client import AtlassianRestAPI
+from ..retry import BackPressure
+
+log = logging.getLogger(__name__)
+
+
+class AsyncAtlassianRestAPI(AtlassianRestAPI):
+    """
+    Asyncio flavour of AtlassianRestAPI.
+
+    The request, get, post, put, patch and delete methods keep the contract of the
+    synchronous client but are coroutines and use an ``httpx.AsyncClient`` as transport,
+    so a single event loop can keep many requests in flight.
+    Install the transport with ``pip install atlassian-python-api[async]``.
+
+    The helpers of the synchronous client which run requests on threads (prefetching,
+    concurrent paging) are not available, gather the coroutines instead.
+    """
+
+    def __init__(
+        self,
+        url,
+        username=None,
+        password=None,
+        timeout=75,
+        api_root="rest/api",
+        api_version="latest",
+        verify_ssl=True,
+        session=None,
+        oauth=None,
+        oauth2=None,
+        cookies=None,
+        advanced_mode=None,
+        kerberos=None,
+        cloud=False,
+        proxies=None,
+        token=None,
+        cert=None,
+        backoff_and_retry=False,
+        retry_status_codes=[413, 429, 503],
+        max_backoff_seconds=1800,
+        max_backoff_retries=1000,
+        backoff_factor=1.0,
+        backoff_jitter=1.0,
+        retry_with_header=True,
+        request_formatter=None,
+        retry_scheduler=None,
+        rate_limiter=None,
+        transport=None,
+        json_codec=None,
+        prefetch_pages=None,
+        max_workers=None,
+    ):
+        """
+        init function for the AsyncAtlassianRestAPI object.
+        The parameters are the same as for AtlassianRestAPI, except:
+
+        :param session: Pass an existing ``httpx.AsyncClient``. Defaults to None.
+        :param oauth: Not supported by the async transport.
+        :param oauth2: Not supported by the async transport.
+        :param kerberos: Not supported by the async transport.
+        :param request_formatter: Formatter for the DEBUG logs of requests and responses. Defaults to curl.
+        :param retry_scheduler: atlassian.retry.RetryScheduler, the waits are done with asyncio.sleep.
+        :param rate_limiter: atlassian.rate_limit.RateLimiter, the waits are done with asyncio.sleep.
+        :param transport: atlassian.transport.TransportConfig, sets the connection limits and HTTP/2
+                of the ``httpx.AsyncClient`` created by the client.
+        :param json_codec: atlassian.json_codec.JsonCodec for the request and response bodies.
+        :param prefetch_pages: Not supported, the async client doesn't use threads.
+        :param max_workers: Not supported, the async client doesn't use threads.
+        """
+        if prefetch_pages or max_workers is not None:
+            raise ValueError("prefetch_pages and max_workers are not supported by the async client")
+        self.url = url
+        self.username = username
+        self.password = password
+        self.timeout = int(timeout)
+        self.verify_ssl = verify_ssl
+        self.api_root = api_root
+        self.api_version = api_version
+        self.cookies = cookies
+        self.advanced_mode = advanced_mode
+        self.cloud = cloud
+        self.proxies = proxies
+        self.cert = cert
+        self.backoff_and_retry = backoff_and_retry
+        self.max_backoff_retries = max_backoff_retries
+        self.retry_status_codes = retry_status_codes
+        self.max_backoff_seconds = max_backoff_seconds
+        # There is no urllib3 in the async transport, retries are always done by us
+        self.use_urllib3_retry = False
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.retry_with_header = retry_with_header
+        self.prefetch_pages = 0
+        self.max_workers = None
+        self.request_formatter = request_formatter or CurlRequestFormatter()
+        self.transport = transport
+        if session is None:
+            self._session = self._create_async_session()
+        else:
+            self._session = session
+
+        self.retry_scheduler = retry_scheduler or self._create_retry_scheduler()
+        self.retry_scheduler.share_back_pressure(BackPressure.for_session(self._session))
+        self.rate_limiter = rate_limiter
+        # The conditional request cache works on requests responses only
+        self.response_cache = None
+        self.json_codec = json_codec or default_json_codec()
+
+        if oauth is not None or oauth2 is not None or kerberos is not None:
+            raise ValueError("OAuth and Kerberos authentication are not supported by the async client")
+        if username and password:
+            self._create_basic_session(username, password)
+        elif token is not None:
+            self._create_token_session(token)
+        elif cookies is not None:
+            self._session.cookies.update(cookies)
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with the async client")
+
+    def __exit__(self, *_):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    def _create_async_session(self):
+        import httpx
+
+        kwargs = self.transport.async_client_kwargs() if self.transport is not None else {}
+        # Redirects are followed like with requests, e.g. to the login of an SSO or to attachment downloads
+        kwargs.setdefault("follow_redirects", True)
+        mounts = None
+        if self.proxies:
+            mounts = {}
+            transport_kwargs = {key: value for key, value in kwargs.items() if key in ("limits", "http2")}
+            for scheme, proxy in self.proxies.items():
+                pattern = scheme if "://" in scheme else f"{scheme}://"
+                mounts[pattern] = httpx.AsyncHTTPTransport(
+                    proxy=proxy, verify=self.verify_ssl, cert=self.cert, **transport_kwargs
+                )
+        return httpx.AsyncClient(verify=self.verify_ssl, cert=self.cert, timeout=self.timeout, mounts=mounts, **kwargs)
+
+    async def _send(self, request, stream=False):
+        """
+        Send a request, the transport errors of httpx are raised as the ones of requests.
+        """
+        import httpx
+
+        try:
+            return await self._session.send(request, stream=stream, follow_redirects=True)
+        except httpx.TimeoutException as e:
+            raise Timeout(str(e) or repr(e), request=request) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e) or repr(e), request=request) from e
+
+    def _raise_for_status(self, response):
+        """
+        Call raise_for_status for error responses (>= 400), the errors of httpx are raised as requests.HTTPError
+        like in the synchronous client. Redirects and 304 are not errors, unlike for httpx.
+        """
+        import httpx
+
+        if response.status_code < 400:
+            return
+        try:
+            self.raise_for_status(response)
+        except httpx.HTTPStatusError as e:
+            raise HTTPError(str(e), response=response) from e
+
+    def _prefetch_pages(self, pages, prefetch_pages=None):
+        raise NotImplementedError("Prefetching runs on threads, it is not supported by the async client")
+
+    def _get_paged_concurrently(self, *args, **kwargs):
+        raise NotImplementedError("Concurrent paging runs on threads, gather the requests of the async client")
+
+    async def close(self):
+        return await self._session.aclose()
+
+    async def request(
+        self,
+        method="GET",
+        path="/",
+        data=None,
+        json=None,
+        flags=None,
+        params=None,
+        headers=None,
+        files=None,
+        trailing=None,
+        absolute=False,
+        advanced_mode=False,
+        stream=False,
+    ):
+        """
+
+        :param method:
+        :param path:
+        :param data:
+        :param json:
+        :param flags:
+        :param params:
+        :param headers:
+        :param files:
+        :param trailing: bool - OPTIONAL: Add trailing slash to url
+        :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
+        :param advanced_mode: bool, OPTIONAL: Return the raw response
+        :param stream: bool, OPTIONAL: Don't download the body up front, the caller reads it
+                       with response.aiter_bytes and has to close the response
+        :return:
+        """
+        url = self._build_url(path, params=params, flags=flags, trailing=trailing, absolute=absolute)
+        body = {}
+        if files is None:
+            data = None if not data else self.json_codec.dumps(data)
+            if data is None and json is not None:
+                data = self.json_codec.dumps(json)
+            if data is not None:
+                body["content"] = data
+        else:
+            body["data"] = data
+            body["files"] = files
+
+        headers = headers or self.default_headers
+        if json is not None and "content" in body and "Content-Type" not in headers:
+            headers = dict(headers, **{"Content-Type": "application/json"})
+
+        retry = self.retry_scheduler.new_call()
+        while True:
+            delay = retry.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve(url)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._log_request(method, url, headers=headers, body=body.get("content", json))
+            request = self._session.build_request(
+                method=method,
+                url=url,
+                headers=headers,
+                timeout=self.timeout,
+                **body,
+            )
+            response = await self._send(request, stream=stream)
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(url, response)
+            if not retry.should_retry(response):
+                break
+            if stream:
+                await response.aclose()
+
+        response.encoding = "utf-8"
+
+        self._log_response(method, path, response, stream=stream)
+
+        if self.advanced_mode or advanced_mode:
+            return response
+
+        self._raise_for_status(response)
+        return response
+
+    async def get(
+        self,
+        path,
+        data=None,
+        flags=None,
+        params=None,
+        headers=None,
+        not_json_response=None,
+        trailing=None,
+        absolute=False,
+        advanced_mode=False,
+    ):
+        """
+        Async get request. See AtlassianRestAPI.get for the parameters.
+        """
+        response = await self.request(
+            "GET",
+            path=path,
+            flags=flags,
+            params=params,
+            data=data,
+            headers=headers,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=advanced_mode,
+        )
+        if self.advanced_mode or advanced_mode:
+            return response
+        if not_json_response:
+            return response.content
+        else:
+            if not response.content:
+                return None
+            try:
+                return self.json_codec.decode(response)
+            except Exception as e:
+                log.error(e)
+                return response.text
+
+    async def iter_content(
+        self,
+        path,
+        params=None,
+        headers=None,
+        chunk_size=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Stream the body of a GET request, without holding it in memory.
+        :param path:
+        :param params:
+        :param headers:
+        :param chunk_size: int, OPTIONAL: Size of the chunks in bytes. Default: stream_chunk_size
+        :param trailing: OPTIONAL: for wrap slash symbol in the end of string
+        :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
+        :return: An async iterator for the chunks (bytes)
+        """
+        response = await self.request(
+            "GET",
+            path=path,
+            params=params,
+            headers=headers,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=True,
+            stream=True,
+        )
+        try:
+            if response.is_error:
+                # The error message is taken from the body
+                await response.aread()
+            self._raise_for_status(response)
+            async for chunk in response.aiter_bytes(chunk_size or self.stream_chunk_size):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def download(
+        self,
+        path,
+        dest_fd,
+        params=None,
+        headers=None,
+        chunk_size=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Write the body of a GET request to a file-like object in chunks.
+        :param path:
+        :param dest_fd: a file-like object opened for binary writing
+        :param params:
+        :param headers:
+        :param chunk_size: int, OPTIONAL: Size of the chunks in bytes. Default: stream_chunk_size
+        :param trailing: OPTIONAL: for wrap slash symbol in the end of string
+        :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
+        :return: Number of bytes written
+        """
+        size = 0
+        async for chunk in self.iter_content(
+            path,
+            params=params,
+            headers=headers,
+            chunk_size=chunk_size,
+            trailing=trailing,
+            absolute=absolute,
+        ):
+            dest_fd.write(chunk)
+            size += len(chunk)
+        return size
+
+    async def _get_response_content(
+        self,
+        *args,
+        fields,
+        **kwargs,
+    ):
+        """
+        :param fields: list of tuples in the form (field_name, default value (optional)).
+            Used for chaining dictionary value accession.
+            E.g. [("field1", "default1"), ("field2", "default2"), ("field3", )]
+        """
+        response = await self.get(*args, **kwargs)
+        if "advanced_mode" in kwargs:
+            advanced_mode = kwargs["advanced_mode"]
+        else:
+            advanced_mode = self.advanced_mode
+
+        if not advanced_mode:  # dict
+            for field in fields:
+                response = response.get(*field)
+        else:  # httpx.Response
+            first_field = fields[0]
+            response = self.json_codec.decode(response).get(*first_field)
+            for field in fields[1:]:
+                response = response.get(*field)
+
+        return response
+
+    async def post(
+        self,
+        path,
+        data=None,
+        json=None,
+        headers=None,
+        files=None,
+        params=None,
+        trailing=None,
+        absolute=False,
+        advanced_mode=False,
+    ):
+        """
+        Async post request. See AtlassianRestAPI.post for the parameters.
+        """
+        response = await self.request(
+            "POST",
+            path=path,
+            data=data,
+            json=json,
+            headers=headers,
+            files=files,
+            params=params,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=advanced_mode,
+        )
+        if self.advanced_mode or advanced_mode:
+            return response
+        return self._response_handler(response)
+
+    async def put(
+        self,
+        path,
+        data=None,
+        headers=None,
+        files=None,
+        trailing=None,
+        params=None,
+        absolute=False,
+        advanced_mode=False,
+    ):
+        """
+        Async put request. See AtlassianRestAPI.put for the parameters.
+        """
+        response = await self.request(
+            "PUT",
+            path=path,
+            data=data,
+            headers=headers,
+            files=files,
+            params=params,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=advanced_mode,
+        )
+        if self.advanced_mode or advanced_mode:
+            return response
+        return self._response_handler(response)
+
+    async def patch(
+        self,
+        path,
+        data=None,
+        headers=None,
+        files=None,
+        trailing=None,
+        params=None,
+        absolute=False,
+        advanced_mode=False,
+    ):
+        """
+        Async patch request. See AtlassianRestAPI.patch for the parameters.
+        """
+        response = await self.request(
+            "PATCH",
+            path=path,
+            data=data,
+            headers=headers,
+            files=files,
+            params=params,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=advanced_mode,
+        )
+        if self.advanced_mode or advanced_mode:
+            return response
+        return self._response_handler(response)
+
+    async def delete(
+        self,
+        path,
+        data=None,
+        headers=None,
+        params=None,
+        trailing=None,
+        absolute=False,
+        advanced_mode=False,
+    ):
+        """
+        Async delete request. See AtlassianRestAPI.delete for the parameters.
+        """
+        response = await self.request(
+            "DELETE",
+            path=path,
+            data=data,
+            headers=headers,
+            params=params,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=advanced_mode,
+        )
+        if self.advanced_mode or advanced_mode:
+            return response
+        return self._response_handler(response)
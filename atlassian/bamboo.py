@@ -44,7 +44,7 @@ class Bamboo(AtlassianRestAPI):
         if self.advanced_mode:
             try:
                 response.raise_for_status()
-                response = response.json()
+                response = self.json_codec.decode(response)
             except HTTPError as e:
                 logging.error(f"Broken response: {e}")
                 yield e
@@ -3095,7 +3095,7 @@ class Bitbucket(BitbucketBase):
         format=None,
         path=None,
         prefix=None,
-        chunk_size=128,
+        chunk_size=None,
     ):
         """
         Downloads a repository archive.
@@ -3114,7 +3114,8 @@ class Bitbucket(BitbucketBase):
         :param path: string: Optional, path to include in the streamed archive
         :param prefix: string: Optional, a prefix to apply to all entries in the streamed archive;
                     if the supplied prefix does not end with a trailing /, one will be added automatically
-        :param chunk_size: int: Optional, download chunk size. Defeault is 128
+        :param chunk_size: int: Optional, download chunk size. Default is stream_chunk_size (64 KiB)
+        :return: Number of bytes written
         """
         url = f"{self._url_repo(project_key, repository_slug)}/archive"
         params = {}
@@ -3129,9 +3130,7 @@ class Bitbucket(BitbucketBase):
         if prefix is not None:
             params["prefix"] = prefix
         headers = {"Accept": "*/*"}
-        response = self.get(url, params=params, headers=headers, advanced_mode=True)
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            dest_fd.write(chunk)
+        return self.download(url, dest_fd, params=params, headers=headers, chunk_size=chunk_size)
 
     @deprecated(
         version="2.0.2",
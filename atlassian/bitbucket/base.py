@@ -1,11 +1,13 @@
 # coding=utf-8
 
 import copy
+import itertools
 import re
 import sys
 
 from datetime import datetime
 from pprint import PrettyPrinter
+from ..paging import fetch_ahead
 from ..rest_client import AtlassianRestAPI
 
 RE_TIMEZONE = re.compile(r"(\d{2}):(\d{2})$")
@@ -45,6 +47,7 @@ class BitbucketBase(AtlassianRestAPI):
         flags=None,
         trailing=None,
         absolute=False,
+        prefetch_pages=None,
     ):
         """
         Used to get the paged data
@@ -55,15 +58,19 @@ class BitbucketBase(AtlassianRestAPI):
         :param flags: string[] (default is None):  The flags
         :param trailing: bool (default is None):   If True, a trailing slash is added to the url
         :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
+        :param prefetch_pages: int (default is None): Number of pages to download ahead of the caller,
+                                                      defaults to the prefetch_pages of the client
 
         :return: A generator object for the data elements
         """
 
         if params is None:
             params = {}
+        if prefetch_pages is None:
+            prefetch_pages = self.prefetch_pages
 
-        while True:
-            response = self.get(
+        def _get(params, url=url, trailing=trailing, absolute=absolute):
+            return self.get(
                 url,
                 trailing=trailing,
                 params=params,
@@ -71,12 +78,15 @@ class BitbucketBase(AtlassianRestAPI):
                 flags=flags,
                 absolute=absolute,
             )
-            if "values" not in response:
-                return
 
-            yield from response.get("values", [])
+        def _cloud_pages(url, params, trailing, absolute):
+            while True:
+                response = _get(params, url, trailing, absolute)
+                if "values" not in response:
+                    return
+
+                yield response.get("values", [])
 
-            if self.cloud:
                 url = response.get("next")
                 if url is None:
                     break
@@ -86,11 +96,46 @@ class BitbucketBase(AtlassianRestAPI):
                 params = {}
                 # Trailing should not be added as it is already part of the url
                 trailing = False
-            else:
+
+        def _server_pages(params):
+            while True:
+                response = _get(params)
+                if "values" not in response:
+                    return
+
+                yield response.get("values", [])
+
+                if response.get("nextPageStart") is None:
+                    break
+                params["start"] = response.get("nextPageStart")
+
+                limit = response.get("limit")
+                if not prefetch_pages or not limit or params["start"] != response.get("start", 0) + limit:
+                    continue
+                # The offsets of the following pages are known, request them concurrently.
+                # The fan-out stops at the last page or when the server skips offsets.
+                for response in fetch_ahead(
+                    lambda start: _get(dict(params, start=start)),
+                    itertools.count(params["start"], limit),
+                    prefetch_pages,
+                    lambda page: "values" not in page
+                    or page.get("nextPageStart") is None
+                    or page.get("nextPageStart") != page.get("start", 0) + limit,
+                ):
+                    if "values" not in response:
+                        return
+                    yield response.get("values", [])
                 if response.get("nextPageStart") is None:
                     break
                 params["start"] = response.get("nextPageStart")
 
+        if self.cloud:
+            pages = self._prefetch_pages(_cloud_pages(url, params, trailing, absolute), prefetch_pages)
+        else:
+            pages = _server_pages(params)
+        for values in pages:
+            yield from values
+
         return
 
     @staticmethod
@@ -201,4 +246,10 @@ class BitbucketBase(AtlassianRestAPI):
             "api_root": self.api_root,
             "api_version": self.api_version,
             "timeformat_lambda": self.timeformat_lambda,
+            "prefetch_pages": self.prefetch_pages,
+            "max_workers": self.max_workers,
+            "retry_scheduler": self.retry_scheduler,
+            "rate_limiter": self.rate_limiter,
+            "response_cache": self.response_cache,
+            "json_codec": self.json_codec,
         }
@@ -1,7 +1,10 @@
 # coding=utf-8
 
+import itertools
 import logging
+
 from ..base import BitbucketBase
+from ...paging import fetch_ahead
 
 from requests import HTTPError
 
@@ -46,6 +49,7 @@ class BitbucketCloudBase(BitbucketBase):
         trailing=None,
         absolute=False,
         paging_workaround=False,
+        prefetch_pages=None,
     ):
         """
         Used to get the paged data
@@ -58,17 +62,19 @@ class BitbucketCloudBase(BitbucketBase):
         :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
         :param paging_workaround: bool (default is False): If True, the paging is done on our own because
                                                            of https://jira.atlassian.com/browse/BCLOUD-13806
+        :param prefetch_pages: int (default is None): Number of pages to download ahead of the caller,
+                                                      defaults to the prefetch_pages of the client
 
         :return: A generator object for the data elements
         """
 
         if params is None:
             params = {}
-        if paging_workaround:
-            params["page"] = 1
+        if prefetch_pages is None:
+            prefetch_pages = self.prefetch_pages
 
-        while True:
-            response = super(BitbucketCloudBase, self).get(
+        def _get(params, url=url, trailing=trailing, absolute=absolute):
+            return super(BitbucketCloudBase, self).get(
                 url,
                 trailing=trailing,
                 params=params,
@@ -76,24 +82,44 @@ class BitbucketCloudBase(BitbucketBase):
                 flags=flags,
                 absolute=absolute,
             )
-            if len(response.get("values", [])) == 0:
-                return
-
-            for value in response["values"]:
-                yield value
 
+        def _pages(url, params, trailing, absolute):
             if paging_workaround:
-                params["page"] += 1
-            else:
-                url = response.get("next")
-                if url is None:
-                    break
-                # From now on we have absolute URLs with parameters
-                absolute = True
-                # Params are now provided by the url
-                params = {}
-                # Trailing should not be added as it is already part of the url
-                trailing = False
+                params["page"] = 1
+
+            while True:
+                response = _get(params, url, trailing, absolute)
+                if len(response.get("values", [])) == 0:
+                    return
+
+                yield response["values"]
+
+                if paging_workaround:
+                    params["page"] += 1
+                else:
+                    url = response.get("next")
+                    if url is None:
+                        break
+                    # From now on we have absolute URLs with parameters
+                    absolute = True
+                    # Params are now provided by the url
+                    params = {}
+                    # Trailing should not be added as it is already part of the url
+                    trailing = False
+
+        if paging_workaround and prefetch_pages:
+            # The page numbers are known, so the following pages can be requested concurrently
+            pages = fetch_ahead(
+                lambda page: _get(dict(params, page=page)),
+                itertools.count(1),
+                prefetch_pages,
+                lambda response: len(response.get("values", [])) == 0,
+            )
+            pages = (response["values"] for response in pages if len(response.get("values", [])) > 0)
+        else:
+            pages = self._prefetch_pages(_pages(url, params, trailing, absolute), prefetch_pages)
+        for values in pages:
+            yield from values
 
         return
 
@@ -109,7 +135,7 @@ class BitbucketCloudBase(BitbucketBase):
         """
         if 400 <= response.status_code < 600:
             try:
-                j = response.json()
+                j = self.json_codec.decode(response)
                 e = j["error"]
                 error_msg = e["message"]
                 if e.get("detail"):
@@ -292,7 +292,7 @@ class Repository(BitbucketServerBase):
         format=None,
         path=None,
         prefix=None,
-        chunk_size=128,
+        chunk_size=None,
     ):
         """
         Downloads a repository archive.
@@ -309,7 +309,8 @@ class Repository(BitbucketServerBase):
         :param path: string: Optional, path to include in the streamed archive
         :param prefix: string: Optional, a prefix to apply to all entries in the streamed archive;
                         if the supplied prefix does not end with a trailing /, one will be added automatically
-        :param chunk_size: int: Optional, download chunk size. Defeault is 128
+        :param chunk_size: int: Optional, download chunk size. Default is stream_chunk_size (64 KiB)
+        :return: Number of bytes written
         """
         params = {}
         if at is not None:
@@ -323,6 +324,4 @@ class Repository(BitbucketServerBase):
         if prefix is not None:
             params["prefix"] = prefix
         headers = {"Accept": "*/*"}
-        response = self.get("archive", params=params, headers=headers, advanced_mode=True)
-        for chunk in response.iter_content(chunk_size=chunk_size):
-            dest_fd.write(chunk)
+        return self.download("archive", dest_fd, params=params, headers=headers, chunk_size=chunk_size)
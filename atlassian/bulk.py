@@ -0,0 +1,135 @@
+# coding=utf-8
+"""
+Bulk operations with bounded concurrency, per item results and resumable result logs.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from requests import ConnectionError, HTTPError, Timeout
+
+from atlassian.paging import fetch_ahead
+
+log = logging.getLogger(__name__)
+
+
+class BulkResult(namedtuple("BulkResult", ["key", "ok", "attempts", "error", "result"])):
+    """
+    Outcome of one item of a bulk operation.
+
+    key: The item (e.g. the issue key)
+    ok: bool: True if the operation succeeded
+    attempts: int: Number of attempts, 0 if the item was skipped because a result log recorded it as done
+    error: string: The last error, if any
+    result: The return value of the operation
+    """
+
+    __slots__ = ()
+
+    @property
+    def status(self):
+        """
+        :return: string: skipped, success, retried (success after a failed attempt) or error
+        """
+        if not self.ok:
+            return "error"
+        if self.attempts == 0:
+            return "skipped"
+        return "success" if self.attempts == 1 else "retried"
+
+
+class BulkResultLog(object):
+    """
+    Append-only JSON lines log of bulk results. A run given the log of an earlier,
+    interrupted run skips the items which already succeeded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def succeeded(self):
+        """
+        :return: set: The keys of the items recorded as successful
+        """
+        done = set()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    if record.get("ok"):
+                        done.add(record["key"])
+                    else:
+                        done.discard(record["key"])
+        except FileNotFoundError:
+            pass
+        return done
+
+    def append(self, result):
+        record = {"key": result.key, "ok": result.ok, "attempts": result.attempts, "error": result.error}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+def is_retryable(error, throttled=False):
+    """
+    :param error: The exception raised by an operation
+    :param throttled: bool: Also retry 429 responses. They are retried by the RetryScheduler of the client
+            already, a 429 reaching the caller has used up its retry budget.
+    :return: bool: True for connection errors, timeouts and 5xx responses (and 429 if throttled)
+    """
+    if isinstance(error, (ConnectionError, Timeout)):
+        return True
+    if isinstance(error, HTTPError) and error.response is not None:
+        return (throttled and error.response.status_code == 429) or error.response.status_code >= 500
+    return False
+
+
+def run_bulk(operation, items, workers=4, result_log=None, max_attempts=3, backoff=None, retryable=is_retryable):
+    """
+    Run an operation for every item, with up to workers items in flight.
+    Failures don't stop the run, every item gets a BulkResult.
+
+    :param operation: callable: Called with the key and the arguments of an item
+    :param items: iterable of (key, kwargs) pairs
+    :param workers: int: Maximum number of items in flight
+    :param result_log: BulkResultLog: OPTIONAL: Skip the items it records as successful and append all results
+    :param max_attempts: int: Attempts per item for retryable errors
+    :param backoff: callable: OPTIONAL: Seconds to wait before the n-th retry (1-based)
+    :param retryable: callable: Decides if an exception is retried. The default retries transport errors
+            and 5xx responses but not 429, the client retries those itself and a second round of retries
+            would stack both backoffs. Pass e.g. lambda e: is_retryable(e, throttled=True) for
+            operations which don't go through a client.
+    :return: A generator object for the BulkResults, in the order of the items
+    """
+    done = result_log.succeeded() if result_log is not None else set()
+
+    def _run(item):
+        key, kwargs = item
+        if key in done:
+            return BulkResult(key, True, 0, None, None)
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                result = BulkResult(key, True, attempts, None, operation(key, **kwargs))
+                break
+            except Exception as e:
+                if attempts >= max_attempts or not retryable(e):
+                    log.error("Bulk operation failed for %s: %s", key, e)
+                    result = BulkResult(key, False, attempts, str(e) or repr(e), None)
+                    break
+                if backoff is not None:
+                    time.sleep(backoff(attempts))
+        if result_log is not None:
+            result_log.append(result)
+        return result
+
+    return fetch_ahead(_run, items, workers, lambda _: False)
@@ -0,0 +1,423 @@
+# coding=utf-8
+"""
+Conditional request cache for GET requests.
+
+Responses carrying an ETag or Last-Modified header are stored together with their validators.
+The next GET of the same url sends If-None-Match / If-Modified-Since and a 304 answer is served
+from the store, so unchanged content isn't transferred again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+CachedResponse = namedtuple("CachedResponse", ["status_code", "headers", "content", "stored_at"])
+
+
+def _size(entry):
+    return len(entry.content)
+
+
+def _low_watermark(limit):
+    """
+    :param limit: The maximum number of entries or bytes of a store, or None
+    :return: The level a persistent store evicts down to, 90% of the limit. The eviction scans the
+             whole store, the headroom spreads its cost over the following writes.
+    """
+    return None if limit is None else limit - limit // 10
+
+
+class MemoryCache(object):
+    """
+    In-memory LRU store.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None, clock=time.time):
+        """
+        :param max_entries: int: Maximum number of stored responses
+        :param max_bytes: int: Maximum total size of the stored bodies. Defaults to None (unbounded)
+        :param ttl: float: Seconds after which a response is dropped. Defaults to None (kept until evicted)
+        :param clock: Wall clock, time.time by default
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and entry.stored_at + self.ttl < self.clock():
+                self._bytes -= _size(self._entries.pop(key))
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= _size(self._entries.pop(key))
+            self._entries[key] = entry
+            self._bytes += _size(entry)
+            while self._entries and (
+                len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= _size(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= _size(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SQLiteCache(object):
+    """
+    Store in a SQLite database, survives restarts and can be shared between processes.
+
+    The number and size of the entries are tracked by each process. When they exceed a limit, the
+    store is counted again (picking up the writes of other processes) and evicted down to 90% of it.
+    """
+
+    def __init__(self, path, max_entries=10000, max_bytes=None, ttl=None, clock=time.time):
+        """
+        :param path: string: Path of the database file
+        :param max_entries: int: Maximum number of stored responses
+        :param max_bytes: int: Maximum total size of the stored bodies. Defaults to None (unbounded)
+        :param ttl: float: Seconds after which a response is dropped. Defaults to None (kept until evicted)
+        :param clock: Wall clock, time.time by default
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, status_code INTEGER, headers TEXT, content BLOB, "
+                "size INTEGER, stored_at REAL, accessed_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._count, self._bytes = self._totals()
+
+    def _totals(self):
+        return self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def _over(self, count, total, max_entries, max_bytes):
+        return count > max_entries or (max_bytes is not None and total > max_bytes)
+
+    def get(self, key):
+        now = self.clock()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT status_code, headers, content, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and row[3] + self.ttl < now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= len(row[2])
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return CachedResponse(row[0], json.loads(row[1]), bytes(row[2]), row[3])
+
+    def set(self, key, entry):
+        with self._lock, self._db:
+            replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if replaced is not None:
+                self._count -= 1
+                self._bytes -= replaced[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.status_code,
+                    json.dumps(entry.headers),
+                    sqlite3.Binary(entry.content),
+                    _size(entry),
+                    entry.stored_at,
+                    self.clock(),
+                ),
+            )
+            self._count += 1
+            self._bytes += _size(entry)
+            if self._over(self._count, self._bytes, self.max_entries, self.max_bytes):
+                self._evict()
+
+    def _evict(self):
+        count, total = self._totals()
+        max_entries, max_bytes = _low_watermark(self.max_entries), _low_watermark(self.max_bytes)
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+        evicted = []
+        while self._over(count, total, max_entries, max_bytes):
+            row = rows.fetchone()
+            if row is None:
+                break
+            evicted.append((row[0],))
+            count -= 1
+            total -= row[1]
+        rows.close()
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._count, self._bytes = count, total
+
+    def delete(self, key):
+        with self._lock, self._db:
+            deleted = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if deleted is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= deleted[0]
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+            self._count, self._bytes = 0, 0
+
+    def close(self):
+        self._db.close()
+
+
+class FileCache(object):
+    """
+    Store with one body file and one metadata file per response in a directory.
+    The modification time of the body file tracks the last access.
+
+    The number and size of the entries are tracked in memory. When they exceed a limit, the directory
+    is scanned again and evicted down to 90% of it.
+    """
+
+    def __init__(self, directory, max_entries=10000, max_bytes=None, ttl=None, clock=time.time):
+        """
+        :param directory: string: Directory of the files, created if missing
+        :param max_entries: int: Maximum number of stored responses
+        :param max_bytes: int: Maximum total size of the stored bodies. Defaults to None (unbounded)
+        :param ttl: float: Seconds after which a response is dropped. Defaults to None (kept until evicted)
+        :param clock: Wall clock, time.time by default
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        files = self._files()
+        self._count, self._bytes = len(files), sum(size for _, size, _ in files)
+
+    def _files(self):
+        """
+        :return: list of (modification time, size, name) of the body files
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if "." in name:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+        return files
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(f"{path}.meta", "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(path, "rb") as f:
+                    content = f.read()
+            except (OSError, ValueError):
+                return None
+            now = self.clock()
+            if self.ttl is not None and meta["stored_at"] + self.ttl < now:
+                self._remove(path)
+                self._count -= 1
+                self._bytes -= len(content)
+                return None
+            os.utime(path, (now, now))
+        return CachedResponse(meta["status_code"], meta["headers"], content, meta["stored_at"])
+
+    def set(self, key, entry):
+        path = self._path(key)
+        meta = {"status_code": entry.status_code, "headers": entry.headers, "stored_at": entry.stored_at}
+        now = self.clock()
+        with self._lock:
+            replaced = self._file_size(path)
+            if replaced is not None:
+                self._count -= 1
+                self._bytes -= replaced
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(entry.content)
+            with open(f"{path}.meta", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(f"{path}.tmp", path)
+            os.utime(path, (now, now))
+            self._count += 1
+            self._bytes += _size(entry)
+            if self._count > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._evict()
+
+    @staticmethod
+    def _remove(path):
+        for name in (path, f"{path}.meta"):
+            try:
+                os.remove(name)
+            except OSError:
+                pass
+
+    def _evict(self):
+        files = self._files()
+        count, total = len(files), sum(size for _, size, _ in files)
+        max_entries, max_bytes = _low_watermark(self.max_entries), _low_watermark(self.max_bytes)
+        for _, size, name in sorted(files):
+            if count <= max_entries and (max_bytes is None or total <= max_bytes):
+                break
+            self._remove(os.path.join(self.directory, name))
+            count -= 1
+            total -= size
+        self._count, self._bytes = count, total
+
+    def delete(self, key):
+        with self._lock:
+            path = self._path(key)
+            deleted = self._file_size(path)
+            self._remove(path)
+            if deleted is not None:
+                self._count -= 1
+                self._bytes -= deleted
+
+    def clear(self):
+        with self._lock:
+            for name in os.listdir(self.directory):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+            self._count, self._bytes = 0, 0
+
+
+class ResponseCache(object):
+    """
+    Conditional GET cache on top of a store (MemoryCache, SQLiteCache or FileCache).
+
+    Only responses with an ETag or Last-Modified validator are stored. The store can be shared
+    between clients, the responses are stored per credentials since they depend on the permissions
+    of the user.
+    """
+
+    def __init__(self, store=None, clock=time.time):
+        """
+        :param store: The backend. Defaults to a MemoryCache()
+        :param clock: Wall clock, time.time by default
+        """
+        self.store = store if store is not None else MemoryCache()
+        self.clock = clock
+
+    @staticmethod
+    def key(url, headers=None, vary=None):
+        """
+        :param url: string: Absolute url of the request
+        :param headers: dict: Request headers, the Accept header is part of the key
+        :param vary: string: Identity of the user (e.g. a hash of the credentials), if the store is shared
+                     between users
+        :return: string: The key of the response in the store
+        """
+        accept = (headers or {}).get("Accept", "")
+        return "\n".join(str(part) for part in ("GET", url, accept, vary or ""))
+
+    def lookup(self, key):
+        """
+        :param key: string: See key()
+        :return: CachedResponse or None
+        """
+        return self.store.get(key)
+
+    @staticmethod
+    def validators(entry):
+        """
+        :param entry: CachedResponse
+        :return: dict: The conditional request headers for the entry
+        """
+        headers = {}
+        stored = CaseInsensitiveDict(entry.headers)
+        if "ETag" in stored:
+            headers["If-None-Match"] = stored["ETag"]
+        if "Last-Modified" in stored:
+            headers["If-Modified-Since"] = stored["Last-Modified"]
+        return headers
+
+    def update(self, key, response, entry=None):
+        """
+        Store a fresh response or answer a 304 from the store.
+
+        :param key: string: See key()
+        :param response: The response to the (conditional) request
+        :param entry: CachedResponse which was revalidated, if any
+        :return: The response to hand to the caller
+        """
+        if response.status_code == 304 and entry is not None:
+            # Still valid, the entry starts a new ttl with the validators of the 304
+            entry = CachedResponse(entry.status_code, self._merge_headers(entry, response), entry.content, self.clock())
+            self.store.set(key, entry)
+            return self._to_response(entry, response)
+        if response.status_code == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+            self.store.set(key, CachedResponse(200, dict(response.headers), response.content, self.clock()))
+        return response
+
+    @staticmethod
+    def _merge_headers(entry, not_modified):
+        """
+        :return: dict: The headers of the entry updated with the ones of the 304, e.g. a new Date or ETag
+        """
+        headers = CaseInsensitiveDict(entry.headers)
+        for name, value in not_modified.headers.items():
+            if name.lower() not in ("content-length", "content-encoding", "transfer-encoding"):
+                headers[name] = value
+        return dict(headers)
+
+    @staticmethod
+    def _to_response(entry, not_modified):
+        response = Response()
+        response.status_code = entry.status_code
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.content
+        response._content_consumed = True
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.encoding = not_modified.encoding
+        response.from_cache = True
+        return response
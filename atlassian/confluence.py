@@ -1,10 +1,12 @@
 # coding=utf-8
+import hashlib
 import io
 import json
 import logging
 import os
 import re
 import time
+from datetime import datetime
 
 from bs4 import BeautifulSoup
 from deprecated import deprecated
@@ -12,6 +14,7 @@ import requests
 from requests import HTTPError
 
 from atlassian import utils
+from .bulk import run_bulk
 from .errors import (
     ApiConflictError,
     ApiError,
@@ -20,6 +23,7 @@ from .errors import (
     ApiPermissionError,
     ApiValueError,
 )
+from .paging import fetch_ahead
 from .rest_client import AtlassianRestAPI
 
 log = logging.getLogger(__name__)
@@ -38,10 +42,19 @@ class Confluence(AtlassianRestAPI):
     }
 
     def __init__(self, url, *args, **kwargs):
+        """
+        :param page_states: OPTIONAL: dict-like store in which the client keeps the title, version and body
+                            hash of the pages it read or wrote and the hash of the attachments it uploaded,
+                            e.g. {} or an atlassian.confluence_manifest.PageManifest. Unchanged pages and
+                            attachments are then skipped and changed pages updated without reading them first.
+                            Edits made elsewhere are only seen once a PageManifest entry goes stale.
+                            Default: None
+        """
         if ("atlassian.net" in url or "jira.com" in url) and ("/wiki" not in url):
             url = AtlassianRestAPI.url_joiner(url, "/wiki")
             if "cloud" not in kwargs:
                 kwargs["cloud"] = True
+        self.page_states = kwargs.pop("page_states", None)
         super(Confluence, self).__init__(url, *args, **kwargs)
 
     @staticmethod
@@ -66,6 +79,7 @@ class Confluence(AtlassianRestAPI):
         flags=None,
         trailing=None,
         absolute=False,
+        prefetch_pages=None,
     ):
         """
         Used to get the paged data
@@ -76,6 +90,8 @@ class Confluence(AtlassianRestAPI):
         :param flags: string[] (default is None):  The flags
         :param trailing: bool (default is None):   If True, a trailing slash is added to the url
         :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
+        :param prefetch_pages: int (default is None): Number of pages to download ahead of the caller,
+                                                      defaults to the prefetch_pages of the client
 
         :return: A generator object for the data elements
         """
@@ -83,33 +99,36 @@ class Confluence(AtlassianRestAPI):
         if params is None:
             params = {}
 
-        while True:
-            response = self.get(
-                url,
-                trailing=trailing,
-                params=params,
-                data=data,
-                flags=flags,
-                absolute=absolute,
-            )
-            if "results" not in response:
-                return
+        def _pages(url, params, trailing, absolute):
+            while True:
+                response = self.get(
+                    url,
+                    trailing=trailing,
+                    params=params,
+                    data=data,
+                    flags=flags,
+                    absolute=absolute,
+                )
+                if "results" not in response:
+                    return
 
-            for value in response.get("results", []):
-                yield value
+                yield response.get("results", [])
 
-            # According to Cloud and Server documentation the links are returned the same way:
-            # https://developer.atlassian.com/cloud/confluence/rest/api-group-content/#api-wiki-rest-api-content-get
-            # https://developer.atlassian.com/server/confluence/pagination-in-the-rest-api/
-            url = response.get("_links", {}).get("next")
-            if url is None:
-                break
-            # From now on we have relative URLs with parameters
-            absolute = False
-            # Params are now provided by the url
-            params = {}
-            # Trailing should not be added as it is already part of the url
-            trailing = False
+                # According to Cloud and Server documentation the links are returned the same way:
+                # https://developer.atlassian.com/cloud/confluence/rest/api-group-content/#api-wiki-rest-api-content-get
+                # https://developer.atlassian.com/server/confluence/pagination-in-the-rest-api/
+                url = response.get("_links", {}).get("next")
+                if url is None:
+                    break
+                # From now on we have relative URLs with parameters
+                absolute = False
+                # Params are now provided by the url
+                params = {}
+                # Trailing should not be added as it is already part of the url
+                trailing = False
+
+        for values in self._prefetch_pages(_pages(url, params, trailing, absolute), prefetch_pages):
+            yield from values
 
         return
 
@@ -664,6 +683,64 @@ class Confluence(AtlassianRestAPI):
             space=space, start=start, limit=limit, status=status, expand=expand, content_type=content_type
         ).get("results")
 
+    def get_all_pages_from_space_as_generator(
+        self,
+        space,
+        start=0,
+        limit=50,
+        status=None,
+        expand=None,
+        content_type="page",
+        workers=None,
+    ):
+        """
+        Get all pages from space as a generator.
+        After the first page the following pages are requested concurrently, in windows of `workers` pages.
+
+        :param space:
+        :param start: OPTIONAL: The start point of the collection to return. Default: None (0).
+        :param limit: OPTIONAL: The page size of each request, this may be restricted by
+                            fixed system limits. Default: 50
+        :param status: OPTIONAL: list of statuses the content to be found is in.
+                                 Defaults to current is not specified.
+                                 If set to 'any', content in 'current' and 'trashed' status will be fetched.
+                                 Does not support 'historical' status for now.
+        :param expand: OPTIONAL: a comma separated list of properties to expand on the content.
+                                 Default value: history,space,version.
+        :param content_type: the content type to return. Default value: page. Valid values: page, blogpost.
+        :param workers: OPTIONAL: Number of pages requested concurrently. Default: max_workers of the client
+        :return: A generator object for the pages
+        """
+        params = {}
+        if space:
+            params["spaceKey"] = space
+        if status:
+            params["status"] = status
+        if expand:
+            params["expand"] = expand
+        if content_type:
+            params["type"] = content_type
+
+        try:
+            yield from self._get_paged_concurrently(
+                "rest/api/content",
+                params=params,
+                results_key="results",
+                start=start,
+                limit=limit,
+                # Permission filtering can shorten any page, only the next link marks the end
+                is_last=lambda page: "next" not in page.get("_links", {}),
+                workers=workers,
+            )
+        except HTTPError as e:
+            if e.response.status_code == 404:
+                raise ApiPermissionError(
+                    "The calling user does not have permission to view the content",
+                    reason=e,
+                )
+
+            raise
+
     def get_all_pages_from_space_trash(self, space, start=0, limit=500, status="trashed", content_type="page"):
         """
         Get list of pages from trash
@@ -844,19 +921,31 @@ class Confluence(AtlassianRestAPI):
 
         return response
 
-    def remove_page(self, page_id, status=None, recursive=False):
+    def remove_page(self, page_id, status=None, recursive=False, workers=None):
         """
         This method removes a page, if it has recursive flag, method removes including child pages
         :param page_id:
         :param status: OPTIONAL: type of page
         :param recursive: OPTIONAL: if True - will recursively delete all children pages too
+        :param workers: int: OPTIONAL: Number of requests in flight when removing recursively.
+                Default: max_workers of the client
         :return:
         """
         url = f"rest/api/content/{page_id}"
         if recursive:
-            children_pages = self.get_page_child_by_type(page_id)
-            for children_page in children_pages:
-                self.remove_page(children_page.get("id"), status, recursive)
+            workers = workers or self.max_workers
+            levels = {}
+            for page, depth, _parent_id in self.walk_page_tree(page_id, workers=workers):
+                levels.setdefault(depth, []).append(page.get("id"))
+            # Deepest level first, the pages of one level are removed concurrently
+            for depth in sorted(levels, reverse=True):
+                for _ in fetch_ahead(
+                    lambda child_id: self.remove_page(child_id, status),
+                    levels[depth],
+                    workers,
+                    lambda _: False,
+                ):
+                    pass
         params = {}
         if status:
             params["status"] = status
@@ -1321,6 +1410,15 @@ class Confluence(AtlassianRestAPI):
         page_id = self.get_page_id(space=space, title=title) if page_id is None else page_id
         type = "attachment"
         if page_id is not None:
+            # page_states remember the hash of the uploaded content
+            state_key = f"{page_id}/attachment/{name}"
+            state = content_hash = None
+            if self.page_states is not None and isinstance(content, (bytes, bytearray)):
+                content_hash = hashlib.sha256(content).hexdigest()
+                state = self.page_states.get(state_key)
+                if state is not None and state.get("hash") == content_hash and not state.get("stale"):
+                    log.info("Attachment %s of %s is unchanged", name, page_id)
+                    return state.get("response")
             comment = comment if comment else f"Uploaded {name}."
             data = {
                 "type": type,
@@ -1337,7 +1435,16 @@ class Confluence(AtlassianRestAPI):
             # Check if there is already a file with the same name
             attachments = self.get(path=path, headers=headers, params={"filename": name})
             if attachments.get("size"):
-                path = path + "/" + attachments["results"][0]["id"] + "/data"
+                current = attachments["results"][0]
+                if (
+                    state is not None
+                    and state.get("hash") == content_hash
+                    and state.get("version") == (current.get("version") or {}).get("number")
+                ):
+                    # Stale, but nobody uploaded another version since
+                    self.page_states[state_key] = state
+                    return state.get("response")
+                path = path + "/" + current["id"] + "/data"
 
             try:
                 response = self.post(
@@ -1365,6 +1472,13 @@ class Confluence(AtlassianRestAPI):
 
                 raise
 
+            if content_hash is not None and isinstance(response, dict):
+                attachment = (response.get("results") or [response])[0]
+                self.page_states[state_key] = {
+                    "hash": content_hash,
+                    "version": (attachment.get("version") or {}).get("number"),
+                    "response": response,
+                }
             return response
         else:
             log.warning("No 'page_id' found, not uploading attachments")
@@ -1459,8 +1573,12 @@ class Confluence(AtlassianRestAPI):
                 if not attachments:
                     return f"No attachment with filename '{filename}' found on the page."
             else:
-                # Fetch all attachments with pagination
-                attachments = self.get_attachments_from_content(page_id=page_id, start=start, limit=limit)["results"]
+                # Fetch all attachments, following the next links
+                attachments = list(
+                    self._get_paged(
+                        f"rest/api/content/{page_id}/child/attachment", params={"start": start, "limit": limit}
+                    )
+                )
                 if not attachments:
                     return "No attachments found on the page."
 
@@ -1469,18 +1587,19 @@ class Confluence(AtlassianRestAPI):
             for attachment in attachments:
                 file_name = attachment["title"] or attachment["id"]  # Use attachment ID if title is unavailable
                 download_link = self.url + attachment["_links"]["download"]
-                # Fetch the file content
-                response = self.get(str(download_link), not_json_response=True)
 
                 if to_memory:
                     # Store in BytesIO object
-                    file_obj = io.BytesIO(response)
+                    file_obj = io.BytesIO()
+                    self.download(str(download_link), file_obj, absolute=True)
+                    file_obj.seek(0)
                     downloaded_files[file_name] = file_obj
                 else:
-                    # Save file to disk
-                    file_path = os.path.join(path, file_name)
-                    with open(file_path, "wb") as file:
-                        file.write(response)
+                    # Stream the file to disk, under a temporary name until it is complete
+                    file_path = os.path.join(path, os.path.basename(file_name.replace("\\", "/")) or attachment["id"])
+                    with open(f"{file_path}.part", "wb") as file:
+                        self.download(str(download_link), file, absolute=True)
+                    os.replace(f"{file_path}.part", file_path)
 
             # Return results based on storage mode
             if to_memory:
@@ -1500,6 +1619,118 @@ class Confluence(AtlassianRestAPI):
         except Exception as err:
             raise Exception(f"An unexpected error occurred: {err}")
 
+    def download_attachments(
+        self,
+        page_ids=None,
+        space=None,
+        recursive=False,
+        path=None,
+        workers=None,
+        skip_existing=True,
+        limit=None,
+    ):
+        """
+        Download all attachments of pages, of page subtrees or of a space, each file streamed to disk.
+        The files are saved as <path>/<page id>/<attachment id>_<title>. A file is written under a temporary
+        name and renamed once complete, its modification time is set to the time of the attachment version.
+        An interrupted run can therefore be restarted, it skips the files already downloaded.
+        :param page_ids: OPTIONAL: list of page ids
+        :param space: OPTIONAL: Space key, all attachments of the space are downloaded
+        :param recursive: OPTIONAL: Download the attachments of the descendants of the pages too. Default: False
+        :param path: OPTIONAL: Directory of the files. Default: the current working directory
+        :param workers: OPTIONAL: Number of concurrent requests. Default: max_workers of the client
+        :param skip_existing: OPTIONAL: Skip attachments whose file exists with the size and the version time
+                              of the attachment. Default: True
+        :param limit: OPTIONAL: Page size of the attachment listings. Default: None (server default)
+        :return: list of atlassian.bulk.BulkResult, key is the file path and result the number
+                 of bytes downloaded (None if the file was skipped)
+        """
+        if (page_ids is None) == (space is None):
+            raise ValueError("Either page_ids or space is required")
+        if path is None:
+            path = os.getcwd()
+        workers = workers or self.max_workers
+        params = {"expand": "version,container"}
+        if limit is not None:
+            params["limit"] = int(limit)
+
+        if space is not None:
+            listed = (
+                ((attachment.get("container") or {}).get("id", "unknown"), attachment)
+                for attachment in self._get_paged(
+                    "rest/api/content/search", params=dict(params, cql=f'space = "{space}" and type = attachment')
+                )
+            )
+        else:
+
+            def _pages():
+                # Subtrees may overlap, e.g. with a page and one of its descendants in page_ids
+                seen = set()
+                for page_id in page_ids:
+                    if str(page_id) not in seen:
+                        seen.add(str(page_id))
+                        yield page_id
+                    if recursive:
+                        for page, _depth, _parent_id in self.walk_page_tree(page_id, workers=workers):
+                            if str(page.get("id")) not in seen:
+                                seen.add(str(page.get("id")))
+                                yield page.get("id")
+
+            def _attachments(page_id):
+                url = f"rest/api/content/{page_id}/child/attachment"
+                return page_id, list(self._get_paged(url, params=params, prefetch_pages=0))
+
+            listed = (
+                (page_id, attachment)
+                for page_id, attachments in fetch_ahead(_attachments, _pages(), workers, lambda _: False)
+                for attachment in attachments
+            )
+
+        def _files():
+            seen = set()
+            for page_id, attachment in listed:
+                title = os.path.basename((attachment.get("title") or "").replace("\\", "/")) or "attachment"
+                file_path = os.path.join(path, str(page_id), f"{attachment['id']}_{title}")
+                if file_path in seen:
+                    continue
+                seen.add(file_path)
+                yield file_path, {"attachment": attachment}
+
+        def _download(file_path, attachment):
+            size = (attachment.get("extensions") or {}).get("fileSize")
+            modified = self._attachment_version_time(attachment)
+            if (
+                skip_existing
+                and os.path.isfile(file_path)
+                and (size is None or os.path.getsize(file_path) == size)
+                and (modified is None or int(os.path.getmtime(file_path)) == int(modified))
+            ):
+                return None
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            part_path = f"{file_path}.part"
+            with open(part_path, "wb") as f:
+                written = self.download(self.url + attachment["_links"]["download"], f, absolute=True)
+            if modified is not None:
+                os.utime(part_path, (modified, modified))
+            os.replace(part_path, file_path)
+            return written
+
+        return list(run_bulk(_download, _files(), workers=workers, backoff=self._calculate_backoff_value))
+
+    @staticmethod
+    def _attachment_version_time(attachment):
+        """
+        :param attachment: An attachment with the version expanded
+        :return: float: The time of the attachment version as a timestamp, None if unknown
+        """
+        when = (attachment.get("version") or {}).get("when")
+        if not when:
+            return None
+        try:
+            return datetime.fromisoformat(when.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+
     def delete_attachment(self, page_id, filename, version=None):
         """
         Remove completely a file if version is None or delete version
@@ -1778,37 +2009,52 @@ class Confluence(AtlassianRestAPI):
         :param title: Title to compare
         :return: True if the same
         """
-        confluence_content = self.get_page_by_id(page_id)
-        if title:
-            current_title = confluence_content.get("title", None)
-            if title != current_title:
-                log.info("Title of %s is different", page_id)
-                return False
+        return self._is_page_state_unchanged(page_id, self._read_page_state(page_id), body, title)
 
-        if self.advanced_mode:
-            confluence_content = (
-                (self.get_page_by_id(page_id, expand="body.storage").json() or {}).get("body") or {}
-            ).get("storage") or {}
-        else:
-            confluence_content = ((self.get_page_by_id(page_id, expand="body.storage") or {}).get("body") or {}).get(
-                "storage"
-            ) or {}
+    def _read_page_state(self, page_id):
+        """
+        Read the title, version and storage body of a page in one request
+        :param page_id: Content ID
+        :return: The page
+        """
+        page = self.get_page_by_id(page_id, expand="body.storage,version")
+        if isinstance(page, requests.Response):
+            page = self.json_codec.decode(page)
+        return page or {}
 
-        confluence_body_content = confluence_content.get("value")
+    @staticmethod
+    def _body_hash(body):
+        """
+        :param body: string: Storage format of a page
+        :return: string: The hash of the normalized body, ignoring the surrounding whitespace
+        """
+        # @todo move into utils
+        return hashlib.sha256(utils.symbol_normalizer(body).strip().encode("utf-8")).hexdigest()
 
-        if confluence_body_content:
-            # @todo move into utils
-            confluence_body_content = utils.symbol_normalizer(confluence_body_content)
+    def _page_state(self, page):
+        """
+        :param page: A page read with _read_page_state
+        :return: dict with the title, version and body hash of the page
+        """
+        body = (((page.get("body") or {}).get("storage")) or {}).get("value")
+        log.debug('Old Content: """%s"""', body)
+        return {
+            "title": page.get("title"),
+            "version": (page.get("version") or {}).get("number"),
+            "hash": self._body_hash(body),
+        }
 
-        log.debug('Old Content: """%s"""', confluence_body_content)
+    @staticmethod
+    def _is_page_state_unchanged(page_id, state, body, title=None):
+        if title and title != state.get("title"):
+            log.info("Title of %s is different", page_id)
+            return False
         log.debug('New Content: """%s"""', body)
-
-        if confluence_body_content.strip() == body.strip():
+        if state.get("hash") == Confluence._body_hash(body):
             log.info("Content of %s is exactly the same", page_id)
             return True
-        else:
-            log.info("Content of %s differs", page_id)
-            return False
+        log.info("Content of %s differs", page_id)
+        return False
 
     def update_existing_page(
         self,
@@ -1859,30 +2105,30 @@ class Confluence(AtlassianRestAPI):
         :param version_comment: Version comment
         :param always_update: Whether always to update (suppress content check)
         :param full_width: OPTIONAL: Default False
-        :return:
+        :return: The updated page, or the current page if the title and body are unchanged
         """
         # update current page
         params = {"status": "current"}
         log.info('Updating %s "%s" with %s', type, title, parent_id)
 
-        if not always_update and body is not None and self.is_page_content_is_already_updated(page_id, body, title):
-            return self.get_page_by_id(page_id)
-
-        try:
-            if self.advanced_mode:
-                version = self.history(page_id).json()["lastUpdated"]["number"] + 1
-            else:
-                version = self.history(page_id)["lastUpdated"]["number"] + 1
-        except (IndexError, TypeError) as e:
+        # The title, version and body are read in one request, or taken from page_states
+        page = None
+        state = self.page_states.get(str(page_id)) if self.page_states is not None else None
+        if state is None or state.get("stale") or state.get("version") is None:
+            page = self._read_page_state(page_id)
+            state = self._page_state(page)
+            self._remember_page_state(page_id, page, state)
+        if not always_update and body is not None and self._is_page_state_unchanged(page_id, state, body, title):
+            return page if page is not None else state.get("page")
+        if state.get("version") is None:
             log.error("Can't find '%s' %s!", title, type)
-            log.debug(e)
             return None
 
         data = {
             "id": page_id,
             "type": type,
             "title": title,
-            "version": {"number": version, "minorEdit": minor_edit},
+            "version": {"number": state["version"] + 1, "minorEdit": minor_edit},
             "metadata": {"properties": {}},
         }
         if body is not None:
@@ -1900,11 +2146,29 @@ class Confluence(AtlassianRestAPI):
             data["metadata"]["properties"]["content-appearance-draft"] = {"value": "fixed-width"}
             data["metadata"]["properties"]["content-appearance-published"] = {"value": "fixed-width"}
         try:
-            response = self.put(
-                f"rest/api/content/{page_id}",
-                data=data,
-                params=params,
-            )
+            try:
+                response = self.put(f"rest/api/content/{page_id}", data=data, params=params)
+                if isinstance(response, requests.Response) and response.status_code == 409:
+                    raise HTTPError("Version conflict", response=response)
+            except HTTPError as e:
+                if e.response is None or e.response.status_code != 409:
+                    raise
+                # The page was changed by someone else or the known version is outdated, retry once
+                log.info("Version conflict updating %s, reading the current version", page_id)
+                page = self._read_page_state(page_id)
+                state = self._page_state(page)
+                self._remember_page_state(page_id, page, state)
+                if (
+                    not always_update
+                    and body is not None
+                    and self._is_page_state_unchanged(page_id, state, body, title)
+                ):
+                    return page
+                if state.get("version") is None:
+                    log.error("Can't find '%s' %s!", title, type)
+                    return None
+                data["version"]["number"] = state["version"] + 1
+                response = self.put(f"rest/api/content/{page_id}", data=data, params=params)
         except HTTPError as e:
             if e.response.status_code == 400:
                 raise ApiValueError(
@@ -1918,8 +2182,33 @@ class Confluence(AtlassianRestAPI):
 
             raise
 
+        if isinstance(response, dict) and body is not None and representation == "storage":
+            self._remember_page_state(
+                page_id,
+                response,
+                {
+                    "title": title,
+                    "version": (response.get("version") or {}).get("number"),
+                    "hash": self._body_hash(body),
+                },
+            )
+        elif self.page_states is not None:
+            self.page_states.pop(str(page_id), None)
         return response
 
+    def _remember_page_state(self, page_id, page, state, parent_id=None):
+        """
+        Keep the state of a page in page_states, with the page without its body as the result of skipped updates
+        """
+        if self.page_states is None or state.get("version") is None:
+            return
+        if parent_id is None:
+            parent_id = (self.page_states.get(str(page_id)) or {}).get("parent_id")
+        state = dict(state, page={k: v for k, v in page.items() if k != "body"})
+        if parent_id is not None:
+            state["parent_id"] = str(parent_id)
+        self.page_states[str(page_id)] = state
+
     def _insert_to_existing_page(
         self,
         page_id,
@@ -2085,6 +2374,23 @@ class Confluence(AtlassianRestAPI):
         :param full_width: OPTIONAL: Default is False
         :return:
         """
+        # A PageManifest knows the pages published before, without looking them up
+        find = getattr(self.page_states, "find", None)
+        page_id = find(title, parent_id) if find is not None and parent_id is not None else None
+        if page_id is not None:
+            result = self.update_page(
+                parent_id=parent_id,
+                page_id=page_id,
+                title=title,
+                body=body,
+                representation=representation,
+                minor_edit=minor_edit,
+                version_comment=version_comment,
+                full_width=full_width,
+            )
+            self._remember_parent(result, parent_id)
+            return result
+
         space = self.get_page_space(parent_id)
 
         if self.page_exists(space, title):
@@ -2110,6 +2416,17 @@ class Confluence(AtlassianRestAPI):
                 editor=editor,
                 full_width=full_width,
             )
+            if isinstance(result, dict) and representation == "storage":
+                self._remember_page_state(
+                    result.get("id"),
+                    result,
+                    {
+                        "title": title,
+                        "version": (result.get("version") or {}).get("number"),
+                        "hash": self._body_hash(body),
+                    },
+                )
+        self._remember_parent(result, parent_id)
 
         log.info(
             "You may access your page at: %s%s",
@@ -2118,6 +2435,16 @@ class Confluence(AtlassianRestAPI):
         )
         return result
 
+    def _remember_parent(self, page, parent_id):
+        """
+        Record the parent of a page in page_states, to find the page by title and parent
+        """
+        if self.page_states is None or parent_id is None or not isinstance(page, dict) or page.get("id") is None:
+            return
+        state = self.page_states.get(str(page["id"]))
+        if state is not None and state.get("version") is not None and state.get("parent_id") != str(parent_id):
+            self.page_states[str(page["id"])] = dict(state, parent_id=str(parent_id))
+
     def convert_wiki_to_storage(self, wiki):
         """
         Convert to Confluence XHTML format from wiki style
@@ -2701,11 +3028,60 @@ class Confluence(AtlassianRestAPI):
 
         return response
 
-    def get_page_as_pdf(self, page_id):
+    def cql_iter(
+        self,
+        cql,
+        limit=None,
+        expand=None,
+        include_archived_spaces=None,
+        excerpt=None,
+        prefetch_pages=None,
+    ):
+        """
+        Iterate over all results of a cql search, following the next links of the result pages.
+
+        Unlike start offsets, which get slower the deeper they go and are capped on Cloud, the next links
+        carry a cursor, so the whole result set is read in linear time. Only one page of results is held
+        in memory, plus the pages fetched ahead.
+        :param cql:
+        :param limit: OPTIONAL: The page size, this may be restricted by fixed system limits, e.g. for searches
+                        with expansions. Default: None (server default, 25)
+        :param expand: OPTIONAL: the properties to expand on the search results,
+                        this may cause database requests for some properties
+        :param include_archived_spaces: OPTIONAL: whether to include content in archived spaces in the result,
+                                    this defaults to false
+        :param excerpt: the excerpt strategy to apply to the result, one of : indexed, highlight, none.
+                        This defaults to highlight
+        :param prefetch_pages: int: OPTIONAL: Number of pages to download ahead of the caller,
+                                defaults to the prefetch_pages of the client
+        :return: A generator object for the search results
+        """
+        params = {"cql": cql}
+        if limit is not None:
+            params["limit"] = int(limit)
+        if expand is not None:
+            params["expand"] = expand
+        if include_archived_spaces is not None:
+            params["includeArchivedSpaces"] = include_archived_spaces
+        if excerpt is not None:
+            params["excerpt"] = excerpt
+
+        try:
+            yield from self._get_paged("rest/api/search", params=params, prefetch_pages=prefetch_pages)
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 400:
+                raise ApiValueError("The query cannot be parsed", reason=e)
+
+            raise
+
+    def get_page_as_pdf(self, page_id, dest_fd=None, chunk_size=None):
         """
         Export page as standard pdf exporter
         :param page_id: Page ID
-        :return: PDF File
+        :param dest_fd: OPTIONAL: a file-like object to which the PDF is streamed in chunks,
+                        instead of being returned
+        :param chunk_size: int: OPTIONAL: download chunk size, used with dest_fd
+        :return: PDF File, or the number of bytes written if dest_fd is given
         """
         headers = self.form_token_headers
         url = f"spaces/flyingpdf/pdfpageexport.action?pageId={page_id}"
@@ -2715,7 +3091,17 @@ class Confluence(AtlassianRestAPI):
                 log.error("Failed to get download PDF url.")
                 raise ApiNotFoundError("Failed to export page as PDF", reason="Failed to get download PDF url.")
             # To download the PDF file, the request should be with no headers of authentications.
-            return requests.get(url, timeout=75).content
+            if dest_fd is None:
+                return requests.get(url, timeout=75).content
+            size = 0
+            with requests.get(url, timeout=75, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size or self.stream_chunk_size):
+                    dest_fd.write(chunk)
+                    size += len(chunk)
+            return size
+        if dest_fd is not None:
+            return self.download(url, dest_fd, headers=headers, chunk_size=chunk_size)
         return self.get(url, headers=headers, not_json_response=True)
 
     def get_page_as_word(self, page_id):
@@ -3376,20 +3762,89 @@ class Confluence(AtlassianRestAPI):
         }
         return self.post(url, data=data).get("result") or {}
 
-    def get_subtree_of_content_ids(self, page_id):
+    def walk_page_tree(
+        self,
+        page_id,
+        type="page",
+        expand=None,
+        max_depth=None,
+        limit=None,
+        workers=None,
+        use_cql=False,
+    ):
+        """
+        Walk the descendants of a page, level by level.
+
+        The children of all pages of a level are requested concurrently, each with its own paged
+        request which follows the next links of wide parents. The pages of a level are yielded in the
+        order of their parents, before the pages of the next level.
+
+        With use_cql the whole subtree is fetched with a few large paged CQL queries (ancestor = page_id)
+        instead of one request per page. The pages then come in the order of the search, not by level,
+        and pages created or moved a moment ago may be missing until the search index catches up.
+
+        :param page_id: The id of the root page, which is not yielded itself
+        :param type: OPTIONAL: The type of the descendants (page, comment, ...). Default: page
+        :param expand: OPTIONAL: expand e.g. version,space
+        :param max_depth: int: OPTIONAL: Deepest level to walk, 1 for the children only. Default: None (all)
+        :param limit: int: OPTIONAL: Page size of the requests. Default: None (server default)
+        :param workers: int: OPTIONAL: Number of requests in flight. Default: max_workers of the client
+        :param use_cql: bool: OPTIONAL: Fetch the subtree with CQL. Default: False
+        :return: A generator object for (page, depth, parent id) tuples, the children of the root have depth 1
+        """
+        if use_cql:
+            yield from self._walk_page_tree_cql(page_id, type, expand, max_depth, limit)
+            return
+
+        params = {}
+        if limit is not None:
+            params["limit"] = int(limit)
+        if expand is not None:
+            params["expand"] = expand
+
+        def _children(parent_id):
+            url = f"rest/api/content/{parent_id}/child/{type}"
+            return parent_id, list(self._get_paged(url, params=params, prefetch_pages=0))
+
+        frontier = [page_id]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for parent_id, children in fetch_ahead(_children, frontier, workers or self.max_workers, lambda _: False):
+                for child in children:
+                    next_frontier.append(child.get("id"))
+                    yield child, depth, parent_id
+            frontier = next_frontier
+
+    def _walk_page_tree_cql(self, page_id, type, expand, max_depth, limit):
+        params = {
+            "cql": f"ancestor = {page_id} and type = {type}",
+            "expand": ",".join(["ancestors"] + ([expand] if expand else [])),
+        }
+        if limit is not None:
+            params["limit"] = int(limit)
+        for page in self._get_paged("rest/api/content/search", params=params):
+            ancestor_ids = [str(ancestor.get("id")) for ancestor in page.get("ancestors") or []]
+            if str(page_id) not in ancestor_ids:
+                continue
+            # The ancestors are ordered from the top of the space down to the parent
+            depth = len(ancestor_ids) - ancestor_ids.index(str(page_id))
+            if max_depth is not None and depth > max_depth:
+                continue
+            yield page, depth, page["ancestors"][-1].get("id")
+
+    def get_subtree_of_content_ids(self, page_id, use_cql=False):
         """
         Get subtree of page ids
         :param page_id:
+        :param use_cql: OPTIONAL: Fetch the subtree with CQL, see walk_page_tree. Default: False
         :return: Set of page ID
         """
-        output = list()
-        output.append(page_id)
-        children_pages = self.get_page_child_by_type(page_id)
-        for page in children_pages:
-            child_subtree = self.get_subtree_of_content_ids(page.get("id"))
-            if child_subtree:
-                output.extend([p for p in child_subtree])
-        return set(output)
+        output = {page_id}
+        for page, _depth, _parent_id in self.walk_page_tree(page_id, use_cql=use_cql):
+            output.add(page.get("id"))
+        return output
 
     def set_inline_tasks_checkbox(self, page_id, task_id, status):
         """
@@ -3568,7 +4023,7 @@ class Confluence(AtlassianRestAPI):
 
         if 400 <= response.status_code < 600:
             try:
-                j = response.json()
+                j = self.json_codec.decode(response)
                 error_msg = j["message"]
             except Exception as e:
                 log.error(e)
@@ -0,0 +1,118 @@
+# coding=utf-8
+"""
+Local manifest of the pages and attachments published to Confluence.
+
+Pass a PageManifest as page_states to Confluence. The client records the title, version and body hash
+of every page it reads or writes, and the hash and version of every attachment it uploads. Publishing
+unchanged content again then costs no request at all.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class PageManifest(object):
+    """
+    page_states store kept in a JSON file.
+
+    Entries older than ttl are returned marked as stale: Confluence then checks them against the
+    server (one read of the page, or of the attachment metadata) before trusting them again.
+
+        manifest = PageManifest("manifest.json", ttl=7 * 86400)
+        confluence = Confluence(url, token=token, page_states=manifest)
+        for page in pages:
+            confluence.update_or_create(parent_id, page.title, page.body)
+            confluence.attach_file(page.image, page_id=...)
+        manifest.save()
+    """
+
+    def __init__(self, path=None, ttl=None, clock=time.time):
+        """
+        :param path: string: OPTIONAL: Path of the JSON file, loaded if it exists. Default: None (in memory)
+        :param ttl: float: OPTIONAL: Seconds after which an entry is checked against the server again.
+                    Default: None (entries don't go stale)
+        :param clock: Wall clock, time.time by default
+        """
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._titles = {}
+        if path is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f).get("entries") or {}
+            except FileNotFoundError:
+                pass
+        for key, entry in self._entries.items():
+            self._index(key, entry)
+
+    def _index(self, key, entry):
+        if entry.get("parent_id") is not None and entry.get("title") is not None:
+            self._titles[(str(entry["parent_id"]), entry["title"])] = key
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return str(key) in self._entries
+
+    def get(self, key, default=None):
+        """
+        :param key: The page id, or <page id>/attachment/<name> for an attachment
+        :return: dict: The entry, with "stale": True if it is older than the ttl, or default
+        """
+        with self._lock:
+            entry = self._entries.get(str(key))
+        if entry is None:
+            return default
+        entry = dict(entry)
+        checked_at = entry.pop("checked_at", None)
+        if self.ttl is not None and (checked_at is None or checked_at + self.ttl < self.clock()):
+            entry["stale"] = True
+        return entry
+
+    def __setitem__(self, key, entry):
+        entry = {k: v for k, v in entry.items() if k != "stale"}
+        entry["checked_at"] = self.clock()
+        with self._lock:
+            self._entries[str(key)] = entry
+            self._index(str(key), entry)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(str(key), None)
+            if entry is not None:
+                self._titles.pop((str(entry.get("parent_id")), entry.get("title")), None)
+        return default if entry is None else entry
+
+    def find(self, title, parent_id):
+        """
+        :param title: string: The title of a page
+        :param parent_id: The id of the parent page
+        :return: The id of the page with the title below the parent, or None if unknown or stale
+        """
+        with self._lock:
+            key = self._titles.get((str(parent_id), title))
+        if key is None:
+            return None
+        entry = self.get(key)
+        if entry is None or entry.get("stale") or entry.get("title") != title:
+            return None
+        return key
+
+    def save(self):
+        """
+        Write the manifest to its file, replacing it atomically.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            entries = dict(self._entries)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -1,12 +1,18 @@
 # coding=utf-8
+import itertools
 import logging
 import re
 import os
+import time
 from warnings import warn
 from deprecated import deprecated
-from requests import HTTPError
+from requests import HTTPError, Response
 
+from .bulk import BulkResultLog, is_retryable, run_bulk
 from .errors import ApiNotFoundError, ApiPermissionError
+from .jira_export import CsvExportWriter, ExportPage, TableExportWriter
+from .jira_metadata import JiraMetadataRegistry
+from .paging import fetch_ahead
 from .rest_client import AtlassianRestAPI
 
 log = logging.getLogger(__name__)
@@ -19,10 +25,16 @@ class Jira(AtlassianRestAPI):
     """
 
     def __init__(self, url, *args, **kwargs):
+        """
+        :param metadata_ttl: OPTIONAL: Seconds the global metadata (fields, statuses, priorities, ...)
+                             is memoized by self.metadata. Default: 0 (every call is sent to Jira)
+        """
         if "api_version" not in kwargs:
             kwargs["api_version"] = "2"
+        metadata_ttl = kwargs.pop("metadata_ttl", 0)
 
         super(Jira, self).__init__(url, *args, **kwargs)
+        self.metadata = JiraMetadataRegistry(self, ttl=metadata_ttl)
 
     def _get_paged(
         self,
@@ -32,6 +44,7 @@ class Jira(AtlassianRestAPI):
         flags=None,
         trailing=None,
         absolute=False,
+        prefetch_pages=None,
     ):
         """
         Used to get the paged data
@@ -42,6 +55,8 @@ class Jira(AtlassianRestAPI):
         :param flags: string[] (default is None):  The flags
         :param trailing: bool (default is None):   If True, a trailing slash is added to the url
         :param absolute: bool (default is False):  If True, the url is used absolute and not relative to the root
+        :param prefetch_pages: int (default is None): Number of pages to download ahead of the caller,
+                                                      defaults to the prefetch_pages of the client
 
         :return: A generator object for the data elements
         """
@@ -50,31 +65,34 @@ class Jira(AtlassianRestAPI):
             if params is None:
                 params = {}
 
-            while True:
-                response = super(Jira, self).get(
-                    url,
-                    trailing=trailing,
-                    params=params,
-                    data=data,
-                    flags=flags,
-                    absolute=absolute,
-                )
-                values = response.get("values", [])
-                for value in values:
-                    yield value
-
-                if response.get("isLast", False) or len(values) == 0:
-                    break
-
-                url = response.get("nextPage")
-                if url is None:
-                    break
-                # From now on we have absolute URLs with parameters
-                absolute = True
-                # Params are now provided by the url
-                params = {}
-                # Trailing should not be added as it is already part of the url
-                trailing = False
+            def _pages(url, params, trailing, absolute):
+                while True:
+                    response = super(Jira, self).get(
+                        url,
+                        trailing=trailing,
+                        params=params,
+                        data=data,
+                        flags=flags,
+                        absolute=absolute,
+                    )
+                    values = response.get("values", [])
+                    yield values
+
+                    if response.get("isLast", False) or len(values) == 0:
+                        break
+
+                    url = response.get("nextPage")
+                    if url is None:
+                        break
+                    # From now on we have absolute URLs with parameters
+                    absolute = True
+                    # Params are now provided by the url
+                    params = {}
+                    # Trailing should not be added as it is already part of the url
+                    trailing = False
+
+            for values in self._prefetch_pages(_pages(url, params, trailing, absolute), prefetch_pages):
+                yield from values
         else:
             raise ValueError("``_get_paged`` method is only available for Jira Cloud platform")
 
@@ -226,11 +244,24 @@ class Jira(AtlassianRestAPI):
         :param issue: str : jira issue key
         :return: list of integers attachment IDs
         """
-        issue_id = self.get_issue(issue)["fields"]["attachment"]
-        list_attachments_id = []
-        for attachment in issue_id:
-            list_attachments_id.append({"filename": attachment["filename"], "attachment_id": attachment["id"]})
-        return list_attachments_id
+        attachments = self.get_issue(issue, fields="attachment")["fields"]["attachment"]
+        return self._attachment_entries(attachments)
+
+    @staticmethod
+    def _attachment_entries(attachments):
+        """
+        :param attachments: The attachment field of an issue
+        :return: list of dicts with filename, attachment_id, size and content (the download url)
+        """
+        return [
+            {
+                "filename": attachment["filename"],
+                "attachment_id": attachment["id"],
+                "size": attachment.get("size"),
+                "content": attachment.get("content"),
+            }
+            for attachment in attachments or []
+        ]
 
     def get_attachment(self, attachment_id):
         """
@@ -251,6 +282,61 @@ class Jira(AtlassianRestAPI):
         """
         return self.download_attachments_from_issue(issue=issue, path=path, cloud=self.cloud)
 
+    def download_attachments(self, issues=None, jql=None, path=None, workers=None, skip_existing=True):
+        """
+        Download the attachments of many issues, one file at a time per worker, each streamed to disk.
+        The files are saved as <path>/<issue key>/<attachment id>_<filename>. A file is written under
+        a temporary name and renamed once complete, so an interrupted run can be restarted.
+        :param issues: OPTIONAL: list of issue keys
+        :param jql: OPTIONAL: JQL query selecting the issues
+        :param path: OPTIONAL: Directory of the files. Default: the current working directory
+        :param workers: OPTIONAL: Number of concurrent downloads. Default: max_workers of the client
+        :param skip_existing: OPTIONAL: Skip attachments whose file exists with the size of the attachment
+                              (or any size, if Jira doesn't report one). Jira exposes no checksum of the
+                              attachments, so a truncated or replaced file of the same size is not detected,
+                              pass False to download everything again. Default: True
+        :return: list of atlassian.bulk.BulkResult, key is the file path and result the number
+                 of bytes downloaded (None if the file was skipped)
+        """
+        if (issues is None) == (jql is None):
+            raise ValueError("Either issues or jql is required")
+        if path is None:
+            path = os.getcwd()
+        workers = workers or self.max_workers
+
+        if jql is not None:
+            listed = (
+                (issue["key"], self._attachment_entries(issue["fields"].get("attachment")))
+                for issue in self.jql_iter(jql, fields="attachment")
+            )
+        else:
+            listed = fetch_ahead(
+                lambda key: (key, self.get_attachments_ids_from_issue(key)), issues, workers, lambda _: False
+            )
+
+        def _files():
+            for key, attachments in listed:
+                for attachment in attachments:
+                    filename = os.path.basename(attachment["filename"].replace("\\", "/")) or "attachment"
+                    file_path = os.path.join(path, key, f"{attachment['attachment_id']}_{filename}")
+                    yield file_path, {"attachment": attachment}
+
+        def _download(file_path, attachment):
+            size = attachment.get("size")
+            if skip_existing and os.path.isfile(file_path) and (size is None or os.path.getsize(file_path) == size):
+                return None
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            part_path = f"{file_path}.part"
+            with open(part_path, "wb") as f:
+                if attachment.get("content"):
+                    written = self.download(attachment["content"], f, absolute=True)
+                else:
+                    written = self.get_attachment_content(attachment["attachment_id"], dest_fd=f)
+            os.replace(part_path, file_path)
+            return written
+
+        return list(run_bulk(_download, _files(), workers=workers, backoff=self._calculate_backoff_value))
+
     @deprecated(version="3.41.20", reason="Use download_issue_attachments instead")
     def download_attachments_from_issue(self, issue, path=None, cloud=True):
         """
@@ -268,18 +354,19 @@ class Jira(AtlassianRestAPI):
                 url = self.url + f"/secure/issueAttachments/{issue_id}.zip"
             else:
                 url = self.url + f"/secure/attachmentzip/{issue_id}.zip"
-            response = self._session.get(url)
             attachment_name = f"{issue_id}_attachments.zip"
             file_path = os.path.join(path, attachment_name)
-            # if Jira issue doesn't have any attachments _session.get
-            # request response will return 22 bytes of PKzip format
-            file_size = sum(len(chunk) for chunk in response.iter_content(8196))
-            if file_size == 22:
-                return "No attachments found on the Jira issue"
             if os.path.isfile(file_path):
                 return "File already exists"
-            with open(file_path, "wb") as f:
-                f.write(response.content)
+            part_path = f"{file_path}.part"
+            with open(part_path, "wb") as f:
+                file_size = self.download(url, f, absolute=True)
+            # if Jira issue doesn't have any attachments
+            # the response is an empty PKzip file of 22 bytes
+            if file_size == 22:
+                os.remove(part_path)
+                return "No attachments found on the Jira issue"
+            os.replace(part_path, file_path)
             return "Attachments downloaded successfully"
 
         except FileNotFoundError:
@@ -291,14 +378,19 @@ class Jira(AtlassianRestAPI):
         except Exception as e:
             raise e
 
-    def get_attachment_content(self, attachment_id):
+    def get_attachment_content(self, attachment_id, dest_fd=None, chunk_size=None):
         """
         Returns the content for an attachment
         :param attachment_id: int
-        :return: content as bytes
+        :param dest_fd: OPTIONAL: a file-like object to which the content is streamed in chunks,
+                        instead of being returned
+        :param chunk_size: int: OPTIONAL: download chunk size, used with dest_fd
+        :return: content as bytes, or the number of bytes written if dest_fd is given
         """
         base_url = self.resource_url("attachment")
         url = f"{base_url}/content/{attachment_id}"
+        if dest_fd is not None:
+            return self.download(url, dest_fd, chunk_size=chunk_size)
         return self.get(url, not_json_response=True)
 
     def remove_attachment(self, attachment_id):
@@ -476,13 +568,18 @@ class Jira(AtlassianRestAPI):
         url = f"/rest/troubleshooting/latest/support-zip/status/cluster/{cluster_task_id}"
         return self.get(url)
 
-    def download_support_zip(self, file_name):
+    def download_support_zip(self, file_name, dest_fd=None, chunk_size=None):
         """
         Download created support zip file
         :param file_name: str
-        :return: bytes of zip file
+        :param dest_fd: OPTIONAL: a file-like object to which the zip file is streamed in chunks,
+                        instead of being returned
+        :param chunk_size: int: OPTIONAL: download chunk size, used with dest_fd
+        :return: bytes of zip file, or the number of bytes written if dest_fd is given
         """
         url = f"/rest/troubleshooting/latest/support-zip/download/{file_name}"
+        if dest_fd is not None:
+            return self.download(url, dest_fd, chunk_size=chunk_size)
         return self.get(url, advanced_mode=True).content
 
     """
@@ -605,25 +702,37 @@ class Jira(AtlassianRestAPI):
         log.info('Creating component "%s"', component["name"])
         base_url = self.resource_url("component")
         url = f"{base_url}/"
-        return self.post(url, data=component)
+        try:
+            return self.post(url, data=component)
+        finally:
+            self.metadata.invalidate("components")
 
     def update_component(self, component, component_id):
         base_url = self.resource_url("component")
         url = f"{base_url}/{component_id}"
-        return self.put(url, data=component)
+        try:
+            return self.put(url, data=component)
+        finally:
+            self.metadata.invalidate("components")
 
     def delete_component(self, component_id):
         log.info('Deleting component "%s"', component_id)
         base_url = self.resource_url("component")
-        return self.delete(f"{base_url}/{component_id}")
+        try:
+            return self.delete(f"{base_url}/{component_id}")
+        finally:
+            self.metadata.invalidate("components")
 
     def update_component_lead(self, component_id, lead):
         data = {"id": component_id, "leadUserName": lead}
         base_url = self.resource_url("component")
-        return self.put(
-            f"{base_url}/{component_id}",
-            data=data,
-        )
+        try:
+            return self.put(
+                f"{base_url}/{component_id}",
+                data=data,
+            )
+        finally:
+            self.metadata.invalidate("components")
 
     """
     Configurations of Jira
@@ -683,6 +792,8 @@ class Jira(AtlassianRestAPI):
         Returns a list of all fields, both System and Custom
         :return: application/jsonContains a full representation of all visible fields in JSON.
         """
+        if not self.advanced_mode:
+            return list(self.metadata.fields())
         url = self.resource_url("field")
         return self.get(url)
 
@@ -700,7 +811,10 @@ class Jira(AtlassianRestAPI):
             data["search_key"] = search_key
         if description:
             data["description"] = description
-        return self.post(url, data=data)
+        try:
+            return self.post(url, data=data)
+        finally:
+            self.metadata.invalidate("fields")
 
     def get_custom_field_option_context(self, field_id, context_id):
         """
@@ -736,7 +850,10 @@ class Jira(AtlassianRestAPI):
             f"field/{field_id}/context/{context_id}/option",
             api_version=2,
         )
-        return self.post(url, data=data)
+        try:
+            return self.post(url, data=data)
+        finally:
+            self.metadata.invalidate("fields")
 
     """
     Dashboards
@@ -1133,29 +1250,82 @@ class Jira(AtlassianRestAPI):
             params["expand"] = expand
         return self.get(url, params=params)
 
-    def bulk_issue(self, issue_list, fields="*all"):
+    def bulk_issue(self, issue_list, fields="*all", chunk_size=100, workers=None):
         """
-        :param fields:
-        :param list issue_list:
-        :return:
+        Get many issues by key.
+        The keys are split into chunks of chunk_size, which are searched concurrently and paged fully.
+        The caller's list is not modified.
+        :param list issue_list: The issue keys, strings not looking like an issue key are ignored
+        :param fields: list of fields, for example: ['priority', 'summary', 'customfield_10007']
+        :param chunk_size: OPTIONAL: Number of keys per search request. Default: 100
+        :param workers: OPTIONAL: Number of chunks searched concurrently. Default: max_workers of the client
+        :return: (search result with all "issues", list of the keys which were not found).
+                 Issues which were moved to another project are returned with their new key,
+                 their old key is not reported as missing.
         """
         jira_issue_regex = re.compile(r"\w+-\d+")
-        missing_issues = list()
-        matched_issue_keys = list()
-        for key in issue_list:
-            if re.match(jira_issue_regex, key):
-                matched_issue_keys.append(key)
-        jql = f"key in ({', '.join(set(matched_issue_keys))})"
-        query_result = self.jql(jql, fields=fields)
-        if "errorMessages" in list(query_result.keys()):
-            for message in query_result["errorMessages"]:
-                for key in issue_list:
-                    if key in message:
-                        missing_issues.append(key)
-                        issue_list.remove(key)
-            query_result, missing_issues = self.bulk_issue(issue_list, fields)
+        keys = list(dict.fromkeys(key for key in issue_list if re.match(jira_issue_regex, key)))
+        chunks = [keys[i : i + chunk_size] for i in range(0, len(keys), chunk_size)]
+        if workers is None:
+            workers = self.max_workers
+
+        issues = []
+        missing_issues = []
+        for chunk_issues, chunk_missing in fetch_ahead(
+            lambda chunk: self._bulk_issue_chunk(chunk, fields), chunks, workers, lambda _: False
+        ):
+            issues.extend(chunk_issues)
+            missing_issues.extend(chunk_missing)
+        query_result = {"startAt": 0, "maxResults": len(issues), "total": len(issues), "issues": issues}
         return query_result, missing_issues
 
+    def _bulk_issue_chunk(self, keys, fields):
+        """
+        Search the issues of one chunk of keys
+        :param keys: list of issue keys
+        :param fields:
+        :return: (issues, missing keys)
+        """
+        missing = []
+        try:
+            issues = list(
+                self.jql_iter(f"key in ({', '.join(keys)})", fields=fields, page_size=len(keys), validate_query=False)
+            )
+        except HTTPError as e:
+            # Cloud rejects queries with unknown keys, the message names them: An issue with key 'FOO-1' does not exist
+            named = set(re.findall(r"'(\w+-\d+)'", str(e)))
+            missing = [key for key in keys if key in named]
+            if not missing:
+                raise
+            keys = [key for key in keys if key not in named]
+            if not keys:
+                return [], missing
+            issues = list(
+                self.jql_iter(f"key in ({', '.join(keys)})", fields=fields, page_size=len(keys), validate_query=False)
+            )
+        found = {issue["key"] for issue in issues}
+        not_found = [key for key in keys if key not in found]
+        moved = len(found.difference(keys))
+        for key in not_found:
+            # The search returns moved issues under their new key, look up which of the old keys they had
+            if moved and self._moved_issue_key(key) in found:
+                moved -= 1
+                continue
+            missing.append(key)
+        return issues, missing
+
+    def _moved_issue_key(self, key):
+        """
+        :param key: An issue key
+        :return: The current key of the issue, None if the issue doesn't exist
+        """
+        try:
+            return (self.get_issue(key, fields="key", update_history=False) or {}).get("key")
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
     def issue_createmeta(self, project, expand="projects.issuetypes.fields"):
         """
         This function is deprecated.
@@ -1328,23 +1498,72 @@ class Jira(AtlassianRestAPI):
             params=params,
         )
 
-    def bulk_update_issue_field(self, key_list, fields="*all"):
+    def bulk_update_issue_field(self, key_list, fields="*all", workers=None):
         """
         :param key_list: list of issues with common filed to be updated
         :param fields: common fields to be updated
-        return Boolean True/False
+        :param workers: OPTIONAL: Number of issues updated concurrently. Default: max_workers of the client
+        return Boolean True/False, True if all issues were updated.
+                See bulk_update_issues for the results per issue
         """
-        base_url = self.resource_url("issue")
-        try:
-            for key in key_list:
-                self.put(
-                    f"{base_url}/{key}",
-                    data={"fields": fields},
-                )
-        except Exception as e:
-            log.error(e)
-            return False
-        return True
+        results = self.bulk_update_issues(key_list, method="update_issue_field", workers=workers, fields=fields)
+        return all(result.ok for result in results)
+
+    _bulk_update_methods = ("update_issue_field", "edit_issue", "update_issue", "label_issue", "unlabel_issue")
+
+    def bulk_update_issues(
+        self,
+        updates,
+        method="update_issue_field",
+        workers=None,
+        result_log=None,
+        max_attempts=3,
+        **kwargs,
+    ):
+        """
+        Update many issues concurrently, with a result per issue.
+        A failed issue doesn't stop the others, errors of the transport (timeouts, 429, 5xx) are retried.
+        Jira has no generic bulk edit endpoint for arbitrary field updates, the issues are updated one by one.
+        :param updates: The issue keys, updated with the same kwargs, or a dict {issue key: kwargs of the issue}
+                        or (issue key, kwargs of the issue) pairs. The kwargs of an issue extend the common kwargs
+        :param method: OPTIONAL: The update method: update_issue_field, edit_issue, update_issue,
+                       label_issue or unlabel_issue. Default: update_issue_field
+        :param workers: OPTIONAL: Number of issues updated concurrently. Default: max_workers of the client
+        :param result_log: OPTIONAL: Path or atlassian.bulk.BulkResultLog. The results are appended to it and
+                           issues it records as updated are skipped, so an interrupted run can be resumed
+        :param max_attempts: OPTIONAL: Attempts per issue for transport errors. Default: 3
+        :param kwargs: The arguments of the update method shared by all issues, e.g. fields={"priority": ...}
+        :return: list of atlassian.bulk.BulkResult (key, ok, attempts, error, result) in the order of the updates
+        """
+        if method not in self._bulk_update_methods:
+            raise ValueError(f"Unsupported bulk update method {method}, use one of {self._bulk_update_methods}")
+        update = getattr(self, method)
+
+        def _operation(key, **issue_kwargs):
+            result = update(key, **issue_kwargs)
+            if isinstance(result, Response):
+                # advanced_mode doesn't raise
+                self.raise_for_status(result)
+            return result
+
+        if isinstance(updates, dict):
+            updates = updates.items()
+        items = (
+            (update_item, kwargs) if isinstance(update_item, str) else (update_item[0], dict(kwargs, **update_item[1]))
+            for update_item in updates
+        )
+        if isinstance(result_log, str):
+            result_log = BulkResultLog(result_log)
+        return list(
+            run_bulk(
+                _operation,
+                items,
+                workers=workers or self.max_workers,
+                result_log=result_log,
+                max_attempts=max_attempts,
+                backoff=self._calculate_backoff_value,
+            )
+        )
 
     def issue_field_value_append(self, issue_id_or_key, field, value, notify_users=True):
         """
@@ -1609,16 +1828,130 @@ class Jira(AtlassianRestAPI):
             params["updateHistory"] = "false"
         return self.post(url, params=params, data=data)
 
-    def create_issues(self, list_of_issues_data):
+    def create_issues(self, list_of_issues_data, chunk_size=50, workers=None, max_attempts=3):
         """
         Creates issues or sub-tasks from a JSON representation
-        Creates many issues in one bulk operation
-        :param list_of_issues_data: list of JSON data
-        :return:
+        Creates many issues in bulk operations of chunk_size issues, submitted concurrently.
+        Issues failing with a transient error (connection error, 429, 5xx) are submitted again,
+        issues failing validation are not.
+        :param list_of_issues_data: iterable of JSON data, e.g. a list or a generator
+        :param chunk_size: OPTIONAL: Issues per request, Jira accepts at most 50. Default: 50
+        :param workers: OPTIONAL: Number of concurrent requests. Default: max_workers of the client
+        :param max_attempts: OPTIONAL: Attempts per issue for transient errors. Default: 3
+        :return: dict {"issues": [...], "errors": [...], "unknown": [...]} like the response of a single
+                 bulk request. Every created issue has an "elementNumber" and every error a
+                 "failedElementNumber", the index of the issue in list_of_issues_data. Both lists are
+                 ordered by it. If Jira reports an error without element number and not all the other
+                 issues of the request were created, the created issues of that request can't be matched
+                 to the input: they get an elementNumber None, the error a failedElementNumber None and
+                 the indexes of the issues of the request which didn't fail with a number are listed in
+                 "unknown".
         """
         url = self.resource_url("issue/bulk")
-        data = {"issueUpdates": list_of_issues_data}
-        return self.post(url, data=data)
+        issues, errors, unknown = [], [], []
+
+        def _chunks(items):
+            chunk = []
+            for item in items:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        pending = enumerate(list_of_issues_data)
+        attempt = 1
+        while True:
+            retry = []
+            for chunk, (created, failed, unmatched) in fetch_ahead(
+                lambda chunk: (chunk, self._create_issues_chunk(url, chunk)),
+                _chunks(pending),
+                workers or self.max_workers,
+                lambda _: False,
+            ):
+                issues.extend(created)
+                unknown.extend(unmatched)
+                data = dict(chunk)
+                for error in failed:
+                    status = error.get("status")
+                    if error["failedElementNumber"] is None:
+                        errors.append(error)
+                    elif attempt < max_attempts and (status is None or status == 429 or status >= 500):
+                        retry.append((error["failedElementNumber"], data[error["failedElementNumber"]]))
+                    else:
+                        errors.append(error)
+            if not retry:
+                break
+            log.warning("Retrying the creation of %s issues", len(retry))
+            time.sleep(self._calculate_backoff_value(attempt))
+            pending = sorted(retry, key=lambda item: item[0])
+            attempt += 1
+
+        def _number(key):
+            # The unmatched ones last
+            return lambda item: (item[key] is None, item[key] or 0)
+
+        return {
+            "issues": sorted(issues, key=_number("elementNumber")),
+            "errors": sorted(errors, key=_number("failedElementNumber")),
+            "unknown": sorted(unknown),
+        }
+
+    def _create_issues_chunk(self, url, chunk):
+        """
+        Submit one bulk create request.
+        :param url: The issue/bulk url
+        :param chunk: list of (index, JSON data) pairs
+        :return: (created issues, errors, indexes of the issues which can't be matched to the response),
+                 numbered with the indexes of the chunk
+        """
+
+        def _error(index, status, message):
+            return {
+                "status": status,
+                "elementErrors": {"errorMessages": [message], "errors": {}},
+                "failedElementNumber": index,
+            }
+
+        try:
+            response = self.post(url, data={"issueUpdates": [data for _, data in chunk]}, advanced_mode=True)
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            return [], [_error(index, None, str(e)) for index, _ in chunk], []
+        try:
+            body = self.json_codec.decode(response)
+        except ValueError:
+            body = None
+        if not isinstance(body, dict) or ("issues" not in body and not isinstance(body.get("errors"), list)):
+            # Not a (partial) bulk result
+            if response.status_code == 429 or response.status_code >= 500:
+                return [], [_error(index, response.status_code, response.text) for index, _ in chunk], []
+            self.raise_for_status(response)
+            body = {}
+
+        errors = []
+        unnumbered = []
+        for error in body.get("errors") or []:
+            position = error.get("failedElementNumber")
+            if position is None or not 0 <= position < len(chunk):
+                unnumbered.append(error)
+                continue
+            errors.append(dict(error, failedElementNumber=chunk[position][0]))
+        failed = {error.get("failedElementNumber") for error in body.get("errors") or []}
+        created_indexes = [index for position, (index, _) in enumerate(chunk) if position not in failed]
+        created = body.get("issues") or []
+        if unnumbered:
+            # The created issues only carry an id and a key, they match the remaining positions only
+            # if none of them failed with the errors without number
+            errors.extend(dict(error, failedElementNumber=None) for error in unnumbered)
+            if len(created) != len(created_indexes):
+                log.error("Bulk create errors without element number: %s", unnumbered)
+                issues = [dict(issue, elementNumber=None) for issue in created]
+                return issues, errors, created_indexes
+        issues = [dict(issue, elementNumber=index) for index, issue in zip(created_indexes, created)]
+        return issues, errors, []
 
     # @todo refactor and merge with create_issue method
     def issue_create(self, fields):
@@ -1737,41 +2070,90 @@ class Jira(AtlassianRestAPI):
             url += "/" + internal_id
         return self.get(url, params=params)
 
+    def get_issue_graph(
+        self,
+        issue_keys,
+        directions=("inward",),
+        subtasks=True,
+        link_types=None,
+        max_depth=None,
+        chunk_size=100,
+        workers=None,
+    ):
+        """
+        Walk the issues reachable from the given issues through issue links and subtasks, level by level.
+        Each level is fetched with "key in (...)" searches of chunk_size keys, requesting only the
+        issuelinks and subtasks fields, so the walk costs one search per chunk of a level.
+        (!) Only issues visible to the user are expanded, the others appear as children only.
+        :param issue_keys: The key of the root issue or a list of keys
+        :param directions: OPTIONAL: The link directions to follow, "inward" and/or "outward". Default: ("inward",)
+        :param subtasks: OPTIONAL: Follow the subtasks. Default: True
+        :param link_types: OPTIONAL: Names of the link types to follow, e.g. ["Blocks"]. Default: all
+        :param max_depth: OPTIONAL: Number of levels to expand below the roots. Default: unlimited
+        :param chunk_size: OPTIONAL: Number of keys per search request. Default: 100
+        :param workers: OPTIONAL: Number of chunks searched concurrently. Default: max_workers of the client
+        :return: dict {issue key: [child issue keys]} of the expanded issues, in breadth-first order
+        """
+        if isinstance(issue_keys, str):
+            issue_keys = [issue_keys]
+        link_keys = [f"{direction}Issue" for direction in directions]
+        graph = {}
+        visited = set(issue_keys)
+        frontier = list(dict.fromkeys(issue_keys))
+        depth = 0
+        while frontier and (max_depth is None or depth <= max_depth):
+            result, _ = self.bulk_issue(frontier, fields="issuelinks,subtasks", chunk_size=chunk_size, workers=workers)
+            issues = {issue["key"]: issue for issue in result["issues"]}
+            next_frontier = []
+            for key in frontier:
+                issue = issues.get(key)
+                if issue is None:
+                    continue
+                fields = issue.get("fields") or {}
+                children = []
+                for link in fields.get("issuelinks") or []:
+                    if link_types is not None and (link.get("type") or {}).get("name") not in link_types:
+                        continue
+                    for link_key in link_keys:
+                        if link.get(link_key):
+                            children.append(link[link_key]["key"])
+                if subtasks:
+                    children.extend(subtask["key"] for subtask in fields.get("subtasks") or [] if subtask.get("key"))
+                graph[key] = children
+                for child in children:
+                    if child not in visited:
+                        visited.add(child)
+                        next_frontier.append(child)
+            frontier = next_frontier
+            depth += 1
+        return graph
+
     def get_issue_tree_recursive(self, issue_key, tree=None, depth=None):
         """
         Returns a list that contains the tree structure of the root issue, with all subtasks and inward linked issues.
         (!) Function only returns child issues from the same Jira instance or from an instance to which the API key has access.
+        See get_issue_graph, which this function uses, for an adjacency structure.
         :param issue_key: Jira issue key
-        :param tree: list to store the tree structure for recursion. Do not change it.
-        :param depth: current depth of the tree for recursion. Do not change it.
-        :return: list of dictionaries containing the tree structure. Dictionary element contains a key (parent issue) and value (child issue).
+        :param tree: OPTIONAL: list to which the tree structure is appended
+        :param depth: Not used anymore, kept for compatibility
+        :return: list of dictionaries containing the tree structure, in depth-first order. Dictionary element contains a key (parent issue) and value (child issue).
         """
         if tree is None:
             tree = []
-        if depth is None:
-            depth = 0
-        # Check the recursion depth. In case of any bugs that would result in infinite recursion, this will prevent the function from crashing your app. Python default for REcursionError  is 1000
-        if depth > 150:
-            raise Exception("Recursion depth exceeded")
-        issue = self.get_issue(issue_key)
-        issue_links = issue["fields"]["issuelinks"]
-        subtasks = issue["fields"]["subtasks"]
-        for issue_link in issue_links:
-            if issue_link.get("inwardIssue") is not None:
-                parent_issue_key = issue["key"]
-                if not [
-                    x for x in tree if issue_link["inwardIssue"]["key"] in list(x.keys())
-                ]:  # condition to avoid infinite recursion
-                    tree.append({parent_issue_key: issue_link["inwardIssue"]["key"]})
-                    self.get_issue_tree_recursive(
-                        issue_link["inwardIssue"]["key"], tree, depth + 1
-                    )  # recursive call of the function
-        for subtask in subtasks:
-            if subtask.get("key") is not None:
-                parent_issue_key = issue["key"]
-                if not [x for x in tree if subtask["key"] in list(x.keys())]:
-                    tree.append({parent_issue_key: subtask["key"]})
-                    self.get_issue_tree_recursive(subtask["key"], tree, depth + 1)
+        graph = self.get_issue_graph(issue_key)
+        seen = {issue_key}
+        # The graph is fetched level by level, the tree keeps the depth-first order of the former recursion
+        stack = [(issue_key, iter(graph.get(issue_key, [])))]
+        while stack:
+            parent, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+            elif child not in seen:
+                # Every issue is attached to the tree once
+                seen.add(child)
+                tree.append({parent: child})
+                stack.append((child, iter(graph.get(child, []))))
         return tree
 
     def create_or_update_issue_remote_links(
@@ -1853,13 +2235,14 @@ class Jira(AtlassianRestAPI):
 
     def get_issue_transitions(self, issue_key):
         if self.advanced_mode:
+            transitions = self.json_codec.decode(self.get_issue_transitions_full(issue_key)) or {}
             return [
                 {
                     "name": transition["name"],
                     "id": int(transition["id"]),
                     "to": transition["to"]["name"],
                 }
-                for transition in (self.get_issue_transitions_full(issue_key).json() or {}).get("transitions")
+                for transition in transitions.get("transitions")
             ]
         else:
             return [
@@ -2531,6 +2914,8 @@ class Jira(AtlassianRestAPI):
         :param key: str
         :return:
         """
+        if not self.advanced_mode:
+            return list(self.metadata.components(key))
         base_url = self.resource_url("project")
         url = f"{base_url}/{key}/components"
         return self.get(url)
@@ -2946,6 +3331,8 @@ class Jira(AtlassianRestAPI):
         """
         Return all issue types
         """
+        if not self.advanced_mode:
+            return list(self.metadata.issue_types())
         url = self.resource_url("issuetype")
         return self.get(url)
 
@@ -2959,7 +3346,10 @@ class Jira(AtlassianRestAPI):
         """
         data = {"name": name, "description": description, "type": type}
         url = self.resource_url("issuetype")
-        return self.post(url, data=data)
+        try:
+            return self.post(url, data=data)
+        finally:
+            self.metadata.invalidate("issue_types")
 
     def get_all_custom_fields(self):
         """
@@ -3053,6 +3443,10 @@ class Jira(AtlassianRestAPI):
         return self.get(url)
 
     def get_status_id_from_name(self, status_name):
+        if not self.advanced_mode:
+            status_id = self.metadata.statuses().id_of(status_name)
+            if status_id is not None:
+                return int(status_id)
         base_url = self.resource_url("status")
         url = f"{base_url}/{status_name}"
         return int(self._get_response_content(url, fields=[("id",)]))
@@ -3155,6 +3549,8 @@ class Jira(AtlassianRestAPI):
         Each issue link type has an id,
         a name and a label for the outward and inward link relationship.
         """
+        if not self.advanced_mode:
+            return list(self.metadata.link_types())
         url = self.resource_url("issueLinkType")
         return self._get_response_content(url, fields=[("issueLinkTypes",)])
 
@@ -3176,7 +3572,10 @@ class Jira(AtlassianRestAPI):
         :return:
         """
         url = self.resource_url("issueLinkType")
-        return self.post(url, data=data)
+        try:
+            return self.post(url, data=data)
+        finally:
+            self.metadata.invalidate("link_types")
 
     def create_issue_link_type(self, link_type_name, inward, outward):
         """Create a new issue link type.
@@ -3201,7 +3600,10 @@ class Jira(AtlassianRestAPI):
         """Delete the specified issue link type."""
         base_url = self.resource_url("issueLinkType")
         url = f"{base_url}/{issue_link_type_id}"
-        return self.delete(url)
+        try:
+            return self.delete(url)
+        finally:
+            self.metadata.invalidate("link_types")
 
     def update_issue_link_type(self, issue_link_type_id, data):
         """
@@ -3216,7 +3618,10 @@ class Jira(AtlassianRestAPI):
         """
         base_url = self.resource_url("issueLinkType")
         url = f"{base_url}/{issue_link_type_id}"
-        return self.put(url, data=data)
+        try:
+            return self.put(url, data=data)
+        finally:
+            self.metadata.invalidate("link_types")
 
     """
     Resolution
@@ -3228,6 +3633,8 @@ class Jira(AtlassianRestAPI):
         Returns a list of all resolutions.
         :return:
         """
+        if not self.advanced_mode:
+            return list(self.metadata.resolutions())
         url = self.resource_url("resolution")
         return self.get(url)
 
@@ -3441,9 +3848,12 @@ class Jira(AtlassianRestAPI):
         limit=None,
         expand=None,
         validate_query=None,
+        workers=None,
     ):
         """
         Get issues from jql search result with all related fields
+        If no limit is given all issues are fetched, the remaining pages are requested
+        concurrently once the first page reported the total.
         :param jql:
         :param fields: list of fields, for example: ['priority', 'summary', 'customfield_10007']
         :param start: OPTIONAL: The start point of the collection to return. Default: 0.
@@ -3451,6 +3861,7 @@ class Jira(AtlassianRestAPI):
                 fixed system limits. Default by built-in method: 50
         :param expand: OPTIONAL: expand the search result
         :param validate_query: Whether to validate the JQL query
+        :param workers: OPTIONAL: Number of pages requested concurrently. Default: max_workers of the client
         :return:
         """
         if self.cloud:
@@ -3481,22 +3892,22 @@ class Jira(AtlassianRestAPI):
             params["validateQuery"] = validate_query
         url = self.resource_url("search")
 
-        results = []
-        while True:
+        if limit is not None:
             params["startAt"] = int(start)
             response = self.get(url, params=params)
-            if not response:
-                break
-
-            issues = response["issues"]
-            results.extend(issues)
-            total = int(response["total"])
-            # #print("DBG: response: total={total} start={startAt} max={maxResults}".format(**response))
-            # If we don't have a limit, and there's more to fetch, keep looping
-            if limit is not None or total <= len(response["issues"]) + start:
-                break
-            start += len(issues)
-        return results
+            return response["issues"] if response else []
+
+        return list(
+            self._get_paged_concurrently(
+                url,
+                params=params,
+                results_key="issues",
+                start_param="startAt",
+                limit_param="maxResults",
+                start=start,
+                workers=workers,
+            )
+        )
 
     def enhanced_jql_get_list_of_tickets(
         self,
@@ -3552,6 +3963,104 @@ class Jira(AtlassianRestAPI):
                 break
         return results
 
+    def jql_iter(
+        self,
+        jql,
+        fields="*all",
+        start=0,
+        limit=None,
+        page_size=None,
+        expand=None,
+        validate_query=None,
+        prefetch_pages=None,
+    ):
+        """
+        Iterate over the issues of a jql search, page by page as they arrive,
+        without holding the whole result set in memory.
+        Uses startAt/total paging on Server/DC and nextPageToken paging on Cloud.
+        :param jql:
+        :param fields: list of fields, for example: ['priority', 'summary', 'customfield_10007']
+        :param start: OPTIONAL: The start point of the collection to return. Default: 0.
+                Cloud only supports 0.
+        :param limit: OPTIONAL: Maximum number of issues to yield. Default: all
+        :param page_size: OPTIONAL: Number of issues requested per page, this may be restricted by
+                fixed system limits. Default: the server default
+        :param expand: OPTIONAL: expand the search result
+        :param validate_query: OPTIONAL: Whether to validate the JQL query (Server/DC only)
+        :param prefetch_pages: OPTIONAL: Number of pages to download ahead of the caller,
+                defaults to the prefetch_pages of the client
+        :return: A generator object for the issues
+        """
+        if self.cloud and start:
+            raise ValueError("Jira Cloud search doesn't support a start offset, use nextPageToken paging")
+        params = {}
+        if fields is not None:
+            if isinstance(fields, (list, tuple, set)):
+                fields = ",".join(fields)
+            params["fields"] = fields
+        if jql is not None:
+            params["jql"] = jql
+        if expand is not None:
+            params["expand"] = expand
+        if validate_query is not None and not self.cloud:
+            params["validateQuery"] = validate_query
+
+        def _page_size(fetched):
+            if limit is None:
+                return page_size
+            remaining = limit - fetched
+            return remaining if page_size is None else min(page_size, remaining)
+
+        def _cloud_pages():
+            url = self.resource_url("search/jql")
+            fetched = 0
+            next_page_token = None
+            while limit is None or fetched < limit:
+                page_params = dict(params)
+                if next_page_token is not None:
+                    page_params["nextPageToken"] = next_page_token
+                size = _page_size(fetched)
+                if size is not None:
+                    page_params["maxResults"] = int(size)
+                response = self.get(url, params=page_params)
+                if not response:
+                    return
+                issues = response.get("issues") or []
+                fetched += len(issues)
+                yield issues
+                next_page_token = response.get("nextPageToken")
+                if not next_page_token or not issues:
+                    return
+
+        def _server_pages():
+            url = self.resource_url("search")
+            fetched = 0
+            start_at = int(start or 0)
+            while limit is None or fetched < limit:
+                page_params = dict(params, startAt=start_at)
+                size = _page_size(fetched)
+                if size is not None:
+                    page_params["maxResults"] = int(size)
+                response = self.get(url, params=page_params)
+                if not response:
+                    return
+                issues = response.get("issues") or []
+                fetched += len(issues)
+                yield issues
+                start_at += len(issues)
+                total = response.get("total")
+                if not issues or (total is not None and start_at >= int(total)):
+                    return
+
+        pages = _cloud_pages() if self.cloud else _server_pages()
+        count = 0
+        for issues in self._prefetch_pages(pages, prefetch_pages):
+            for issue in issues:
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                yield issue
+
     def csv(self, jql, limit=1000, all_fields=True, start=None, delimiter=None):
         """
             Get issues from jql search result with ALL or CURRENT fields
@@ -3642,11 +4151,76 @@ class Jira(AtlassianRestAPI):
             headers={"Accept": "application/xhtml+xml"},
         )
 
+    def export_issues(
+        self,
+        jql,
+        dest_fd,
+        export_format="csv",
+        all_fields=True,
+        page_size=1000,
+        limit=None,
+        delimiter=None,
+        workers=1,
+    ):
+        """
+        Export the issues of a jql search to a file, page by page.
+        Pages of page_size issues are requested with pager/start until a page isn't full,
+        so any number of issues can be exported while only a few pages are held in memory.
+        The CSV header is written once, the rows of HTML and Excel pages go into the table of the first page.
+        :param jql: JQL query
+        :param dest_fd: a file-like object opened for binary writing
+        :param export_format: OPTIONAL: csv, excel or html. Default: csv
+        :param all_fields: OPTIONAL: To export all fields or current fields only. Default: True
+        :param page_size: OPTIONAL: Issues per request (tempMax), must not exceed the limit of the
+                          server (jira.search.views.default.max). Default: 1000
+        :param limit: OPTIONAL: Maximum number of issues to export. Default: all
+        :param delimiter: OPTIONAL: The delimiter of a CSV export
+        :param workers: OPTIONAL: Number of pages requested concurrently. Default: 1
+        :return: Number of exported issues
+        """
+        if export_format == "csv":
+            writer = CsvExportWriter(dest_fd, delimiter=delimiter)
+
+            def _export(start, size):
+                return self.csv(jql, limit=size, all_fields=all_fields, start=start, delimiter=delimiter)
+
+        elif export_format in ("excel", "html"):
+            writer = TableExportWriter(dest_fd)
+            export = self.excel if export_format == "excel" else self.export_html
+
+            def _export(start, size):
+                return export(jql, limit=size, all_fields=all_fields, start=start)
+
+        else:
+            raise ValueError(f"Unknown export format {export_format}, use csv, excel or html")
+
+        def _page(start):
+            size = page_size if limit is None else min(page_size, limit - start)
+            content = _export(start, size)
+            if isinstance(content, Response):
+                self.raise_for_status(content)
+                content = content.content
+            rows, data = writer.parse(content)
+            return ExportPage(start, size, rows, data)
+
+        def _is_last(page):
+            return page.rows < page.requested or (limit is not None and page.start + page.requested >= limit)
+
+        starts = itertools.count(0, page_size) if limit is None else range(0, limit, page_size)
+        exported = 0
+        for page in fetch_ahead(_page, starts, workers or 1, _is_last):
+            writer.write(page.data)
+            exported += page.rows
+        writer.close()
+        return exported
+
     def get_all_priorities(self):
         """
         Returns a list of all priorities.
         :return:
         """
+        if not self.advanced_mode:
+            return list(self.metadata.priorities())
         url = self.resource_url("priority")
         return self.get(url)
 
@@ -3704,6 +4278,8 @@ api-group-workflows/#api-rest-api-2-workflow-search-get)
         Returns a list of all statuses
         :return:
         """
+        if not self.advanced_mode:
+            return list(self.metadata.statuses())
         url = self.resource_url("status")
         return self.get(url)
 
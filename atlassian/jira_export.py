@@ -0,0 +1,156 @@
+# coding=utf-8
+"""
+Stitching of the pages of the Jira issue exports (CSV, Excel and HTML) into one file.
+"""
+
+import csv
+import io
+import logging
+import re
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+# One page of an export, data is prepared by the writer of the format
+ExportPage = namedtuple("ExportPage", ["start", "requested", "rows", "data"])
+
+
+class CsvExportWriter(object):
+    """
+    Writes CSV pages to a file, with the header of the first page only.
+
+    The all fields export repeats columns like Comment or Labels as often as the issues of the page
+    need them, so the header can differ between pages. The rows of such pages are mapped to the columns
+    of the first page by name and occurrence, values of columns the first page doesn't have are dropped.
+    The current fields export has the same columns on every page.
+    """
+
+    def __init__(self, dest_fd, delimiter=None):
+        """
+        :param dest_fd: a file-like object opened for binary writing
+        :param delimiter: The delimiter of the export. Default: ","
+        """
+        self.dest_fd = dest_fd
+        self.delimiter = delimiter or ","
+        self.header = None
+        self.lineterminator = "\n"
+        self._ends_with_newline = True
+        self._dropped = set()
+
+    def parse(self, content):
+        """
+        :param content: bytes: The export of one page
+        :return: (number of issues, page data)
+        """
+        text = content.decode("utf-8-sig")
+        records = [record for record in csv.reader(io.StringIO(text, newline=""), delimiter=self.delimiter) if record]
+        if not records:
+            return 0, (content, text, None, [])
+        return len(records) - 1, (content, text, records[0], records[1:])
+
+    def write(self, data):
+        content, text, header, rows = data
+        if header is None:
+            return
+        if self.header is None:
+            self.header = header
+            first_line_end = text.find("\n")
+            if first_line_end > 0 and text[first_line_end - 1] == "\r":
+                self.lineterminator = "\r\n"
+            self._write(content)
+            return
+        if not self._ends_with_newline:
+            self._write(self.lineterminator.encode("utf-8"))
+        if header == self.header and not any("\n" in name for name in header):
+            self._write(text[text.index("\n") + 1 :].encode("utf-8"))
+            return
+        self._write(self._remap(header, rows).encode("utf-8"))
+
+    def _remap(self, header, rows):
+        positions = {}
+        for index, name in enumerate(self.header):
+            positions.setdefault(name, []).append(index)
+        mapping = []
+        seen = {}
+        for name in header:
+            occurrence = seen.get(name, 0)
+            seen[name] = occurrence + 1
+            targets = positions.get(name, [])
+            if occurrence < len(targets):
+                mapping.append(targets[occurrence])
+            else:
+                mapping.append(None)
+                if name not in self._dropped:
+                    self._dropped.add(name)
+                    log.warning("Column %s is missing in the header of the first page, its values are dropped", name)
+        out = io.StringIO()
+        writer = csv.writer(out, delimiter=self.delimiter, lineterminator=self.lineterminator)
+        for row in rows:
+            values = [""] * len(self.header)
+            for target, value in zip(mapping, row):
+                if target is not None:
+                    values[target] = value
+            writer.writerow(values)
+        return out.getvalue()
+
+    def _write(self, chunk):
+        if chunk:
+            self.dest_fd.write(chunk)
+            self._ends_with_newline = chunk.endswith(b"\n")
+
+    def close(self):
+        pass
+
+
+class TableExportWriter(object):
+    """
+    Writes HTML pages (the HTML and the Excel export, which is HTML as well) to a file.
+
+    The document of the first page is kept, the rows of the issue table of the following pages
+    are inserted into its table.
+    """
+
+    _table = re.compile(r"<table[^>]*\bid=[\"']issuetable[\"']", re.IGNORECASE)
+    _body_start = re.compile(r"<tbody[^>]*>", re.IGNORECASE)
+    _body_end = re.compile(r"</tbody\s*>", re.IGNORECASE)
+    _row = re.compile(r"<tr[\s>]", re.IGNORECASE)
+
+    def __init__(self, dest_fd):
+        """
+        :param dest_fd: a file-like object opened for binary writing
+        """
+        self.dest_fd = dest_fd
+        self._tail = None
+        self._started = False
+
+    def parse(self, content):
+        """
+        :param content: bytes: The export of one page
+        :return: (number of issues, page data)
+        """
+        text = content.decode("utf-8")
+        table = self._table.search(text)
+        body_start = table and self._body_start.search(text, table.end())
+        body_end = body_start and self._body_end.search(text, body_start.end())
+        if not body_end:
+            # No issue table, e.g. a page without issues
+            return 0, (text, None, None)
+        body = (body_start.end(), body_end.start())
+        return len(self._row.findall(text, *body)), (text, body[0], body[1])
+
+    def write(self, data):
+        text, body_start, body_end = data
+        if not self._started:
+            self._started = True
+            if body_start is None:
+                self.dest_fd.write(text.encode("utf-8"))
+                return
+            self.dest_fd.write(text[:body_end].encode("utf-8"))
+            self._tail = text[body_end:]
+        elif body_start is not None and self._tail is not None:
+            self.dest_fd.write(text[body_start:body_end].encode("utf-8"))
+
+    def close(self):
+        if self._tail is not None:
+            self.dest_fd.write(self._tail.encode("utf-8"))
+            self._tail = None
@@ -0,0 +1,176 @@
+# coding=utf-8
+"""
+Memoized Jira metadata (fields, statuses, priorities, ...) with indexed lookups.
+"""
+
+import copy
+import threading
+import time
+
+
+class MetadataIndex(object):
+    """
+    A list of metadata objects indexed by id and by name (case insensitive).
+
+    The index is shared by all users of a registry, so it hands out shallow copies of the objects:
+    their keys can be changed, the nested values (e.g. the schema of a field) are shared and must
+    not be mutated.
+    """
+
+    def __init__(self, items, id_key="id", name_key="name"):
+        self._items = list(items or [])
+        self._by_id = {}
+        self._by_name = {}
+        for item in self._items:
+            if item.get(id_key) is not None:
+                self._by_id[str(item[id_key])] = item
+            name = item.get(name_key)
+            if name is not None:
+                # First one wins, like a linear search over the list would
+                self._by_name.setdefault(str(name).lower(), item)
+
+    @property
+    def items(self):
+        """
+        :return: list: Shallow copies of the objects
+        """
+        return [copy.copy(item) for item in self._items]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, item_id, default=None):
+        """
+        :param item_id: The id of the object
+        :return: A shallow copy of the object or default
+        """
+        item = self._by_id.get(str(item_id))
+        return default if item is None else copy.copy(item)
+
+    def by_name(self, name, default=None):
+        """
+        :param name: string: The name of the object, case insensitive
+        :return: A shallow copy of the object or default
+        """
+        item = self._by_name.get(str(name).lower())
+        return default if item is None else copy.copy(item)
+
+    def id_of(self, name, default=None):
+        """
+        :param name: string: The name of the object, case insensitive
+        :return: The id of the object or default
+        """
+        item = self._by_name.get(str(name).lower())
+        return default if item is None else item["id"]
+
+
+class JiraMetadataRegistry(object):
+    """
+    Per client cache of the global Jira metadata.
+
+    Every kind is loaded on first use and kept for ttl seconds. The Jira methods changing metadata
+    (e.g. create_custom_field) invalidate the affected kind once the change is sent, changes made elsewhere
+    are picked up after the ttl or an explicit invalidate(). A load running during an invalidation
+    is returned to its caller but not memoized.
+    """
+
+    def __init__(self, jira, ttl=0, clock=time.monotonic):
+        """
+        :param jira: The Jira client
+        :param ttl: float: Seconds the metadata is kept. 0 or None disables the memoization, the default
+        :param clock: Monotonic clock, time.monotonic by default
+        """
+        self.jira = jira
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Incremented by every invalidate, so a load which started before is not memoized
+        self._generation = 0
+
+    def _load(self, kind, *args):
+        jira = self.jira
+        if kind == "fields":
+            return jira.get(jira.resource_url("field"))
+        if kind == "statuses":
+            return jira.get(jira.resource_url("status"))
+        if kind == "priorities":
+            return jira.get(jira.resource_url("priority"))
+        if kind == "resolutions":
+            return jira.get(jira.resource_url("resolution"))
+        if kind == "issue_types":
+            return jira.get(jira.resource_url("issuetype"))
+        if kind == "link_types":
+            return (jira.get(jira.resource_url("issueLinkType")) or {}).get("issueLinkTypes")
+        if kind == "components":
+            return jira.get(f"{jira.resource_url('project')}/{args[0]}/components")
+        raise ValueError(f"Unknown metadata kind {kind}")
+
+    def index(self, kind, *args):
+        """
+        Get the memoized index of a kind of metadata, loading it if missing or expired.
+
+        :param kind: string: fields, statuses, priorities, resolutions, issue_types, link_types or components
+        :param args: The project key for components
+        :return: MetadataIndex
+        """
+        key = (kind,) + args
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry is not None and now < entry[0]:
+            return entry[1]
+        index = MetadataIndex(self._load(kind, *args))
+        if self.ttl:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttl, index)
+        return index
+
+    def invalidate(self, kind=None, *args):
+        """
+        Drop memoized metadata.
+
+        :param kind: string: The kind to drop, all kinds if None
+        :param args: The project key for components, all projects if omitted
+        """
+        with self._lock:
+            self._generation += 1
+            if kind is None:
+                self._entries.clear()
+                return
+            prefix = (kind,) + args
+            for key in [key for key in self._entries if key[: len(prefix)] == prefix]:
+                del self._entries[key]
+
+    def fields(self):
+        return self.index("fields")
+
+    def statuses(self):
+        return self.index("statuses")
+
+    def priorities(self):
+        return self.index("priorities")
+
+    def resolutions(self):
+        return self.index("resolutions")
+
+    def issue_types(self):
+        return self.index("issue_types")
+
+    def link_types(self):
+        return self.index("link_types")
+
+    def components(self, project_key):
+        return self.index("components", project_key)
+
+    def field_id(self, name, default=None):
+        """
+        :param name: string: The name of a field, e.g. "Story Points"
+        :return: The id of the field, e.g. "customfield_10002", or default
+        """
+        return self.fields().id_of(name, default)
@@ -0,0 +1,484 @@
+# coding=utf-8
+"""
+Incremental synchronisation of the issues of a JQL query and of the worklogs.
+
+A checkpoint (the highest ``updated`` timestamp seen plus the ids of the issues updated at exactly
+that moment) is kept in a pluggable store. Each run only fetches the issues updated since the checkpoint.
+"""
+
+import heapq
+import json
+import logging
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .paging import fetch_ahead
+
+log = logging.getLogger(__name__)
+
+JIRA_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+JQL_DATE_FORMAT = "%Y/%m/%d %H:%M"
+# Widest span between two UTC offsets, used if the time zone of the user is unknown
+MAX_UTC_OFFSET_SPAN = timedelta(hours=26)
+
+
+def parse_jira_timestamp(value):
+    """
+    :param value: string: Timestamp as returned by Jira, e.g. 2024-01-31T10:05:33.123+0100
+    :return: datetime (aware)
+    """
+    return datetime.strptime(value, JIRA_TIMESTAMP_FORMAT)
+
+
+class MemoryCheckpointStore(object):
+    """
+    Keeps the checkpoints in memory, for tests and long running processes.
+    """
+
+    def __init__(self):
+        self._checkpoints = {}
+
+    def load(self, name):
+        return self._checkpoints.get(name)
+
+    def save(self, name, checkpoint):
+        self._checkpoints[name] = dict(checkpoint)
+
+
+class JsonFileCheckpointStore(object):
+    """
+    Keeps the checkpoints of all syncs in a JSON file, replaced atomically on each save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, name):
+        with self._lock:
+            return self._read().get(name)
+
+    def save(self, name, checkpoint):
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[name] = checkpoint
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoints, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class JqlSync(object):
+    """
+    Fetch the issues of a JQL query which changed since the last run.
+
+    Issues are requested ordered by ``updated``. The checkpoint only moves past an issue once the
+    caller asked for the next one, so an issue whose processing failed is fetched again on the next run.
+    As JQL compares dates with minute precision, the query starts at the minute of the checkpoint and
+    the issues already seen are skipped.
+
+    On Server the processed issues form the head of the query. Its length is kept in the checkpoint
+    (keyset cursor), and every page starts with the last processed issue. If that issue moved because
+    it was updated while the sync runs, the end of the head is found again with a binary search of
+    single issue requests. So the issues of the query window are not read again on each run, even if the
+    window spans 26 hours because the time zone of the user is unknown. On Cloud, which pages with
+    tokens, the query is restarted from the checkpoint after every page.
+
+        sync = JqlSync(jira, "project = FOO", store=JsonFileCheckpointStore("sync.json"))
+        for issue in sync.changes():
+            ...
+    """
+
+    def __init__(
+        self,
+        jira,
+        jql,
+        name=None,
+        store=None,
+        fields="*all",
+        expand=None,
+        page_size=100,
+        timezone=None,
+        save_every=100,
+    ):
+        """
+        :param jira: The Jira client
+        :param jql: string: The query, without ORDER BY
+        :param name: string: Name of the checkpoint in the store. Default: the query
+        :param store: The checkpoint store (load/save). Default: MemoryCheckpointStore()
+        :param fields: The fields of the issues, "updated" is always added
+        :param expand: OPTIONAL: expand the search result
+        :param page_size: int: Number of issues per request
+        :param timezone: tzinfo or IANA name of the time zone of the user, which Jira uses for dates in JQL.
+                Default: the timeZone of the user profile. If it can't be determined, the query
+                starts 26 hours before the checkpoint.
+        :param save_every: int: Save the checkpoint after this many issues, and at the end of the run
+        """
+        if "order by" in jql.lower():
+            raise ValueError("The JQL of a sync must not contain ORDER BY")
+        self.jira = jira
+        self.jql = jql
+        self.name = name or jql
+        self.store = store if store is not None else MemoryCheckpointStore()
+        if isinstance(fields, (list, tuple, set)):
+            fields = list(fields)
+            if "updated" not in fields:
+                fields.append("updated")
+        elif fields not in ("*all", "*navigable"):
+            fields = f"{fields},updated"
+        self.fields = fields
+        self.expand = expand
+        self.page_size = page_size
+        self.save_every = save_every
+        self._timezone = timezone
+
+    @property
+    def checkpoint(self):
+        """
+        :return: dict: {"updated": <timestamp>, "ids": [<ids of the issues updated at that timestamp>]} or None.
+                 On Server also the query and the offset of its first unprocessed issue.
+        """
+        return self.store.load(self.name)
+
+    def reset(self):
+        """
+        Forget the checkpoint, the next run fetches all issues.
+        """
+        self.store.save(self.name, None)
+
+    def _user_timezone(self):
+        if self._timezone is None:
+            try:
+                self._timezone = (self.jira.myself() or {}).get("timeZone") or False
+            except Exception as e:
+                log.warning("Can't get the time zone of the user: %s", e)
+                self._timezone = False
+        if isinstance(self._timezone, str):
+            try:
+                from zoneinfo import ZoneInfo
+
+                self._timezone = ZoneInfo(self._timezone)
+            except Exception as e:
+                log.warning("Unknown time zone %s: %s", self._timezone, e)
+                self._timezone = False
+        return self._timezone or None
+
+    def _query(self, updated):
+        if updated is None:
+            return f"({self.jql}) ORDER BY updated ASC, key ASC"
+        tz = self._user_timezone()
+        if tz is None:
+            bound = (updated - MAX_UTC_OFFSET_SPAN).astimezone(dt_timezone.utc)
+        else:
+            bound = updated.astimezone(tz)
+        return f'({self.jql}) AND updated >= "{bound.strftime(JQL_DATE_FORMAT)}" ORDER BY updated ASC, key ASC'
+
+    def _fetch(self, query, cursor, limit=None):
+        """
+        :return: (issues, cursor of the next page or None)
+        """
+        limit = limit or self.page_size
+        if self.jira.cloud:
+            response = self.jira.enhanced_jql(
+                query, fields=self.fields, nextPageToken=cursor, limit=limit, expand=self.expand
+            )
+            response = response or {}
+            return response.get("issues") or [], response.get("nextPageToken")
+        start = cursor or 0
+        response = self.jira.jql(query, fields=self.fields, start=start, limit=limit, expand=self.expand)
+        response = response or {}
+        issues = response.get("issues") or []
+        start += len(issues)
+        total = response.get("total")
+        if not issues or (total is not None and start >= int(total)):
+            return issues, None
+        return issues, start
+
+    def _locate(self, query, position, is_new):
+        """
+        Find where the unprocessed issues of a query start. The query is ordered by updated, so the
+        processed issues form its head. Issues updated since move to its end and shorten the head.
+
+        :param position: int: The head is at most this long, and the issue at position - 1 is new
+        :param is_new: callable: Returns True for an issue which wasn't processed yet
+        :return: int: The offset of the first new issue
+        """
+
+        def _new_at(offset):
+            response = self.jira.jql(query, fields="updated", start=offset, limit=1) or {}
+            issues = response.get("issues") or []
+            return not issues or is_new(issues[0])
+
+        low, high = 0, position
+        while low < high:
+            middle = (low + high) // 2
+            if _new_at(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def changes(self):
+        """
+        Fetch the issues changed since the checkpoint and advance it.
+
+        :return: A generator object for the issues, ordered by updated
+        """
+        checkpoint = self.checkpoint or {}
+        updated = parse_jira_timestamp(checkpoint["updated"]) if checkpoint.get("updated") else None
+        seen = set(checkpoint.get("ids") or [])
+        unsaved = 0
+
+        def _is_new(issue):
+            issue_updated = parse_jira_timestamp(issue["fields"]["updated"])
+            if updated is None or issue_updated > updated:
+                return True
+            return issue_updated == updated and str(issue["id"]) not in seen
+
+        def _save():
+            if updated is not None:
+                checkpoint = {"updated": updated.strftime(JIRA_TIMESTAMP_FORMAT), "ids": sorted(seen)}
+                if not self.jira.cloud:
+                    checkpoint.update({"query": query, "offset": position})
+                self.store.save(self.name, checkpoint)
+
+        query = self._query(updated)
+        # Server: the number of processed issues at the head of the query (keyset cursor). An offset of
+        # another query is still an upper bound of the head, worth locating if the query spans 26 hours.
+        position = 0
+        if not self.jira.cloud and (checkpoint.get("query") == query or self._user_timezone() is None):
+            position = int(checkpoint.get("offset") or 0)
+        try:
+            # Cloud pages with tokens: the query is restarted from the checkpoint after every page,
+            # unless the time zone is unknown and the query spans 26 hours
+            restart = self.jira.cloud and self._user_timezone() is not None
+            cursor = None
+            while True:
+                if self.jira.cloud:
+                    issues, next_cursor = self._fetch(query, cursor)
+                elif position > 0:
+                    # The page starts with the last processed issue, it is still there unless the head
+                    # of the query got shorter since
+                    issues, next_cursor = self._fetch(query, position - 1, self.page_size + 1)
+                    if not issues or _is_new(issues[0]):
+                        position = self._locate(query, position - 1, _is_new)
+                        continue
+                    issues = issues[1:]
+                else:
+                    issues, next_cursor = self._fetch(query, None)
+                found = False
+                for issue in issues:
+                    if _is_new(issue):
+                        found = True
+                        yield issue
+                        # The caller is done with the issue
+                        issue_updated = parse_jira_timestamp(issue["fields"]["updated"])
+                        if updated is None or issue_updated > updated:
+                            updated = issue_updated
+                            seen = set()
+                        seen.add(str(issue["id"]))
+                        unsaved += 1
+                    position += 1
+                    if unsaved >= self.save_every:
+                        _save()
+                        unsaved = 0
+                if next_cursor is None:
+                    break
+                if restart and found:
+                    # Keyset paging: restart from the checkpoint
+                    query, cursor = self._query(updated), None
+                else:
+                    cursor = next_cursor
+        finally:
+            _save()
+
+    def deleted_by_key_diff(self, known_ids):
+        """
+        Find deleted issues (or issues which don't match the query anymore) by comparing the ids
+        currently matching the query with known ids. Fetches the ids of all matching issues.
+
+        :param known_ids: iterable: The ids of the issues known to the caller
+        :return: set: The ids which don't match the query anymore
+        """
+        missing = {str(issue_id) for issue_id in known_ids}
+        for issue in self.jira.jql_iter(self.jql, fields=["id"], page_size=1000):
+            missing.discard(str(issue["id"]))
+        return missing
+
+    def deleted_from_audit_log(
+        self, from_date=None, to_date=None, page_size=1000, categories=("issue management", "issues")
+    ):
+        """
+        Get the issues deleted according to the audit log. Requires the administer Jira permission.
+        Records are matched on the type of their object and on their category, not on the localised summary.
+
+        :param from_date: string: OPTIONAL: Only records created at or after this timestamp
+        :param to_date: string: OPTIONAL: Only records created at or before this timestamp
+        :param page_size: int: Number of records per request
+        :param categories: The categories of the issue deletion records, compared case insensitively
+        :return: list of dicts {"id": <issue id>, "key": <issue key>, "deleted": <record timestamp>}
+        """
+        categories = {category.lower().replace("_", " ") for category in categories}
+        deleted = []
+        offset = 0
+        while True:
+            response = self.jira.get_audit_records(offset=offset, limit=page_size, from_date=from_date, to_date=to_date)
+            records = response.get("records") or []
+            for record in records:
+                item = record.get("objectItem") or {}
+                category = (record.get("category") or "").lower().replace("_", " ")
+                if item.get("typeName") == "ISSUE" and category in categories:
+                    deleted.append({"id": item.get("id"), "key": item.get("name"), "deleted": record.get("created")})
+            offset += len(records)
+            if not records or offset >= int(response.get("total") or 0):
+                return deleted
+
+
+# A change of the worklog feed. kind is "updated" or "deleted", worklog is None for deletions
+WorklogChange = namedtuple("WorklogChange", ["kind", "worklog_id", "updated_time", "worklog"])
+
+
+class WorklogSync(object):
+    """
+    Follow the worklog change feed of Jira (worklog/updated and worklog/deleted) since the last run.
+
+    The updated worklogs are fetched with worklog/list in batches, several batches concurrently.
+    Updates and deletions are merged into one stream ordered by the time of the change. The checkpoint
+    only moves past a change once the caller asked for the next one. A worklog which was deleted before
+    it could be fetched is reported as deleted at the time of its update, so the deletion isn't lost
+    if the checkpoint moves past the time of the deletion in the same run. A later run may report
+    the deletion again.
+
+        sync = WorklogSync(jira, store=JsonFileCheckpointStore("sync.json"))
+        for change in sync.changes():
+            if change.kind == "deleted":
+                ...
+    """
+
+    def __init__(self, jira, name="worklogs", store=None, since=0, batch_size=1000, workers=None, save_every=1000):
+        """
+        :param jira: The Jira client
+        :param name: string: Name of the checkpoint in the store
+        :param store: The checkpoint store (load/save). Default: MemoryCheckpointStore()
+        :param since: int: UNIX timestamp in milliseconds to start from if there is no checkpoint. Default: 0, all worklogs
+        :param batch_size: int: Worklogs per worklog/list request, Jira allows at most 1000
+        :param workers: int: Number of batches fetched concurrently. Default: max_workers of the client
+        :param save_every: int: Save the checkpoint after this many changes, and at the end of the run
+        """
+        self.jira = jira
+        self.name = name
+        self.store = store if store is not None else MemoryCheckpointStore()
+        self.since = since
+        self.batch_size = batch_size
+        self.workers = workers or jira.max_workers
+        self.save_every = save_every
+
+    @property
+    def checkpoint(self):
+        """
+        :return: dict: {"since": <milliseconds>, "ids": [<changes seen at that time>]} or None
+        """
+        return self.store.load(self.name)
+
+    def reset(self):
+        """
+        Forget the checkpoint, the next run starts at since again.
+        """
+        self.store.save(self.name, None)
+
+    def _feed(self, kind, since):
+        """
+        :return: A generator object for the entries of worklog/updated or worklog/deleted
+        """
+        response = self.jira.get(self.jira.resource_url(f"worklog/{kind}"), params={"since": since})
+        while True:
+            response = response or {}
+            for entry in response.get("values") or []:
+                yield entry
+            if response.get("lastPage", True) or not response.get("nextPage"):
+                return
+            response = self.jira.get(response["nextPage"], absolute=True)
+
+    def _hydrate(self, entries):
+        worklogs = self.jira.post(
+            self.jira.resource_url("worklog/list"), data={"ids": [e["worklogId"] for e in entries]}
+        )
+        by_id = {str(worklog["id"]): worklog for worklog in worklogs or []}
+        changes = []
+        for entry in entries:
+            worklog = by_id.get(str(entry["worklogId"]))
+            if worklog is None:
+                # Deleted (or not visible anymore) in the meantime. Its entry in the deleted feed may be later
+                # than the changes which move the checkpoint, so the deletion is reported right away.
+                changes.append(WorklogChange("deleted", entry["worklogId"], entry["updatedTime"], None))
+                continue
+            changes.append(WorklogChange("updated", entry["worklogId"], entry["updatedTime"], worklog))
+        return changes
+
+    def _updated(self, since):
+        def _batches():
+            batch = []
+            for entry in self._feed("updated", since):
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        for changes in fetch_ahead(self._hydrate, _batches(), self.workers, lambda _: False):
+            yield from changes
+
+    def _deleted(self, since):
+        for entry in self._feed("deleted", since):
+            yield WorklogChange("deleted", entry["worklogId"], entry["updatedTime"], None)
+
+    def changes(self):
+        """
+        Fetch the worklog changes since the checkpoint and advance it.
+
+        :return: A generator object for the WorklogChanges, ordered by updated_time
+        """
+        checkpoint = self.checkpoint or {}
+        since = checkpoint.get("since", self.since)
+        seen = set(checkpoint.get("ids") or [])
+        unsaved = 0
+
+        def _save():
+            self.store.save(self.name, {"since": since, "ids": sorted(seen)})
+
+        # The feed returns the changes after since, the changes at since are skipped by id
+        start = max(since - 1, 0)
+        stream = heapq.merge(self._updated(start), self._deleted(start), key=lambda change: change.updated_time)
+        # Worklogs already reported as deleted because they couldn't be fetched
+        gone = set()
+        try:
+            for change in stream:
+                change_id = f"{change.kind}:{change.worklog_id}"
+                if change.updated_time < since or (change.updated_time == since and change_id in seen):
+                    continue
+                if change.kind != "deleted" or change.worklog_id not in gone:
+                    if change.kind == "deleted":
+                        gone.add(change.worklog_id)
+                    yield change
+                # The caller is done with the change
+                if change.updated_time > since:
+                    since = change.updated_time
+                    seen = set()
+                seen.add(change_id)
+                unsaved += 1
+                if unsaved >= self.save_every:
+                    _save()
+                    unsaved = 0
+        finally:
+            if unsaved:
+                _save()
@@ -0,0 +1,124 @@
+# coding=utf-8
+"""
+JSON codecs for the request and response bodies.
+
+By default the clients decode the responses with the fastest installed library: orjson, then
+msgspec, then the json module of the standard library. The request bodies are encoded with the json
+module, so they are sent byte for byte as before. Install a fast library with
+``pip install atlassian-python-api[fast-json]``.
+"""
+
+import json
+
+
+class JsonCodec(object):
+    """
+    Codec based on the json module of the standard library.
+
+    A codec created directly encodes the request bodies itself (encode=True). The clients default to
+    default_json_codec(), which is created with encode=False and keeps json.dumps for the request bodies.
+    """
+
+    name = "json"
+
+    def __init__(self, from_bytes=True, encode=True):
+        """
+        :param from_bytes: bool: Decode the response bodies straight from the received bytes, without
+                building response.text first. Invalid UTF-8 then fails to decode instead of being replaced.
+                Defaults to True.
+        :param encode: bool: Encode the request bodies with the library of the codec as well. The fast
+                libraries produce compact JSON, otherwise json.dumps is used. Defaults to True here,
+                default_json_codec uses False.
+        """
+        self.from_bytes = from_bytes
+        self.encode = encode
+
+    def dumps(self, obj):
+        """
+        :param obj: The object to encode
+        :return: str or bytes: The JSON document
+        """
+        return json.dumps(obj)
+
+    def loads(self, data):
+        """
+        :param data: str or bytes: The JSON document
+        :return: The decoded object
+        """
+        return json.loads(data)
+
+    def decode(self, response):
+        """
+        Decode the body of a response (requests or httpx).
+
+        :param response: The response
+        :return: The decoded object. Raises ValueError if the body isn't valid JSON
+        """
+        if self.from_bytes:
+            return self.loads(response.content)
+        return self.loads(response.text)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec based on orjson.
+    """
+
+    name = "orjson"
+
+    def __init__(self, from_bytes=True, encode=True):
+        import orjson
+
+        super().__init__(from_bytes=from_bytes, encode=encode)
+        self._orjson = orjson
+
+    def dumps(self, obj):
+        if not self.encode:
+            return super().dumps(obj)
+        # Without OPT_NON_STR_KEYS orjson rejects keys json.dumps accepts, e.g. ints
+        return self._orjson.dumps(obj, option=self._orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """
+    Codec based on msgspec.
+    """
+
+    name = "msgspec"
+
+    def __init__(self, from_bytes=True, encode=True):
+        import msgspec
+
+        super().__init__(from_bytes=from_bytes, encode=encode)
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._decode_error = msgspec.DecodeError
+
+    def dumps(self, obj):
+        if not self.encode:
+            return super().dumps(obj)
+        return self._encoder.encode(obj)
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as e:
+            # Callers expect the ValueError of the json module
+            raise ValueError(str(e)) from e
+
+
+def default_json_codec(from_bytes=True, encode=False):
+    """
+    :param from_bytes: bool: See JsonCodec
+    :param encode: bool: See JsonCodec. Defaults to False, the request bodies are encoded with json.dumps
+    :return: The fastest available codec: orjson, msgspec or the standard library
+    """
+    for codec in (OrjsonCodec, MsgspecCodec):
+        try:
+            return codec(from_bytes=from_bytes, encode=encode)
+        except ImportError:
+            pass
+    return JsonCodec(from_bytes=from_bytes)
@@ -0,0 +1,91 @@
+# coding=utf-8
+"""
+Helpers to overlap the download of paged results with their processing.
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_END = object()
+
+
+def prefetch(iterable, buffer_size=1):
+    """
+    Iterate over an iterable on a background thread, keeping up to buffer_size elements ahead of the consumer.
+    Used for paged endpoints where the next page is only known from the current one (e.g. next links).
+    Exceptions raised by the iterable are re-raised in the consumer.
+
+    :param iterable: The iterable to consume in the background, usually a generator of pages
+    :param buffer_size: int: Maximum number of elements buffered ahead of the consumer
+
+    :return: A generator object for the elements
+    """
+    buffer = queue.Queue(maxsize=max(1, int(buffer_size)))
+    stopped = threading.Event()
+
+    def _put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+        except BaseException as e:
+            _put((_END, e))
+        else:
+            _put((_END, None))
+
+    producer = threading.Thread(target=_produce, name="atlassian-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+def fetch_ahead(fetch, keys, depth, is_last):
+    """
+    Fetch pages for a sequence of known keys (offsets, page numbers, ...) with up to depth requests in flight.
+    Pages are yielded in the order of the keys, the iteration stops after the first page for which
+    is_last returns True. Requests which are already running at that point are discarded.
+
+    :param fetch: callable: Returns the page for a key
+    :param keys: iterable: The keys of the pages, in order
+    :param depth: int: Maximum number of pages requested ahead of the consumer
+    :param is_last: callable: Returns True if the given page is the last one
+
+    :return: A generator object for the pages
+    """
+    keys = iter(keys)
+    executor = ThreadPoolExecutor(max_workers=max(1, int(depth)), thread_name_prefix="atlassian-fetch")
+    pending = deque()
+    try:
+        for key in keys:
+            pending.append(executor.submit(fetch, key))
+            if len(pending) >= depth:
+                break
+        while pending:
+            page = pending.popleft().result()
+            yield page
+            if is_last(page):
+                return
+            key = next(keys, _END)
+            if key is not _END:
+                pending.append(executor.submit(fetch, key))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,207 @@
+# coding=utf-8
+"""
+Client side rate limiting for the REST clients.
+
+Atlassian Cloud throttles per user and per endpoint. The RateLimiter paces requests with a token
+bucket per host and endpoint family and tunes the rate of each bucket from the responses
+(additive increase, multiplicative decrease), so the client slows down before the server
+starts to answer with 429.
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATH_FAMILIES = (
+    "rest/api/2/search",
+    "rest/api/3/search",
+    "rest/api/latest/search",
+    "rest/agile",
+    "rest/servicedeskapi",
+    "rest/insight",
+    "wiki/rest/api/search",
+    "rest/api/search",
+    "wiki/rest/api/content",
+    "rest/api/content",
+    "2.0/repositories",
+    "2.0/workspaces",
+    "rest/api/1.0/projects",
+)
+
+
+def _header(response, name):
+    value = response.headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket(object):
+    """
+    Token bucket with an adjustable rate. Not thread safe, guarded by the RateLimiter.
+    """
+
+    def __init__(self, rate, burst, now):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """
+        Take a token, going into debt if none is left.
+
+        :param now: float: clock value
+        :return: float: Seconds to wait before the request may be sent
+        """
+        self.refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Adaptive rate limiter keyed by host and endpoint family.
+
+    Pass the same instance to several clients (and use them from several threads) to share the budget.
+    Each bucket starts at initial_rate requests per second. Successful responses raise the rate by
+    increase, throttled responses (429) and responses close to the limit reported by the
+    X-RateLimit-* headers multiply it by decrease. The rate always stays between min_rate and max_rate,
+    and below the fill rate announced by the server, if any.
+    """
+
+    def __init__(
+        self,
+        initial_rate=10.0,
+        min_rate=0.1,
+        max_rate=100.0,
+        burst=10,
+        increase=0.5,
+        decrease=0.5,
+        near_limit_ratio=0.1,
+        path_families=DEFAULT_PATH_FAMILIES,
+        family_depth=3,
+        clock=time.monotonic,
+    ):
+        """
+        :param initial_rate: float: Requests per second of a new bucket
+        :param min_rate: float: Lowest rate the buckets are slowed down to
+        :param max_rate: float: Highest rate the buckets are sped up to
+        :param burst: int: Number of requests a bucket allows in a burst
+        :param increase: float: Requests per second added after a successful response
+        :param decrease: float: Factor applied to the rate after a throttled response
+        :param near_limit_ratio: float: Slow down if X-RateLimit-Remaining falls below this share of X-RateLimit-Limit
+        :param path_families: Path prefixes which get their own bucket
+        :param family_depth: int: Number of path segments forming the family of other paths
+        :param clock: Monotonic clock, time.monotonic by default
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.near_limit_ratio = near_limit_ratio
+        self.path_families = tuple(family.strip("/") for family in path_families)
+        self.family_depth = family_depth
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}
+        # Fill rates announced by the server, per bucket
+        self._ceilings = {}
+
+    def key(self, url):
+        """
+        Get the bucket key of an url.
+
+        :param url: string: Absolute url of the request
+        :return: tuple: (host, endpoint family)
+        """
+        parts = urlsplit(url)
+        path = parts.path.strip("/")
+        # Also matches deployments under a context path, e.g. https://host/jira/rest/agile
+        padded = f"/{path}/"
+        for family in self.path_families:
+            if f"/{family}/" in padded:
+                return parts.netloc, family
+        return parts.netloc, "/".join(path.split("/")[: self.family_depth])
+
+    def _bucket(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.initial_rate, self.burst, now)
+            self._buckets[key] = bucket
+        return bucket
+
+    def rate(self, url):
+        """
+        :param url: string: Absolute url of a request
+        :return: float: Current requests per second of the bucket of the url
+        """
+        with self._lock:
+            return self._bucket(self.key(url), self.clock()).rate
+
+    def reserve(self, url):
+        """
+        Reserve a request to the url. Does not block.
+
+        :param url: string: Absolute url of the request
+        :return: float: Seconds to wait before sending the request
+        """
+        now = self.clock()
+        with self._lock:
+            return self._bucket(self.key(url), now).reserve(now)
+
+    def wait(self, url):
+        """
+        Block the calling thread until a request to the url may be sent.
+
+        :param url: string: Absolute url of the request
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, url, response):
+        """
+        Tune the rate of the bucket of the url from a response.
+
+        :param url: string: Absolute url of the request
+        :param response: The response
+        """
+        key = self.key(url)
+        limit = _header(response, "X-RateLimit-Limit")
+        remaining = _header(response, "X-RateLimit-Remaining")
+        fill_rate = _header(response, "X-RateLimit-FillRate")
+        interval = _header(response, "X-RateLimit-Interval-Seconds") or 1.0
+        near_limit = str(response.headers.get("X-RateLimit-NearLimit", "")).lower() == "true"
+        now = self.clock()
+        with self._lock:
+            bucket = self._bucket(key, now)
+            # Tokens gained so far accrue at the old rate
+            bucket.refill(now)
+            if fill_rate and interval > 0:
+                self._ceilings[key] = fill_rate / interval
+            ceiling = min(self.max_rate, self._ceilings.get(key, self.max_rate))
+            throttled = response.status_code == 429 or near_limit
+            if not throttled and limit and remaining is not None:
+                throttled = remaining < limit * self.near_limit_ratio
+            if throttled:
+                rate = bucket.rate * self.decrease
+            elif response.status_code < 400:
+                rate = bucket.rate + self.increase
+            else:
+                rate = bucket.rate
+            bucket.rate = max(self.min_rate, min(ceiling, rate))
+            if response.status_code == 429:
+                # Drop the burst allowance, the server is out of capacity
+                bucket.tokens = min(bucket.tokens, 0.0)
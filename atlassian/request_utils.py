@@ -1,4 +1,6 @@
+import json
 import logging
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
 
 from six import PY3
 
@@ -37,3 +39,187 @@ def get_default_logger(name):
         # StreamHandler on Python 3
         logger.addHandler(logging.NullHandler())
     return logger
+
+
+class RequestFormatter(object):
+    """
+    Base class of the formatters used to log requests and responses.
+    The formatters are only called if the logger is enabled for the level,
+    so building the messages costs nothing when logging is off.
+
+    :param max_body_length: int: Truncate logged bodies to this many characters. None logs the full body.
+    """
+
+    def __init__(self, max_body_length=None):
+        self.max_body_length = max_body_length
+
+    def _truncate(self, text):
+        if text is None or self.max_body_length is None or len(text) <= self.max_body_length:
+            return text
+        return f"{text[: self.max_body_length]}... [{len(text) - self.max_body_length} more characters]"
+
+    def body_to_text(self, body):
+        """
+        Convert a request body (dict, list, str or bytes) to text, truncated to max_body_length
+        """
+        if body is None:
+            return None
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        elif not isinstance(body, str):
+            try:
+                body = json.dumps(body)
+            except (TypeError, ValueError):
+                body = str(body)
+        return self._truncate(body)
+
+    def response_text(self, response):
+        """
+        Get the body of a response as text. With max_body_length only that part of the body is decoded.
+        """
+        content = response.content
+        if content is None:
+            return None
+        if self.max_body_length is not None and len(content) > self.max_body_length:
+            text = content[: self.max_body_length].decode("utf-8", errors="replace")
+            return f"{text}... [{len(content) - self.max_body_length} more bytes]"
+        return content.decode("utf-8", errors="replace")
+
+    def format_request(self, method, url, headers=None, body=None):
+        raise NotImplementedError
+
+    def format_response(self, method, url, response):
+        raise NotImplementedError
+
+
+class CurlRequestFormatter(RequestFormatter):
+    """
+    Log requests as curl commands, the default format of the library.
+    """
+
+    def format_request(self, method, url, headers=None, body=None):
+        body = self.body_to_text(body)
+        return "curl --silent -X {method} -H {headers} {data} '{url}'".format(
+            method=method,
+            headers=" -H ".join([f"'{key}: {value}'" for key, value in list((headers or {}).items())]),
+            data="" if not body else f"--data '{body}'",
+            url=url,
+        )
+
+    def format_response(self, method, url, response):
+        return "HTTP: {method} {url} -> {status_code} {reason}\nHTTP: Response text -> {text}".format(
+            method=method,
+            url=url,
+            status_code=response.status_code,
+            reason=getattr(response, "reason", None) or getattr(response, "reason_phrase", ""),
+            text=self.response_text(response),
+        )
+
+
+class JsonLinesRequestFormatter(RequestFormatter):
+    """
+    Log requests and responses as one JSON document per line, for log shippers.
+    """
+
+    def format_request(self, method, url, headers=None, body=None):
+        return json.dumps(
+            {
+                "event": "request",
+                "method": method,
+                "url": url,
+                "headers": dict(headers or {}),
+                "body": self.body_to_text(body),
+            }
+        )
+
+    def format_response(self, method, url, response):
+        elapsed = getattr(response, "elapsed", None)
+        return json.dumps(
+            {
+                "event": "response",
+                "method": method,
+                "url": url,
+                "status_code": response.status_code,
+                "elapsed_ms": None if elapsed is None else round(elapsed.total_seconds() * 1000, 3),
+                "body": self.response_text(response),
+            }
+        )
+
+
+class RedactingRequestFormatter(RequestFormatter):
+    """
+    Mask credentials before handing the request to another formatter.
+
+    :param formatter: RequestFormatter: The formatter producing the message. Defaults to CurlRequestFormatter.
+    :param headers: The names of the headers to mask (case insensitive)
+    :param fields: The keys to mask in JSON bodies (case insensitive, at any depth)
+    :param log_response_body: bool: If False, response bodies are not logged at all
+    :param query_params: The query parameters to mask in the urls (case insensitive), e.g. tokens
+            and the signatures of signed urls
+    """
+
+    MASK = "********"
+
+    def __init__(
+        self,
+        formatter=None,
+        headers=("Authorization", "Cookie", "Proxy-Authorization", "X-Atlassian-Token"),
+        fields=("password", "token", "secret", "apiToken", "api_token"),
+        log_response_body=True,
+        query_params=(
+            "access_token",
+            "token",
+            "api_token",
+            "password",
+            "os_password",
+            "os_authType",
+            "jwt",
+            "signature",
+            "sig",
+            "X-Amz-Signature",
+            "X-Amz-Credential",
+            "X-Amz-Security-Token",
+        ),
+    ):
+        self.formatter = formatter or CurlRequestFormatter()
+        super(RedactingRequestFormatter, self).__init__(self.formatter.max_body_length)
+        self.headers = {header.lower() for header in headers}
+        self.fields = {field.lower() for field in fields}
+        self.log_response_body = log_response_body
+        self.query_params = {param.lower() for param in query_params}
+
+    def _redact_url(self, url):
+        parts = urlsplit(str(url))
+        if not parts.query:
+            return url
+        query = []
+        for param in parts.query.split("&"):
+            name = unquote_plus(param.split("=", 1)[0])
+            query.append(f"{param.split('=', 1)[0]}={self.MASK}" if name.lower() in self.query_params else param)
+        return urlunsplit(parts._replace(query="&".join(query)))
+
+    def _redact(self, value):
+        if isinstance(value, dict):
+            return {
+                key: self.MASK if str(key).lower() in self.fields else self._redact(item) for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self._redact(item) for item in value]
+        return value
+
+    def format_request(self, method, url, headers=None, body=None):
+        headers = {
+            key: self.MASK if key.lower() in self.headers else value for key, value in list((headers or {}).items())
+        }
+        if isinstance(body, (str, bytes)):
+            try:
+                body = json.loads(body)
+            except ValueError:
+                pass
+        return self.formatter.format_request(method, self._redact_url(url), headers=headers, body=self._redact(body))
+
+    def format_response(self, method, url, response):
+        url = self._redact_url(url)
+        if not self.log_response_body:
+            return f"HTTP: {method} {url} -> {response.status_code}"
+        return self.formatter.format_response(method, url, response)
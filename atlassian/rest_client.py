@@ -1,7 +1,7 @@
 # coding=utf-8
+import hashlib
+import itertools
 import logging
-import random
-from json import dumps
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -10,7 +10,6 @@ try:
     from oauthlib.oauth1.rfc5849 import SIGNATURE_RSA_SHA512 as SIGNATURE_RSA
 except ImportError:
     from oauthlib.oauth1 import SIGNATURE_RSA
-import time
 
 import urllib3
 from requests import HTTPError
@@ -18,7 +17,10 @@ from requests_oauthlib import OAuth1, OAuth2
 from six.moves.urllib.parse import urlencode
 from urllib3.util import Retry
 
-from atlassian.request_utils import get_default_logger
+from atlassian.json_codec import default_json_codec
+from atlassian.paging import fetch_ahead, prefetch
+from atlassian.request_utils import CurlRequestFormatter, get_default_logger
+from atlassian.retry import BackPressure, RetryScheduler
 
 log = get_default_logger(__name__)
 
@@ -51,6 +53,8 @@ class AtlassianRestAPI(object):
         "X-ExperimentalApi": "opt-in",
     }
     response = None
+    # Default chunk size for streamed downloads
+    stream_chunk_size = 64 * 1024
 
     def __init__(
         self,
@@ -78,6 +82,14 @@ class AtlassianRestAPI(object):
         backoff_factor=1.0,
         backoff_jitter=1.0,
         retry_with_header=True,
+        prefetch_pages=0,
+        max_workers=4,
+        request_formatter=None,
+        retry_scheduler=None,
+        rate_limiter=None,
+        transport=None,
+        response_cache=None,
+        json_codec=None,
     ):
         """
         init function for the AtlassianRestAPI object.
@@ -125,6 +137,32 @@ class AtlassianRestAPI(object):
                 However, if the `Retry-After` header is missing and `backoff_and_retry` is enabled,
                 the retry logic will still be triggered based on the status code 429,
                 provided that 429 is included in the `retry_status_codes` list.
+        :param prefetch_pages: Number of pages the paged generators download ahead of the caller
+                on background threads while the current page is being processed. The session is
+                shared with these threads. Defaults to 0 (no prefetching).
+        :param max_workers: Default number of requests the concurrent helpers (e.g. the offset
+                based paging) keep in flight. Defaults to 4.
+        :param request_formatter: Formatter for the DEBUG logs of requests and responses, see
+                atlassian.request_utils. The messages are only built if DEBUG is enabled for the
+                atlassian.rest_client logger. Defaults to CurlRequestFormatter().
+        :param retry_scheduler: atlassian.retry.RetryScheduler deciding which responses are retried and
+                when. Pass one to set retry budgets per call and per client, or to share them between
+                clients. Defaults to a scheduler built from the retry parameters above. 429 back-pressure
+                is shared by all clients using the same session, also by a scheduler passed here unless
+                it was created with its own back_pressure.
+        :param rate_limiter: atlassian.rate_limit.RateLimiter pacing the requests per host and endpoint
+                family, tuned from the X-RateLimit-* headers. Share one instance between clients to share
+                the budget. Defaults to None (no client side rate limiting).
+        :param transport: atlassian.transport.TransportConfig with the connection pool settings. Clients
+                sharing a TransportConfig share the connection pool of their host. Defaults to None
+                (the pool defaults of requests).
+        :param response_cache: atlassian.cache.ResponseCache for GET requests. Responses with an ETag or
+                Last-Modified header are stored and revalidated with If-None-Match / If-Modified-Since,
+                a 304 is answered from the store. The responses vary on the credentials of the client, so a
+                store can be shared by clients of different users. Requests with credentials the client can't
+                tell apart (Kerberos) are not cached. Defaults to None (no caching).
+        :param json_codec: atlassian.json_codec.JsonCodec encoding the request bodies and decoding the
+                responses. Defaults to the fastest installed codec (orjson, msgspec or the json module).
         """
         self.url = url
         self.username = username
@@ -146,6 +184,10 @@ class AtlassianRestAPI(object):
         self.backoff_factor = backoff_factor
         self.backoff_jitter = backoff_jitter
         self.retry_with_header = retry_with_header
+        self.prefetch_pages = prefetch_pages
+        self.max_workers = max_workers
+        self.request_formatter = request_formatter or CurlRequestFormatter()
+        self.transport = transport
         if session is None:
             self._session = requests.Session()
         else:
@@ -154,6 +196,13 @@ class AtlassianRestAPI(object):
         if proxies is not None:
             self._session.proxies = self.proxies
 
+        self.retry_scheduler = retry_scheduler or self._create_retry_scheduler()
+        self.retry_scheduler.share_back_pressure(BackPressure.for_session(self._session))
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.json_codec = json_codec or default_json_codec()
+
+        retries = None
         if self.backoff_and_retry and self.use_urllib3_retry:
             # Note: we only retry on status and not on any of the
             # other supported reasons
@@ -167,6 +216,9 @@ class AtlassianRestAPI(object):
                 backoff_max=self.max_backoff_seconds,
                 respect_retry_after_header=self.retry_with_header,
             )
+        if transport is not None:
+            transport.mount(self._session, self.url, max_retries=retries)
+        elif retries is not None:
             self._session.mount(self.url, HTTPAdapter(max_retries=retries))
         if username and password:
             self._create_basic_session(username, password)
@@ -230,10 +282,9 @@ class AtlassianRestAPI(object):
         """
         self._session.headers.update({key: value})
 
-    @staticmethod
-    def _response_handler(response):
+    def _response_handler(self, response):
         try:
-            return response.json()
+            return self.json_codec.decode(response)
         except ValueError:
             log.debug("Received response with no content")
             return None
@@ -241,58 +292,145 @@ class AtlassianRestAPI(object):
             log.error(e)
             return None
 
-    def _calculate_backoff_value(self, retry_count):
+    def _create_retry_scheduler(self):
+        """
+        Create the default retry scheduler from the retry parameters of the client.
+        Backoff is left to urllib3 if it handles the retries.
+
+        :return: RetryScheduler
         """
-        Calculate the backoff delay for a given retry attempt.
+        return RetryScheduler(
+            retry_status_codes=self.retry_status_codes,
+            backoff_and_retry=self.backoff_and_retry and not self.use_urllib3_retry,
+            retry_with_header=self.retry_with_header,
+            max_retries=self.max_backoff_retries,
+            max_backoff_seconds=self.max_backoff_seconds,
+            backoff_factor=self.backoff_factor,
+            backoff_jitter=self.backoff_jitter,
+            back_pressure=BackPressure.for_session(self._session),
+        )
 
-        This method computes an exponential backoff delay based on the retry count and
-        a configurable backoff factor. It optionally adds a random jitter to introduce
-        variability in the delay, which can help prevent synchronized retries in
-        distributed systems. The calculated backoff delay is clamped between 0 and a
-        maximum allowable delay (`self.max_backoff_seconds`) to avoid excessively long
-        wait times.
+    def _cache_identity(self, headers):
+        """
+        Identity of the credentials sent with a request, the responses of a shared ResponseCache vary on it.
+
+        :param headers: dict: The headers of the request
+        :return: string: Hash of the credentials, or None if they can't be told apart (no caching)
+        """
+        auth = self._session.auth
+        if auth is None or isinstance(auth, tuple):
+            credentials = auth
+        elif isinstance(auth, OAuth1):
+            credentials = (auth.client.client_key, auth.client.resource_owner_key)
+        elif isinstance(auth, OAuth2):
+            credentials = auth._client.access_token
+        else:
+            # e.g. Kerberos, the user is only known to the server
+            return None
+        authorization = headers.get("Authorization") or self._session.headers.get("Authorization")
+        # The cookies given to the client, not the ones set by the server later on
+        cookies = sorted(dict(self.cookies or {}).items())
+        identity = repr((credentials, authorization, cookies))
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _calculate_backoff_value(self, retry_count):
+        """
+        Calculate the backoff delay for a given retry attempt, see RetryScheduler.backoff_value.
 
         :param retry_count: int, REQUIRED: The current retry attempt number (1-based).
-            Determines the exponential backoff delay.
-        :return: float: The calculated backoff delay in seconds, adjusted for jitter
-            and clamped to the maximum allowable value.
+        :return: float: The calculated backoff delay in seconds
         """
-        backoff_value = self.backoff_factor * (2 ** (retry_count - 1))
-        if self.backoff_jitter != 0.0:
-            backoff_value += random.uniform(0, self.backoff_jitter)  # nosec B311
-        return float(max(0, min(self.max_backoff_seconds, backoff_value)))
+        return self.retry_scheduler.backoff_value(retry_count)
 
-    def _retry_handler(self):
+    def _prefetch_pages(self, pages, prefetch_pages=None):
         """
-        Creates and returns a retry handler function for managing HTTP request retries.
+        Download the pages of a page generator ahead of the caller, if prefetching is enabled.
 
-        The returned handler function determines whether a request should be retried
-        based on the response and retry settings.
+        :param pages: A generator object for the pages
+        :param prefetch_pages: int: Number of pages to buffer. Defaults to self.prefetch_pages
+        :return: A generator object for the pages
+        """
+        if prefetch_pages is None:
+            prefetch_pages = self.prefetch_pages
+        if not prefetch_pages:
+            return pages
+        return prefetch(pages, prefetch_pages)
 
-        :return: Callable[[Response], bool]: A function that takes an HTTP response object as input and
-        returns `True` if the request should be retried, or `False` otherwise.
+    def _get_paged_concurrently(
+        self,
+        url,
+        params=None,
+        headers=None,
+        results_key="values",
+        start_param="start",
+        limit_param="limit",
+        total_key="total",
+        start=0,
+        limit=None,
+        is_last=None,
+        workers=None,
+    ):
+        """
+        Used to get the paged data of start/limit endpoints with several requests in flight.
+
+        The first page is requested on its own to learn the page size and, if the endpoint reports it,
+        the total. The offsets of the remaining pages are then fetched through a thread pool, either
+        up to the total or, for endpoints without a total, until the last page is reached.
+        Pages are yielded in order, so the caller sees the same sequence as with sequential paging.
+
+        :param url: string:                           The url to retrieve
+        :param params: dict (default is None):        The parameter's
+        :param headers: dict (default is None):       The headers
+        :param results_key: string:                   The key of the elements in the page
+        :param start_param: string:                   The name of the offset parameter (start, startAt, ...)
+        :param limit_param: string:                   The name of the page size parameter (limit, maxResults, ...)
+        :param total_key: string:                     The key of the total in the page, if any
+        :param start: int (default is 0):             The offset of the first element
+        :param limit: int (default is None):          The requested page size, the server default if None
+        :param is_last: callable (default is None):   Returns True if a page is the last one, used if the
+                                                      endpoint doesn't report a total. By default pages
+                                                      flagged with isLastPage or shorter than the page size
+        :param workers: int (default is None):        Number of requests in flight, defaults to max_workers
+
+        :return: A generator object for the data elements
         """
-        retries = 0
+        params = dict(params or {})
+        params[start_param] = int(start or 0)
+        if limit is not None:
+            params[limit_param] = int(limit)
+        if workers is None:
+            workers = self.max_workers
 
-        def _handle(response):
-            nonlocal retries
+        def _fetch(offset):
+            return self.get(url, params=dict(params, **{start_param: offset}), headers=headers) or {}
 
-            if self.retry_with_header and "Retry-After" in response.headers and response.status_code == 429:
-                time.sleep(int(response.headers["Retry-After"]))
-                return True
+        first = _fetch(params[start_param])
+        values = first.get(results_key) or []
+        yield from values
 
-            if not self.backoff_and_retry or self.use_urllib3_retry:
-                return False
+        page_size = int(first.get(limit_param) or len(values))
+        if page_size == 0 or len(values) == 0:
+            return
+        if is_last is None:
 
-            if retries < self.max_backoff_retries and response.status_code in self.retry_status_codes:
-                retries += 1
-                backoff_value = self._calculate_backoff_value(retries)
-                time.sleep(backoff_value)
-                return True
+            def is_last(page):
+                return page.get("isLastPage", False) or len(page.get(results_key) or []) < page_size
 
-            return False
+        offset = params[start_param] + page_size
+        if first.get(total_key) is not None:
+            offsets = range(offset, int(first[total_key]), page_size)
 
-        return _handle
+            def _stop(page):
+                return not page.get(results_key)
+
+        else:
+            if is_last(first):
+                return
+            offsets = itertools.count(offset, page_size)
+            _stop = is_last
+
+        for page in fetch_ahead(_fetch, offsets, workers, _stop):
+            yield from page.get(results_key) or []
 
     def log_curl_debug(self, method, url, data=None, headers=None, level=logging.DEBUG):
         """
@@ -304,15 +442,40 @@ class AtlassianRestAPI(object):
         :param level:
         :return:
         """
+        if not log.isEnabledFor(level):
+            return
         headers = headers or self.default_headers
-        message = "curl --silent -X {method} -H {headers} {data} '{url}'".format(
-            method=method,
-            headers=" -H ".join([f"'{key}: {value}'" for key, value in list(headers.items())]),
-            data="" if not data else f"--data '{dumps(data)}'",
-            url=url,
-        )
+        message = CurlRequestFormatter().format_request(method, url, headers=headers, body=data)
         log.log(level=level, msg=message)
 
+    def _log_request(self, method, url, headers=None, body=None):
+        """
+        Log a request with the request formatter, if DEBUG is enabled
+        :param method:
+        :param url:
+        :param headers:
+        :param body: The body before serialization
+        :return:
+        """
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(self.request_formatter.format_request(method, url, headers=headers, body=body))
+
+    def _log_response(self, method, path, response, stream=False):
+        """
+        Log a response with the request formatter, if DEBUG is enabled
+        :param method:
+        :param path:
+        :param response:
+        :param stream: bool: The body is streamed, only the status is logged
+        :return:
+        """
+        if not log.isEnabledFor(logging.DEBUG):
+            return
+        if stream:
+            log.debug("HTTP: %s %s -> %s (streamed)", method, path, response.status_code)
+        else:
+            log.debug(self.request_formatter.format_response(method, path, response))
+
     def resource_url(self, resource, api_root=None, api_version=None):
         if api_root is None:
             api_root = self.api_root
@@ -327,6 +490,29 @@ class AtlassianRestAPI(object):
             url_link += "/"
         return url_link
 
+    def _build_url(self, path, params=None, flags=None, trailing=None, absolute=False):
+        """
+        Build the full request url including the query string
+        :param path: Path of request
+        :param params: dict of query parameters
+        :param flags: list of raw query flags
+        :param trailing: bool - OPTIONAL: Add trailing slash to url
+        :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
+        :return: url as string
+        """
+        url = self.url_joiner(None if absolute else self.url, path, trailing)
+        params_already_in_url = True if "?" in url else False
+        if params or flags:
+            if params_already_in_url:
+                url += "&"
+            else:
+                url += "?"
+        if params:
+            url += urlencode((params or {}), safe=",")
+        if flags:
+            url += ("&" if params or params_already_in_url else "") + "&".join(flags or [])
+        return url
+
     def close(self):
         return self._session.close()
 
@@ -343,6 +529,7 @@ class AtlassianRestAPI(object):
         trailing=None,
         absolute=False,
         advanced_mode=False,
+        stream=False,
     ):
         """
 
@@ -357,34 +544,35 @@ class AtlassianRestAPI(object):
         :param trailing: bool - OPTIONAL: Add trailing slash to url
         :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
         :param advanced_mode: bool, OPTIONAL: Return the raw response
+        :param stream: bool, OPTIONAL: Don't download the body up front, the caller reads it
+                       with response.iter_content and has to close the response
         :return:
         """
-        url = self.url_joiner(None if absolute else self.url, path, trailing)
-        params_already_in_url = True if "?" in url else False
-        if params or flags:
-            if params_already_in_url:
-                url += "&"
-            else:
-                url += "?"
-        if params:
-            url += urlencode((params or {}), safe=",")
-        if flags:
-            url += ("&" if params or params_already_in_url else "") + "&".join(flags or [])
-        json_dump = None
-        if files is None:
-            data = None if not data else dumps(data)
-            json_dump = None if not json else dumps(json)
-
+        url = self._build_url(path, params=params, flags=flags, trailing=trailing, absolute=absolute)
+        body = json if data is None else data
         headers = headers or self.default_headers
-
-        retry_handler = self._retry_handler()
+        if files is None:
+            data = None if not data else self.json_codec.dumps(data)
+            if data is None and json is not None:
+                data, json = self.json_codec.dumps(json), None
+                if "Content-Type" not in headers:
+                    headers = dict(headers, **{"Content-Type": "application/json"})
+
+        cache_key = cached = None
+        if self.response_cache is not None and method == "GET" and not stream:
+            vary = self._cache_identity(headers)
+            if vary is not None:
+                cache_key = self.response_cache.key(url, headers, vary=vary)
+                cached = self.response_cache.lookup(cache_key)
+            if cached is not None:
+                headers = dict(headers, **self.response_cache.validators(cached))
+
+        retry = self.retry_scheduler.new_call()
         while True:
-            self.log_curl_debug(
-                method=method,
-                url=url,
-                headers=headers,
-                data=data or json_dump,
-            )
+            retry.wait()
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+            self._log_request(method, url, headers=headers, body=body)
             response = self._session.request(
                 method=method,
                 url=url,
@@ -396,16 +584,22 @@ class AtlassianRestAPI(object):
                 files=files,
                 proxies=self.proxies,
                 cert=self.cert,
+                stream=stream,
             )
-            continue_retries = retry_handler(response)
-            if continue_retries:
-                continue
-            break
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(url, response)
+            if not retry.should_retry(response):
+                break
+            if stream:
+                # Release the connection of the discarded response
+                response.close()
 
         response.encoding = "utf-8"
 
-        log.debug("HTTP: %s %s -> %s %s", method, path, response.status_code, response.reason)
-        log.debug("HTTP: Response text -> %s", response.text)
+        self._log_response(method, path, response, stream=stream)
+
+        if cache_key is not None:
+            response = self.response_cache.update(cache_key, response, cached)
 
         if self.advanced_mode or advanced_mode:
             return response
@@ -454,14 +648,84 @@ class AtlassianRestAPI(object):
         if not_json_response:
             return response.content
         else:
-            if not response.text:
+            if not response.content:
                 return None
             try:
-                return response.json()
+                return self.json_codec.decode(response)
             except Exception as e:
                 log.error(e)
                 return response.text
 
+    def iter_content(
+        self,
+        path,
+        params=None,
+        headers=None,
+        chunk_size=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Stream the body of a GET request, without holding it in memory.
+        The body is neither decoded nor logged.
+        :param path:
+        :param params:
+        :param headers:
+        :param chunk_size: int, OPTIONAL: Size of the chunks in bytes. Default: stream_chunk_size
+        :param trailing: OPTIONAL: for wrap slash symbol in the end of string
+        :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
+        :return: A generator object for the chunks (bytes)
+        """
+        response = self.request(
+            "GET",
+            path=path,
+            params=params,
+            headers=headers,
+            trailing=trailing,
+            absolute=absolute,
+            advanced_mode=True,
+            stream=True,
+        )
+        try:
+            self.raise_for_status(response)
+            yield from response.iter_content(chunk_size=chunk_size or self.stream_chunk_size)
+        finally:
+            response.close()
+
+    def download(
+        self,
+        path,
+        dest_fd,
+        params=None,
+        headers=None,
+        chunk_size=None,
+        trailing=None,
+        absolute=False,
+    ):
+        """
+        Write the body of a GET request to a file-like object in chunks.
+        :param path:
+        :param dest_fd: a file-like object opened for binary writing
+        :param params:
+        :param headers:
+        :param chunk_size: int, OPTIONAL: Size of the chunks in bytes. Default: stream_chunk_size
+        :param trailing: OPTIONAL: for wrap slash symbol in the end of string
+        :param absolute: bool, OPTIONAL: Do not prefix url, url is absolute
+        :return: Number of bytes written
+        """
+        size = 0
+        for chunk in self.iter_content(
+            path,
+            params=params,
+            headers=headers,
+            chunk_size=chunk_size,
+            trailing=trailing,
+            absolute=absolute,
+        ):
+            dest_fd.write(chunk)
+            size += len(chunk)
+        return size
+
     def _get_response_content(
         self,
         *args,
@@ -484,7 +748,7 @@ class AtlassianRestAPI(object):
                 response = response.get(*field)
         else:  # requests.Response
             first_field = fields[0]
-            response = response.json().get(*first_field)
+            response = self.json_codec.decode(response).get(*first_field)
             for field in fields[1:]:
                 response = response.get(*field)
 
@@ -660,7 +924,7 @@ class AtlassianRestAPI(object):
 
         if 400 <= response.status_code < 600:
             try:
-                j = response.json()
+                j = self.json_codec.decode(response)
                 if self.url == "https://api.atlassian.com":
                     error_msg = "\n".join([f"{k}: {v}" for k, v in list(j.items())])
                 else:
@@ -0,0 +1,284 @@
+# coding=utf-8
+"""
+Retry scheduling for the REST clients.
+
+The scheduler decides whether a response is retried and when the next attempt may start.
+It never sleeps itself: callers ask for the next eligible time and wait in whatever way
+suits them (time.sleep, asyncio.sleep, or doing other work in the meantime).
+"""
+
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+_back_pressures = weakref.WeakKeyDictionary()
+_back_pressures_lock = threading.Lock()
+
+
+def parse_retry_after(value):
+    """
+    Parse the value of a Retry-After header.
+
+    :param value: string: Delay in seconds or an HTTP date
+    :return: float: Delay in seconds, or None if the value can't be parsed
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class BackPressure(object):
+    """
+    The earliest time at which requests over a session may be sent again.
+
+    A throttled response (429) pushes the time out, every request on the same session waits
+    for it, so one throttled call slows its siblings down instead of all of them hammering the server.
+    Thread safe.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._not_before = 0.0
+
+    @classmethod
+    def for_session(cls, session):
+        """
+        Get the back-pressure shared by all clients and threads using the given session.
+
+        :param session: A requests.Session or httpx.AsyncClient
+        :return: BackPressure
+        """
+        with _back_pressures_lock:
+            try:
+                back_pressure = _back_pressures.get(session)
+            except TypeError:
+                # Not weakly referenceable, don't share
+                return cls()
+            if back_pressure is None:
+                back_pressure = cls()
+                _back_pressures[session] = back_pressure
+            return back_pressure
+
+    def push(self, delay):
+        """
+        Hold back all requests for the next delay seconds.
+
+        :param delay: float: Seconds
+        :return: float: The new eligible time (clock value)
+        """
+        with self._lock:
+            self._not_before = max(self._not_before, self._clock() + delay)
+            return self._not_before
+
+    def next_eligible_time(self):
+        """
+        :return: float: The clock value before which no request should be sent
+        """
+        with self._lock:
+            return self._not_before
+
+
+class RetryScheduler(object):
+    """
+    Decides which responses are retried and how long to wait before the next attempt.
+
+    Retries are bounded by budgets per call (number of retries, seconds spent waiting) and
+    per client (retries and seconds spent waiting within a sliding window), so a misbehaving
+    server can't keep a caller busy for hours.
+    """
+
+    def __init__(
+        self,
+        retry_status_codes=(413, 429, 503),
+        backoff_and_retry=False,
+        retry_with_header=True,
+        max_retries=1000,
+        max_backoff_seconds=1800,
+        backoff_factor=1.0,
+        backoff_jitter=1.0,
+        max_call_seconds=None,
+        max_client_retries=None,
+        max_client_seconds=None,
+        budget_window=60,
+        back_pressure=None,
+        clock=time.monotonic,
+    ):
+        """
+        :param retry_status_codes: HTTP status codes retried with exponential backoff.
+        :param backoff_and_retry: Enable exponential backoff for the retry_status_codes.
+        :param retry_with_header: Retry 429 responses after the delay of their Retry-After header.
+        :param max_retries: Maximum number of retries of a single call.
+        :param max_backoff_seconds: Maximum delay of a single backoff.
+        :param backoff_factor: Factor of the exponential backoff.
+        :param backoff_jitter: Maximum random delay added to a backoff.
+        :param max_call_seconds: Maximum seconds a single call may spend waiting for retries.
+                Defaults to None (unbounded).
+        :param max_client_retries: Maximum number of retries of all calls within budget_window.
+                Defaults to None (unbounded).
+        :param max_client_seconds: Maximum seconds all calls may spend waiting for retries within
+                budget_window. Defaults to None (unbounded).
+        :param budget_window: Length of the sliding window of the client budgets, in seconds.
+        :param back_pressure: BackPressure shared with other schedulers, e.g. BackPressure.for_session.
+                Defaults to the back-pressure of the session of the first client the scheduler is
+                passed to, or a private one.
+        :param clock: Monotonic clock, time.monotonic by default.
+        """
+        self.retry_status_codes = retry_status_codes
+        self.backoff_and_retry = backoff_and_retry
+        self.retry_with_header = retry_with_header
+        self.max_retries = max_retries
+        self.max_backoff_seconds = max_backoff_seconds
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.max_call_seconds = max_call_seconds
+        self.max_client_retries = max_client_retries
+        self.max_client_seconds = max_client_seconds
+        self.budget_window = budget_window
+        self.back_pressure = back_pressure or BackPressure(clock)
+        self._own_back_pressure = back_pressure is None
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (clock, delay) of the retries within the budget window
+        self._spent = deque()
+
+    def share_back_pressure(self, back_pressure):
+        """
+        Use the given back-pressure if the scheduler was created without one, e.g. the back-pressure of
+        the session of the client the scheduler is passed to. The first one is kept, a back-pressure
+        with a different clock is ignored.
+
+        :param back_pressure: BackPressure
+        """
+        with self._lock:
+            if self._own_back_pressure and back_pressure._clock is self.clock:
+                self.back_pressure = back_pressure
+                self._own_back_pressure = False
+
+    def backoff_value(self, retry_count):
+        """
+        Calculate the exponential backoff delay for a retry attempt, including jitter,
+        clamped between 0 and max_backoff_seconds.
+
+        :param retry_count: int: The current retry attempt number (1-based)
+        :return: float: Delay in seconds
+        """
+        backoff_value = self.backoff_factor * (2 ** (retry_count - 1))
+        if self.backoff_jitter != 0.0:
+            backoff_value += random.uniform(0, self.backoff_jitter)  # nosec B311
+        return float(max(0, min(self.max_backoff_seconds, backoff_value)))
+
+    def new_call(self):
+        """
+        Start tracking the retries of a call.
+
+        :return: RetryCall
+        """
+        return RetryCall(self)
+
+    def next_eligible_time(self):
+        """
+        :return: float: The clock value before which no request should be sent on the session
+        """
+        return self.back_pressure.next_eligible_time()
+
+    def _spend(self, delay):
+        """
+        Charge a retry to the client budget.
+
+        :param delay: float: Seconds the retry waits
+        :return: bool: False if the client budget is exhausted
+        """
+        if self.max_client_retries is None and self.max_client_seconds is None:
+            return True
+        now = self.clock()
+        with self._lock:
+            while self._spent and self._spent[0][0] <= now - self.budget_window:
+                self._spent.popleft()
+            if self.max_client_retries is not None and len(self._spent) >= self.max_client_retries:
+                return False
+            if self.max_client_seconds is not None:
+                if sum(spent for _, spent in self._spent) + delay > self.max_client_seconds:
+                    return False
+            self._spent.append((now, delay))
+            return True
+
+
+class RetryCall(object):
+    """
+    Retry state of a single call, created by RetryScheduler.new_call.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.retries = 0
+        self.waited = 0.0
+        self._not_before = 0.0
+
+    def _delay(self, response):
+        scheduler = self.scheduler
+        status_code = response.status_code
+        if scheduler.retry_with_header and status_code == 429:
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is not None:
+                return delay
+        if scheduler.backoff_and_retry and status_code in scheduler.retry_status_codes:
+            return scheduler.backoff_value(self.retries + 1)
+        return None
+
+    def should_retry(self, response):
+        """
+        Check if the response is retried and schedule the next attempt.
+        Throttled responses (429) also hold back the other requests on the session.
+
+        :param response: The response of the last attempt
+        :return: bool: True if the call should be retried once next_eligible_time is reached
+        """
+        scheduler = self.scheduler
+        delay = self._delay(response)
+        if delay is None or self.retries >= scheduler.max_retries:
+            return False
+        if scheduler.max_call_seconds is not None and self.waited + delay > scheduler.max_call_seconds:
+            return False
+        if not scheduler._spend(delay):
+            return False
+        self.retries += 1
+        self.waited += delay
+        if response.status_code == 429:
+            self._not_before = scheduler.back_pressure.push(delay)
+        else:
+            self._not_before = scheduler.clock() + delay
+        return True
+
+    def next_eligible_time(self):
+        """
+        :return: float: The clock value before which the next attempt should not be sent
+        """
+        return max(self._not_before, self.scheduler.next_eligible_time())
+
+    def delay(self):
+        """
+        :return: float: Seconds until the next attempt may be sent
+        """
+        return max(0.0, self.next_eligible_time() - self.scheduler.clock())
+
+    def wait(self):
+        """
+        Block the calling thread until the next attempt may be sent.
+        """
+        delay = self.delay()
+        if delay > 0:
+            time.sleep(delay)
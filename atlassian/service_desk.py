@@ -533,14 +533,12 @@ class ServiceDesk(AtlassianRestAPI):
 
         with open(filename, "rb") as file:
             # bug https://github.com/atlassian-api/atlassian-python-api/issues/1056
-            # in advanced_mode it returns the raw response therefore .json() is needed
+            # in advanced_mode it returns the raw response therefore it has to be decoded
             # in normal mode this is not needed and would fail
             if self.advanced_mode:
-                result = (
+                result = self.json_codec.decode(
                     self.post(path=url, headers=experimental_headers, files={"file": file})
-                    .json()
-                    .get("temporaryAttachments")
-                )
+                ).get("temporaryAttachments")
             else:
                 result = self.post(path=url, headers=experimental_headers, files={"file": file}).get(
                     "temporaryAttachments"
@@ -719,6 +717,30 @@ class ServiceDesk(AtlassianRestAPI):
 
         return self.get(url, headers=self.experimental_headers, params=params)
 
+    def get_all_customers(self, service_desk_id, query=None, limit=50, workers=None):
+        """
+        Returns all customers on a service desk as a generator.
+        After the first page the following pages are requested concurrently, in windows of `workers` pages.
+
+        :param service_desk_id: str
+        :param query: OPTIONAL: filter matched against customers' displayName, name, or email
+        :param limit: OPTIONAL: The page size of each request. Default: 50
+        :param workers: OPTIONAL: Number of pages requested concurrently. Default: max_workers of the client
+        :return: A generator object for the customers
+        """
+        url = f"rest/servicedeskapi/servicedesk/{service_desk_id}/customer"
+        params = {}
+        if query is not None:
+            params["query"] = query
+
+        return self._get_paged_concurrently(
+            url,
+            params=params,
+            headers=self.experimental_headers,
+            limit=limit,
+            workers=workers,
+        )
+
     def add_customers(self, service_desk_id, list_of_usernames=[], list_of_accountids=[]):
         """
         Adds one or more existing customers to the given service desk.
@@ -920,7 +942,7 @@ class ServiceDesk(AtlassianRestAPI):
 
         if 400 <= response.status_code < 600:
             try:
-                j = response.json()
+                j = self.json_codec.decode(response)
                 error_msg = j["errorMessage"]
             except Exception as e:
                 log.error(e)
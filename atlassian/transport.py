@@ -0,0 +1,144 @@
+# coding=utf-8
+"""
+Connection pool configuration shared between client instances.
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+
+class _SharedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connection pool outlives the sessions it is mounted on.
+    Closing a session doesn't drain the pool used by the other clients, TransportConfig.close does.
+    """
+
+    def __init__(self, poolmanager=None, **kwargs):
+        """
+        :param poolmanager: urllib3 PoolManager of another adapter to use instead of creating one
+        """
+        self._shared_poolmanager = poolmanager
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        poolmanager = getattr(self, "_shared_poolmanager", None)
+        if poolmanager is None:
+            super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+            return
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = poolmanager
+
+    def close(self):
+        pass
+
+    def _close(self):
+        super().close()
+
+
+class TransportConfig(object):
+    """
+    Connection pool settings for the REST clients.
+
+    Clients created with the same TransportConfig and pointed at the same host share one urllib3
+    connection pool, e.g. Jira, ServiceDesk and Insight instances of the same site. Each client
+    keeps its own session, so authentication is not shared.
+
+    HTTP/2 is only available for the async clients, requests speaks HTTP/1.1.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=32, pool_block=False, keep_alive=True, http2=True):
+        """
+        :param pool_connections: int: Number of hosts (pools) kept per adapter
+        :param pool_maxsize: int: Maximum number of connections kept open per host. Should be at least
+                the number of threads using the clients, otherwise connections are discarded.
+        :param pool_block: bool: Wait for a free connection instead of opening a throwaway one
+                when the pool is exhausted
+        :param keep_alive: bool: Reuse connections between requests
+        :param http2: bool: Use HTTP/2 in the async clients if the h2 package is installed
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.http2 = http2
+        self._lock = threading.Lock()
+        self._adapters = {}
+
+    @staticmethod
+    def _prefix(url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    def _new_adapter(self, max_retries=0, poolmanager=None):
+        return _SharedHTTPAdapter(
+            poolmanager=poolmanager,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=max_retries,
+        )
+
+    def adapter(self, url, max_retries=None):
+        """
+        Get an adapter using the shared connection pool of the host of the url.
+
+        :param url: string: Url of the client
+        :param max_retries: urllib3 Retry of the client, if any. The adapter is then private to the
+                client, but still uses the shared connection pool.
+        :return: HTTPAdapter
+        """
+        prefix = self._prefix(url)
+        with self._lock:
+            shared = self._adapters.get(prefix)
+            if shared is None:
+                shared = self._new_adapter()
+                self._adapters[prefix] = shared
+        if max_retries is None:
+            return shared
+        return self._new_adapter(max_retries, poolmanager=shared.poolmanager)
+
+    def mount(self, session, url, max_retries=None):
+        """
+        Route the requests of a session to the host of the url through the shared connection pool.
+
+        :param session: requests.Session
+        :param url: string: Url of the client
+        :param max_retries: urllib3 Retry of the client, if any
+        """
+        session.mount(self._prefix(url), self.adapter(url, max_retries=max_retries))
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+    def async_client_kwargs(self):
+        """
+        Get the connection settings for an httpx.AsyncClient.
+        Redirects are followed, like by requests.
+
+        :return: dict of keyword arguments
+        """
+        import httpx
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        limits = httpx.Limits(
+            max_connections=None if not self.pool_block else self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+        )
+        return {"limits": limits, "http2": http2, "follow_redirects": True}
+
+    def close(self):
+        """
+        Close the shared connection pools.
+        """
+        with self._lock:
+            adapters, self._adapters = list(self._adapters.values()), {}
+        for adapter in adapters:
+            adapter._close()
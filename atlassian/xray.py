@@ -25,7 +25,7 @@ class Xray(AtlassianRestAPI):
 
         if 400 <= response.status_code < 600:
             try:
-                j = response.json()
+                j = self.json_codec.decode(response)
                 error_msg = j["message"]
             except Exception as e:
                 log.error(e)
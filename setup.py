@@ -27,7 +27,12 @@ setup(
     include_package_data=True,
     zip_safe=False,
     install_requires=["deprecated", "requests", "six", "oauthlib", "requests_oauthlib", "jmespath", "beautifulsoup4"],
-    extras_require={"kerberos": ["requests-kerberos"]},
+    extras_require={
+        "kerberos": ["requests-kerberos"],
+        "async": ["httpx"],
+        "http2": ["httpx[http2]"],
+        "fast-json": ["orjson"],
+    },
     platforms="Platform Independent",
     classifiers=[
         "Development Status :: 4 - Beta",
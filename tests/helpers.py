@@ -0,0 +1,22 @@
+# coding: utf8
+"""Fakes shared by the tests of the retries, rate limits, caches and metadata"""
+
+from requests import Response
+
+
+class FakeClock(object):
+    """Clock which only moves when the test sets now"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_response(status_code=200, headers=None, content=b"{}"):
+    response = Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = content
+    return response
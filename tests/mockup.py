@@ -70,6 +70,8 @@ def request_mockup(*args, **kwargs):
         response.status_code = 404  # Not found
         response.reason = f"No stub defined for key [{response_key}] in [{response_file}]"
 
+    # Without stream=True requests reads the body before returning the response
+    response._content_consumed = True
     return response
 
 
@@ -0,0 +1,147 @@
+# coding: utf8
+"""Tests for the asyncio clients"""
+
+import io
+import json
+import unittest
+
+from requests import ConnectionError, HTTPError
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from atlassian.aio import AsyncBitbucket, AsyncConfluence, AsyncJira
+
+SERVER = "https://my.test.server.com"
+
+
+def _client(cls, handler, **kwargs):
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return cls(SERVER, username="username", password="password", session=session, **kwargs)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    async def test_get_issue(self):
+        def handler(request):
+            self.assertEqual(request.url.path, "/rest/api/2/issue/FOO-123")
+            self.assertEqual(request.url.params["fields"], "summary,status")
+            return httpx.Response(200, json={"key": "FOO-123"})
+
+        async with _client(AsyncJira, handler) as jira:
+            issue = await jira.get_issue("FOO-123", fields=["summary", "status"])
+        self.assertEqual(issue["key"], "FOO-123")
+
+    async def test_post_sends_json_body(self):
+        def handler(request):
+            self.assertEqual(json.loads(request.content), {"fields": {"summary": "Test"}})
+            return httpx.Response(201, json={"key": "FOO-1"})
+
+        async with _client(AsyncJira, handler) as jira:
+            issue = await jira.create_issue(fields={"summary": "Test"})
+        self.assertEqual(issue["key"], "FOO-1")
+
+    async def test_error_is_raised(self):
+        def handler(request):
+            return httpx.Response(404, json={"errorMessages": ["Issue does not exist"]})
+
+        async with _client(AsyncJira, handler) as jira:
+            with self.assertRaises(HTTPError) as context:
+                await jira.get_issue("FOO-321")
+        self.assertEqual(str(context.exception), "Issue does not exist")
+
+    async def test_retry_after_header(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"key": "FOO-123"})
+
+        async with _client(AsyncJira, handler) as jira:
+            issue = await jira.get_issue("FOO-123")
+        self.assertEqual(issue["key"], "FOO-123")
+        self.assertEqual(len(calls), 2)
+
+    async def test_bitbucket_server_paging(self):
+        def handler(request):
+            start = int(request.url.params.get("start", 0))
+            if start == 0:
+                return httpx.Response(200, json={"values": [{"key": "A"}, {"key": "B"}], "nextPageStart": 2})
+            return httpx.Response(200, json={"values": [{"key": "C"}], "isLastPage": True})
+
+        async with _client(AsyncBitbucket, handler) as bitbucket:
+            projects = [project["key"] async for project in bitbucket.project_list()]
+        self.assertEqual(projects, ["A", "B", "C"])
+
+    async def test_confluence_paging_follows_next_link(self):
+        def handler(request):
+            if "start" not in request.url.params:
+                return httpx.Response(
+                    200,
+                    json={
+                        "results": [{"id": "1"}],
+                        "_links": {"next": "/rest/api/content/10/child/page?start=1"},
+                    },
+                )
+            return httpx.Response(200, json={"results": [{"id": "2"}], "_links": {}})
+
+        async with _client(AsyncConfluence, handler) as confluence:
+            children = [page["id"] async for page in confluence.get_page_child_by_type(10)]
+        self.assertEqual(children, ["1", "2"])
+
+    async def test_download_streams_body(self):
+        def handler(request):
+            return httpx.Response(200, content=b"x" * 1000)
+
+        async with _client(AsyncJira, handler) as jira:
+            with io.BytesIO() as buf:
+                size = await jira.download("rest/api/2/attachment/content/10000", buf, chunk_size=100)
+                self.assertEqual(buf.getvalue(), b"x" * 1000)
+        self.assertEqual(size, 1000)
+
+    async def test_redirects_are_followed(self):
+        def handler(request):
+            if request.url.path.startswith("/secure/attachment"):
+                return httpx.Response(302, headers={"Location": f"{SERVER}/files/10000"})
+            return httpx.Response(200, content=b"data")
+
+        async with _client(AsyncJira, handler) as jira:
+            with io.BytesIO() as buf:
+                await jira.download("secure/attachment/10000/file.txt", buf)
+                self.assertEqual(buf.getvalue(), b"data")
+
+    async def test_errors_are_raised_as_requests_errors(self):
+        def handler(request):
+            if request.url.path.endswith("down"):
+                raise httpx.ConnectError("Connection refused", request=request)
+            return httpx.Response(500, text="Internal error")
+
+        async with _client(AsyncJira, handler) as jira:
+            with self.assertRaises(HTTPError):
+                await jira.get("rest/api/2/serverInfo")
+            with self.assertRaises(ConnectionError):
+                await jira.get("rest/api/2/down")
+
+    async def test_not_modified_is_not_an_error(self):
+        def handler(request):
+            return httpx.Response(304)
+
+        async with _client(AsyncJira, handler) as jira:
+            response = await jira.get("rest/api/2/field", advanced_mode=False, not_json_response=True)
+        self.assertEqual(response, b"")
+
+    async def test_thread_helpers_are_rejected(self):
+        with self.assertRaises(ValueError):
+            _client(AsyncJira, lambda request: httpx.Response(200), max_workers=4)
+        async with _client(AsyncJira, lambda request: httpx.Response(200)) as jira:
+            with self.assertRaises(NotImplementedError):
+                jira._get_paged_concurrently("rest/api/2/project/search")
+            with self.assertRaises(NotImplementedError):
+                jira._prefetch_pages(iter([]), prefetch_pages=2)
+            with self.assertRaises(TypeError):
+                with jira:
+                    pass
@@ -0,0 +1,166 @@
+# coding: utf8
+"""Tests for the bulk operations"""
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from requests import HTTPError, Response
+
+from atlassian import Jira
+from atlassian.bulk import BulkResultLog
+
+
+def _http_error(status_code):
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(f"HTTP {status_code}", response=response)
+
+
+class TestBulkUpdate(TestCase):
+    def setUp(self):
+        self.jira = Jira("https://jira.example.com", max_workers=3, backoff_jitter=0.0, backoff_factor=0.0)
+        self.calls = []
+
+    def _put(self, path, data=None, **kwargs):
+        key = path.rsplit("/", 1)[1]
+        self.calls.append(key)
+        if key == "FOO-2":
+            raise _http_error(400)
+        if key == "FOO-3" and self.calls.count("FOO-3") == 1:
+            raise _http_error(503)
+        return {}
+
+    def test_results_per_issue(self):
+        keys = [f"FOO-{i}" for i in range(1, 6)]
+        with patch.object(Jira, "put", side_effect=self._put):
+            results = self.jira.bulk_update_issues(keys, fields={"labels": ["bulk"]})
+        self.assertEqual([result.key for result in results], keys)
+        self.assertEqual([result.status for result in results], ["success", "error", "retried", "success", "success"])
+        self.assertEqual(results[1].error, "HTTP 400")
+        self.assertEqual(self.calls.count("FOO-2"), 1)
+
+    def test_throttled_updates_are_left_to_the_client(self):
+        with patch.object(Jira, "put", side_effect=_http_error(429)) as put:
+            results = self.jira.bulk_update_issues(["FOO-1"], fields={"labels": ["bulk"]})
+        self.assertEqual(put.call_count, 1)
+        self.assertEqual(results[0].status, "error")
+
+    def test_per_issue_kwargs_and_method(self):
+        with patch.object(Jira, "put", return_value={}) as put:
+            results = self.jira.bulk_update_issues(
+                {"FOO-1": {"labels": ["a"]}, "FOO-2": {"labels": ["b"]}}, method="label_issue"
+            )
+        self.assertTrue(all(result.ok for result in results))
+        payloads = sorted(call.kwargs["data"]["update"]["labels"][0]["add"] for call in put.call_args_list)
+        self.assertEqual(payloads, ["a", "b"])
+
+    def test_resume_from_result_log(self):
+        keys = [f"FOO-{i}" for i in range(1, 6)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            with patch.object(Jira, "put", side_effect=self._put):
+                self.jira.bulk_update_issues(keys, fields={"labels": ["bulk"]}, result_log=path)
+            self.assertEqual(BulkResultLog(path).succeeded(), {"FOO-1", "FOO-3", "FOO-4", "FOO-5"})
+            self.calls = []
+            with patch.object(Jira, "put", side_effect=self._put):
+                results = self.jira.bulk_update_issues(keys, fields={"labels": ["bulk"]}, result_log=path)
+        self.assertEqual(self.calls, ["FOO-2"])
+        self.assertEqual([result.status for result in results].count("skipped"), 4)
+
+    def test_bulk_update_issue_field_continues_after_errors(self):
+        with patch.object(Jira, "put", side_effect=self._put):
+            self.assertFalse(self.jira.bulk_update_issue_field(["FOO-1", "FOO-2", "FOO-4"], fields={"labels": []}))
+        self.assertIn("FOO-4", self.calls)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            self.jira.bulk_update_issues(["FOO-1"], method="delete_issue")
+
+
+def _json_response(status_code, body):
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode("utf-8")
+    return response
+
+
+class TestCreateIssues(TestCase):
+    def setUp(self):
+        self.jira = Jira("https://jira.example.com", max_workers=2, backoff_jitter=0.0, backoff_factor=0.0)
+        self.requests = []
+
+    def _post(self, path, data=None, **kwargs):
+        summaries = [issue["fields"]["summary"] for issue in data["issueUpdates"]]
+        self.requests.append(summaries)
+        issues, errors = [], []
+        for position, summary in enumerate(summaries):
+            number = int(summary)
+            if number == 7:
+                errors.append(
+                    {"status": 400, "elementErrors": {"errors": {"summary": "bad"}}, "failedElementNumber": position}
+                )
+            elif number == 3 and len(self.requests) <= 3:
+                errors.append({"status": 503, "elementErrors": {}, "failedElementNumber": position})
+            else:
+                issues.append({"id": str(1000 + number), "key": f"FOO-{number}"})
+        return _json_response(201 if issues else 400, {"issues": issues, "errors": errors})
+
+    def test_chunks_merge_and_retry_failed(self):
+        data = ({"fields": {"summary": str(i)}} for i in range(10))
+        with patch.object(Jira, "post", side_effect=self._post):
+            result = self.jira.create_issues(data, chunk_size=4)
+        self.assertEqual([len(summaries) for summaries in self.requests], [4, 4, 2, 1])
+        self.assertEqual(self.requests[-1], ["3"])
+        self.assertEqual([issue["elementNumber"] for issue in result["issues"]], [0, 1, 2, 3, 4, 5, 6, 8, 9])
+        self.assertEqual([issue["key"] for issue in result["issues"]][6:], ["FOO-6", "FOO-8", "FOO-9"])
+        self.assertEqual(len(result["errors"]), 1)
+        self.assertEqual(result["errors"][0]["failedElementNumber"], 7)
+        self.assertEqual(result["errors"][0]["status"], 400)
+
+    def test_transient_errors_give_up_after_max_attempts(self):
+        with patch.object(Jira, "post", return_value=_json_response(503, {"message": "down"})) as post:
+            result = self.jira.create_issues(
+                [{"fields": {"summary": "1"}}, {"fields": {"summary": "2"}}], max_attempts=2
+            )
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(result["issues"], [])
+        self.assertEqual([error["failedElementNumber"] for error in result["errors"]], [0, 1])
+
+    def test_request_errors_are_raised(self):
+        with patch.object(
+            Jira, "post", return_value=_json_response(403, {"errorMessages": ["forbidden"], "errors": {}})
+        ):
+            with self.assertRaises(HTTPError):
+                self.jira.create_issues([{"fields": {"summary": "1"}}])
+
+    def test_errors_without_element_number_leave_the_chunk_unknown(self):
+        # The error is for the first issue, the others were created
+        body = {
+            "issues": [{"id": "1001", "key": "FOO-1"}, {"id": "1002", "key": "FOO-2"}],
+            "errors": [{"status": 400, "elementErrors": {"errorMessages": ["Project is archived"], "errors": {}}}],
+        }
+        with patch.object(Jira, "post", return_value=_json_response(400, body)) as post:
+            result = self.jira.create_issues([{"fields": {"summary": str(i)}} for i in range(3)])
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual([issue["key"] for issue in result["issues"]], ["FOO-1", "FOO-2"])
+        self.assertEqual([issue["elementNumber"] for issue in result["issues"]], [None, None])
+        self.assertEqual([error["failedElementNumber"] for error in result["errors"]], [None])
+        self.assertEqual(result["errors"][0]["elementErrors"]["errorMessages"], ["Project is archived"])
+        self.assertEqual(result["unknown"], [0, 1, 2])
+
+    def test_errors_without_element_number_keep_a_complete_chunk_matched(self):
+        body = {
+            "issues": [{"id": "1000", "key": "FOO-0"}, {"id": "1002", "key": "FOO-2"}],
+            "errors": [
+                {"status": 400, "elementErrors": {"errors": {"summary": "bad"}}, "failedElementNumber": 1},
+                {"status": 400, "elementErrors": {"errorMessages": ["Something else"], "errors": {}}},
+            ],
+        }
+        with patch.object(Jira, "post", return_value=_json_response(201, body)):
+            result = self.jira.create_issues([{"fields": {"summary": str(i)}} for i in range(3)])
+        self.assertEqual([issue["elementNumber"] for issue in result["issues"]], [0, 2])
+        self.assertEqual([error["failedElementNumber"] for error in result["errors"]], [1, None])
+        self.assertEqual(result["unknown"], [])
@@ -0,0 +1,162 @@
+# coding: utf8
+"""Tests for the conditional request cache"""
+
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from atlassian import Jira
+from atlassian.cache import CachedResponse, FileCache, MemoryCache, ResponseCache, SQLiteCache
+
+from .helpers import FakeClock, fake_response
+
+
+def _entry(content=b"{}", stored_at=1000.0):
+    return CachedResponse(200, {"ETag": '"1"'}, content, stored_at)
+
+
+class StoreTests(object):
+    def create_store(self, **kwargs):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_get_set(self):
+        store = self.create_store()
+        self.assertIsNone(store.get("a"))
+        store.set("a", _entry(b"abc"))
+        self.assertEqual(store.get("a").content, b"abc")
+        store.delete("a")
+        self.assertIsNone(store.get("a"))
+
+    def test_ttl(self):
+        store = self.create_store(ttl=10)
+        store.set("a", _entry(stored_at=self.clock.now))
+        self.clock.now += 11
+        self.assertIsNone(store.get("a"))
+
+    def test_evicts_least_recently_used(self):
+        store = self.create_store(max_entries=2)
+        store.set("a", _entry())
+        self.clock.now += 1
+        store.set("b", _entry())
+        self.clock.now += 1
+        store.get("a")
+        self.clock.now += 1
+        store.set("c", _entry())
+        self.assertIsNotNone(store.get("a"))
+        self.assertIsNone(store.get("b"))
+        self.assertIsNotNone(store.get("c"))
+
+    def test_evicts_by_size(self):
+        store = self.create_store(max_bytes=10)
+        store.set("a", _entry(b"x" * 6))
+        self.clock.now += 1
+        store.set("b", _entry(b"x" * 6))
+        self.assertIsNone(store.get("a"))
+        self.assertIsNotNone(store.get("b"))
+
+
+class PersistentStoreTests(StoreTests):
+    def test_evicts_down_to_ninety_percent(self):
+        store = self.create_store(max_entries=20)
+        for i in range(21):
+            store.set(str(i), _entry())
+            self.clock.now += 1
+        self.assertEqual([i for i in range(21) if store.get(str(i)) is not None], list(range(3, 21)))
+
+    def test_replacing_an_entry_does_not_count_twice(self):
+        store = self.create_store(max_entries=2, max_bytes=10)
+        store.set("a", _entry(b"x" * 4))
+        for _ in range(5):
+            self.clock.now += 1
+            store.set("b", _entry(b"x" * 4))
+        self.assertIsNotNone(store.get("a"))
+        store.delete("b")
+        store.set("c", _entry(b"x" * 4))
+        self.assertIsNotNone(store.get("a"))
+
+
+class TestMemoryCache(StoreTests, TestCase):
+    def create_store(self, **kwargs):
+        return MemoryCache(clock=self.clock, **kwargs)
+
+
+class TestSQLiteCache(PersistentStoreTests, TestCase):
+    def create_store(self, **kwargs):
+        return SQLiteCache(":memory:", clock=self.clock, **kwargs)
+
+
+class TestFileCache(PersistentStoreTests, TestCase):
+    def create_store(self, **kwargs):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return FileCache(os.path.join(directory.name, "cache"), clock=self.clock, **kwargs)
+
+    def test_writes_below_the_limits_do_not_scan(self):
+        store = self.create_store(max_entries=20)
+        with patch("atlassian.cache.os.listdir", wraps=os.listdir) as listdir:
+            for i in range(21):
+                store.set(str(i), _entry())
+                self.clock.now += 1
+        self.assertEqual(listdir.call_count, 1)
+
+
+class TestResponseCache(TestCase):
+    def test_not_modified_is_served_from_store(self):
+        jira = Jira("https://jira.example.com", response_cache=ResponseCache(), metadata_ttl=0)
+        responses = [
+            fake_response(200, {"ETag": '"v1"'}, b'[{"id": "summary"}]'),
+            fake_response(304, {"ETag": '"v1"'}),
+        ]
+        with patch.object(requests.Session, "request", side_effect=responses) as request:
+            first = jira.get_all_fields()
+            second = jira.get_all_fields()
+        self.assertEqual(first, second)
+        self.assertNotIn("If-None-Match", request.call_args_list[0].kwargs["headers"])
+        self.assertEqual(request.call_args_list[1].kwargs["headers"]["If-None-Match"], '"v1"')
+        # The default headers are not modified
+        self.assertNotIn("If-None-Match", Jira.default_headers)
+
+    def test_not_modified_refreshes_the_entry(self):
+        clock = FakeClock()
+        cache = ResponseCache(MemoryCache(ttl=60, clock=clock), clock=clock)
+        jira = Jira("https://jira.example.com", response_cache=cache)
+        responses = [
+            fake_response(200, {"ETag": '"v1"'}, b"[]"),
+            fake_response(304, {"ETag": '"v2"'}),
+            fake_response(304, {"ETag": '"v2"'}),
+        ]
+        with patch.object(requests.Session, "request", side_effect=responses) as request:
+            jira.get_all_fields()
+            clock.now += 50
+            jira.get_all_fields()
+            clock.now += 50
+            self.assertEqual(jira.get_all_fields(), [])
+        self.assertEqual(request.call_args_list[2].kwargs["headers"]["If-None-Match"], '"v2"')
+
+    def test_responses_without_validators_are_not_stored(self):
+        cache = ResponseCache()
+        jira = Jira("https://jira.example.com", response_cache=cache, metadata_ttl=0)
+        with patch.object(requests.Session, "request", return_value=fake_response(content=b"[]")):
+            jira.get_all_fields()
+        self.assertEqual(len(cache.store._entries), 0)
+
+    def test_shared_store_varies_on_the_credentials(self):
+        cache = ResponseCache()
+        alice = Jira("https://jira.example.com", token="alice", response_cache=cache)
+        bob = Jira("https://jira.example.com", token="bob", response_cache=cache)
+        other_alice = Jira("https://jira.example.com", token="alice", response_cache=cache)
+        response = fake_response(200, {"ETag": '"v1"'}, b"[]")
+        with patch.object(requests.Session, "request", return_value=response) as request:
+            alice.get_all_fields()
+            bob.get_all_fields()
+            other_alice.get_all_fields()
+        headers = [call.kwargs["headers"] for call in request.call_args_list]
+        self.assertNotIn("If-None-Match", headers[1])
+        self.assertEqual(headers[2]["If-None-Match"], '"v1"')
+        self.assertEqual(len(cache.store._entries), 2)
@@ -0,0 +1,134 @@
+# coding: utf8
+"""Tests for the page tree walker of Confluence"""
+
+import re
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from atlassian import Confluence
+from atlassian.paging import fetch_ahead
+
+# parent id -> child ids
+TREE = {
+    "1": ["2", "3"],
+    "2": ["4", "5", "6"],
+    "3": ["7"],
+    "4": [],
+    "5": ["8"],
+    "6": [],
+    "7": [],
+    "8": [],
+}
+
+
+class FakeTree(object):
+    """Child and search resources of a page tree, two results per page"""
+
+    def __init__(self):
+        self.requests = []
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def _ancestors(self, page_id):
+        for parent_id, child_ids in TREE.items():
+            if page_id in child_ids:
+                return self._ancestors(parent_id) + [{"id": parent_id}]
+        return []
+
+    def _page(self, results, start, next_url):
+        page = {"results": results[start : start + 2], "_links": {}}
+        if start + 2 < len(results):
+            page["_links"]["next"] = f"{next_url}?start={start + 2}"
+        return page
+
+    def get(self, path, params=None, **kwargs):
+        with self._lock:
+            self.requests.append(path)
+        params = params or {}
+        match = re.match(r"(.*)\?start=(\d+)$", path)
+        if match:
+            path, start = match.group(1), int(match.group(2))
+        else:
+            start = 0
+        match = re.match(r"rest/api/content/(\d+)/child/page$", path)
+        if match:
+            results = [{"id": child_id} for child_id in TREE[match.group(1)]]
+            return self._page(results, start, path)
+        if path == "rest/api/content/search":
+            if params:
+                self.cql = params["cql"]
+                self.expand = params["expand"]
+            root = re.match(r"ancestor = (\d+)", self.cql).group(1)
+            results = [
+                {"id": page_id, "ancestors": self._ancestors(page_id)}
+                for page_id in sorted(TREE)
+                if root in [ancestor["id"] for ancestor in self._ancestors(page_id)]
+            ]
+            return self._page(results, start, path)
+        raise AssertionError(path)
+
+    def delete(self, path, params=None, **kwargs):
+        page_id = path.rsplit("/", 1)[1]
+        with self._lock:
+            remaining = [child_id for child_id in TREE.get(page_id, []) if child_id not in self.deleted]
+            assert not remaining, f"{page_id} removed before {remaining}"
+            self.deleted.append(page_id)
+
+
+class TestWalkPageTree(TestCase):
+    def setUp(self):
+        self.tree = FakeTree()
+        for name in ("get", "delete"):
+            patcher = patch.object(Confluence, name, side_effect=getattr(self.tree, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.confluence = Confluence("https://confluence.example.com", max_workers=3)
+
+    def test_walk_yields_levels_in_order(self):
+        walked = [(page["id"], depth, parent_id) for page, depth, parent_id in self.confluence.walk_page_tree("1")]
+        self.assertEqual(
+            walked,
+            [
+                ("2", 1, "1"),
+                ("3", 1, "1"),
+                ("4", 2, "2"),
+                ("5", 2, "2"),
+                ("6", 2, "2"),
+                ("7", 2, "3"),
+                ("8", 3, "5"),
+            ],
+        )
+        # Page 2 has three children, the third one is on the next page
+        self.assertIn("rest/api/content/2/child/page?start=2", self.tree.requests)
+
+    def test_max_depth(self):
+        walked = [page["id"] for page, _depth, _parent_id in self.confluence.walk_page_tree("1", max_depth=1)]
+        self.assertEqual(walked, ["2", "3"])
+        self.assertEqual(self.tree.requests, ["rest/api/content/1/child/page"])
+
+    def test_cql_walk(self):
+        walked = sorted(
+            (page["id"], depth, parent_id)
+            for page, depth, parent_id in self.confluence.walk_page_tree("2", expand="version", use_cql=True)
+        )
+        self.assertEqual(walked, [("4", 1, "2"), ("5", 1, "2"), ("6", 1, "2"), ("8", 2, "5")])
+        self.assertEqual(self.tree.cql, "ancestor = 2 and type = page")
+        self.assertEqual(self.tree.expand, "ancestors,version")
+        self.assertTrue(all(path.startswith("rest/api/content/search") for path in self.tree.requests))
+
+    def test_subtree_of_content_ids(self):
+        self.assertEqual(self.confluence.get_subtree_of_content_ids("2"), {"2", "4", "5", "6", "8"})
+        self.assertEqual(self.confluence.get_subtree_of_content_ids("2", use_cql=True), {"2", "4", "5", "6", "8"})
+
+    def test_recursive_remove_deletes_deepest_pages_first(self):
+        self.confluence.remove_page("1", recursive=True)
+        self.assertEqual(sorted(self.tree.deleted), sorted(TREE))
+        self.assertEqual(self.tree.deleted[0], "8")
+        self.assertEqual(self.tree.deleted[-1], "1")
+
+    def test_recursive_remove_with_workers(self):
+        with patch("atlassian.confluence.fetch_ahead", wraps=fetch_ahead) as ahead:
+            self.confluence.remove_page("1", recursive=True, workers=1)
+        self.assertEqual(sorted(self.tree.deleted), sorted(TREE))
+        self.assertEqual({call.args[2] for call in ahead.call_args_list}, {1})
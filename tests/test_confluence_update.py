@@ -0,0 +1,165 @@
+# coding: utf8
+"""Tests for the page updates and the publishing manifest of Confluence"""
+
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from requests import HTTPError, Response
+
+from atlassian import Confluence
+from atlassian.confluence_manifest import PageManifest
+
+
+class FakePages(object):
+    """Content resource of one page, with version checks on PUT"""
+
+    def __init__(self):
+        self.page = {"id": "1", "title": "Page", "version": {"number": 5}, "body": {"storage": {"value": "<p>old</p>"}}}
+        self.requests = []
+        # Deleted or not visible to the user any more
+        self.hidden = False
+
+    def get(self, path, params=None, **kwargs):
+        self.requests.append(("GET", params.get("expand")))
+        return None if self.hidden else self.page
+
+    def put(self, path, data=None, params=None, **kwargs):
+        self.requests.append(("PUT", data["version"]["number"]))
+        if data["version"]["number"] != self.page["version"]["number"] + 1:
+            response = Response()
+            response.status_code = 409
+            raise HTTPError("Version mismatch", response=response)
+        self.page = {
+            "id": "1",
+            "title": data["title"],
+            "version": {"number": data["version"]["number"]},
+            "body": {"storage": {"value": data["body"]["storage"]["value"]}},
+        }
+        return self.page
+
+
+class TestUpdatePage(TestCase):
+    def setUp(self):
+        self.pages = FakePages()
+        for name in ("get", "put"):
+            patcher = patch.object(Confluence, name, side_effect=getattr(self.pages, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unchanged_page_costs_one_read(self):
+        confluence = Confluence("https://confluence.example.com")
+        page = confluence.update_page("1", "Page", " <p>old</p>\n")
+        self.assertEqual(page["version"]["number"], 5)
+        self.assertEqual(self.pages.requests, [("GET", "body.storage,version")])
+
+    def test_changed_page_costs_one_read_and_one_write(self):
+        confluence = Confluence("https://confluence.example.com")
+        page = confluence.update_page("1", "Page", "<p>new</p>")
+        self.assertEqual(page["version"]["number"], 6)
+        self.assertEqual(self.pages.requests, [("GET", "body.storage,version"), ("PUT", 6)])
+
+    def test_version_conflict_is_retried_once(self):
+        confluence = Confluence("https://confluence.example.com", page_states={})
+        confluence.update_page("1", "Page", "<p>new</p>")
+        # Edited elsewhere
+        self.pages.page["version"]["number"] = 9
+        self.pages.requests = []
+        page = confluence.update_page("1", "Page", "<p>newer</p>")
+        self.assertEqual(page["version"]["number"], 10)
+        self.assertEqual(self.pages.requests, [("PUT", 7), ("GET", "body.storage,version"), ("PUT", 10)])
+
+    def test_version_conflict_with_failed_read(self):
+        confluence = Confluence("https://confluence.example.com", page_states={})
+        confluence.update_page("1", "Page", "<p>new</p>")
+        self.pages.page["version"]["number"] = 9
+        self.pages.hidden = True
+        self.pages.requests = []
+        self.assertIsNone(confluence.update_page("1", "Page", "<p>newer</p>"))
+        self.assertEqual(self.pages.requests, [("PUT", 7), ("GET", "body.storage,version")])
+
+    def test_page_states_skip_unchanged_pages(self):
+        confluence = Confluence("https://confluence.example.com", page_states={})
+        confluence.update_page("1", "Page", "<p>new</p>")
+        self.pages.requests = []
+        page = confluence.update_page("1", "Page", "<p>new</p>")
+        self.assertEqual(self.pages.requests, [])
+        self.assertEqual(page["version"]["number"], 6)
+        self.assertNotIn("body", page)
+        confluence.update_page("1", "Page", "<p>newer</p>")
+        self.assertEqual(self.pages.requests, [("PUT", 7)])
+
+
+class TestPageManifest(TestCase):
+    def setUp(self):
+        self.pages = FakePages()
+        self.now = 1000.0
+        self.uploads = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "manifest.json")
+        for name, side_effect in (
+            ("get", self._get),
+            ("put", self.pages.put),
+            ("post", self._post),
+            ("get_page_space", lambda parent_id: "DOC"),
+            ("page_exists", lambda space, title: True),
+            ("get_page_id", lambda space, title: "1"),
+        ):
+            patcher = patch.object(Confluence, name, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get(self, path, params=None, **kwargs):
+        if path.endswith("/child/attachment"):
+            self.pages.requests.append(("GET", "attachment"))
+            version = len(self.uploads)
+            return {"size": 1, "results": [{"id": "att1", "version": {"number": version}}]} if version else {"size": 0}
+        return self.pages.get(path, params=params)
+
+    def _post(self, path, data=None, files=None, **kwargs):
+        self.pages.requests.append(("POST", path))
+        self.uploads.append(files["file"][1])
+        return {"id": "att1", "version": {"number": len(self.uploads)}}
+
+    def _confluence(self, ttl=None):
+        manifest = PageManifest(self.path, ttl=ttl, clock=lambda: self.now)
+        return Confluence("https://confluence.example.com", page_states=manifest), manifest
+
+    def test_unchanged_pages_cost_no_request(self):
+        confluence, manifest = self._confluence()
+        confluence.update_or_create("10", "Page", "<p>new &auml;</p>")
+        manifest.save()
+        self.pages.requests = []
+
+        confluence, manifest = self._confluence()
+        self.assertEqual(manifest.find("Page", "10"), "1")
+        page = confluence.update_or_create("10", "Page", "<p>new ä</p>")
+        self.assertEqual(page["version"]["number"], 6)
+        self.assertEqual(self.pages.requests, [])
+        confluence.update_or_create("10", "Page", "<p>newer</p>")
+        self.assertEqual(self.pages.requests, [("PUT", 7)])
+
+    def test_stale_entries_are_checked(self):
+        confluence, manifest = self._confluence(ttl=60)
+        confluence.update_page("1", "Page", "<p>new</p>")
+        self.now += 61
+        self.pages.requests = []
+        confluence.update_page("1", "Page", "<p>new</p>")
+        self.assertEqual(self.pages.requests, [("GET", "body.storage,version")])
+        self.assertNotIn("stale", manifest.get("1"))
+
+    def test_unchanged_attachments_are_skipped(self):
+        confluence, manifest = self._confluence(ttl=60)
+        confluence.attach_content(b"image", "image.png", page_id="1")
+        self.pages.requests = []
+        confluence.attach_content(b"image", "image.png", page_id="1")
+        self.assertEqual(self.pages.requests, [])
+        # A stale entry is trusted again if nobody uploaded another version
+        self.now += 61
+        confluence.attach_content(b"image", "image.png", page_id="1")
+        self.assertEqual(self.pages.requests, [("GET", "attachment")])
+        confluence.attach_content(b"image 2", "image.png", page_id="1")
+        self.assertEqual(self.pages.requests[-1], ("POST", "rest/api/content/1/child/attachment/att1/data"))
+        self.assertEqual(self.uploads, [b"image", b"image 2"])
@@ -0,0 +1,74 @@
+# coding: utf8
+"""Tests for the paged Jira exports"""
+
+import csv
+import io
+from unittest import TestCase
+from unittest.mock import patch
+
+from atlassian import Jira
+
+ISSUES = 25
+
+
+def _csv_page(path, params=None, **kwargs):
+    start, size = params.get("pager/start", 0), params["tempMax"]
+    keys = range(start, min(start + size, ISSUES))
+    # The all fields export repeats Comment as often as the issues of the page need it
+    comments = 2 if start == 10 else 1
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\r\n")
+    writer.writerow(["Summary", "Issue key"] + ["Comment"] * comments)
+    for key in keys:
+        writer.writerow([f"Line 1\nLine {key}", f"FOO-{key}"] + [f"c{key}-{i}" for i in range(comments)])
+    return out.getvalue().encode("utf-8")
+
+
+def _html_page(path, params=None, **kwargs):
+    start, size = params.get("pager/start", 0), params["tempMax"]
+    rows = "".join(f'<tr id="issuerow{key}"><td>FOO-{key}</td></tr>' for key in range(start, min(start + size, ISSUES)))
+    return (
+        f'<html><body><table id="issuetable"><thead><tr><th>Key</th></tr></thead><tbody>{rows}</tbody></table>'
+        f"<p>Generated at page {start}</p></body></html>"
+    ).encode("utf-8")
+
+
+class TestExportIssues(TestCase):
+    def setUp(self):
+        self.jira = Jira("https://jira.example.com")
+
+    def test_csv_pages_are_stitched(self):
+        for workers in (1, 3):
+            dest = io.BytesIO()
+            with patch.object(Jira, "get", side_effect=_csv_page) as get:
+                exported = self.jira.export_issues("project = FOO", dest, page_size=10, workers=workers)
+            self.assertEqual(exported, ISSUES)
+            self.assertEqual(
+                [call.kwargs["params"].get("pager/start", 0) for call in get.call_args_list][:3], [0, 10, 20]
+            )
+            records = list(csv.reader(io.StringIO(dest.getvalue().decode("utf-8"), newline="")))
+            self.assertEqual(records[0], ["Summary", "Issue key", "Comment"])
+            self.assertEqual([record[1] for record in records[1:]], [f"FOO-{key}" for key in range(ISSUES)])
+            self.assertEqual(records[12], ["Line 1\nLine 11", "FOO-11", "c11-0"])
+            self.assertEqual(records[25][0], "Line 1\nLine 24")
+
+    def test_limit(self):
+        dest = io.BytesIO()
+        with patch.object(Jira, "get", side_effect=_csv_page) as get:
+            exported = self.jira.export_issues("project = FOO", dest, page_size=10, limit=15)
+        self.assertEqual(exported, 15)
+        self.assertEqual([call.kwargs["params"]["tempMax"] for call in get.call_args_list], [10, 5])
+
+    def test_html_rows_go_into_first_table(self):
+        dest = io.BytesIO()
+        with patch.object(Jira, "get", side_effect=_html_page):
+            exported = self.jira.export_issues("project = FOO", dest, export_format="html", page_size=10)
+        html = dest.getvalue().decode("utf-8")
+        self.assertEqual(exported, ISSUES)
+        self.assertEqual(html.count("<table"), 1)
+        self.assertEqual(html.count("<tr id="), ISSUES)
+        self.assertTrue(html.endswith("</tbody></table><p>Generated at page 0</p></body></html>"))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.jira.export_issues("project = FOO", io.BytesIO(), export_format="pdf")
@@ -0,0 +1,100 @@
+# coding: utf8
+"""Tests for the Jira metadata registry"""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from atlassian import Jira
+
+from .helpers import FakeClock
+
+FIELDS = [
+    {"id": "summary", "name": "Summary", "custom": False},
+    {"id": "customfield_10002", "name": "Story Points", "custom": True},
+]
+STATUSES = [{"id": "1", "name": "Open"}, {"id": "10001", "name": "In Review"}]
+
+
+def _get(path, *args, **kwargs):
+    if path.endswith("/field"):
+        return FIELDS
+    if path.endswith("/status"):
+        return STATUSES
+    if path.endswith("/components"):
+        return [{"id": "100", "name": "Backend"}]
+    raise AssertionError(f"Unexpected request {path}")
+
+
+class TestJiraMetadataRegistry(TestCase):
+    def setUp(self):
+        self.jira = Jira("https://jira.example.com", metadata_ttl=300)
+        self.jira.metadata.clock = self.clock = FakeClock()
+
+    def test_fields_are_fetched_once(self):
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            for _ in range(10):
+                self.assertEqual(self.jira.get_all_custom_fields(), [FIELDS[1]])
+            self.assertEqual(self.jira.metadata.field_id("story points"), "customfield_10002")
+        self.assertEqual(get.call_count, 1)
+
+    def test_ttl_and_invalidation(self):
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            self.jira.get_all_fields()
+            self.clock.now += 301
+            self.jira.get_all_fields()
+            self.assertEqual(get.call_count, 2)
+            with patch.object(Jira, "post"):
+                self.jira.create_custom_field("Team", "com.atlassian.jira.plugin.system.customfieldtypes:textfield")
+            self.jira.get_all_fields()
+        self.assertEqual(get.call_count, 3)
+
+    def test_field_option_writes_invalidate_the_fields(self):
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            self.jira.get_all_fields()
+            with patch.object(Jira, "post"):
+                self.jira.add_custom_field_option("customfield_10002", "10100", ["1", "2"])
+            self.jira.get_all_fields()
+        self.assertEqual(get.call_count, 2)
+
+    def test_status_id_from_name(self):
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            self.assertEqual(self.jira.get_status_id_from_name("in review"), 10001)
+            self.assertEqual(self.jira.get_status_id_from_name("Open"), 1)
+        self.assertEqual(get.call_count, 1)
+
+    def test_components_are_indexed_per_project(self):
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            self.assertEqual(self.jira.metadata.components("FOO").by_name("backend")["id"], "100")
+            self.assertEqual(self.jira.metadata.components("FOO").get(100)["name"], "Backend")
+            self.jira.get_project_components("BAR")
+            self.jira.metadata.invalidate("components", "FOO")
+            self.jira.get_project_components("FOO")
+            self.jira.get_project_components("BAR")
+        self.assertEqual(get.call_count, 3)
+
+    def test_memoization_is_off_by_default(self):
+        jira = Jira("https://jira.example.com")
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            jira.get_all_fields()
+            jira.get_all_fields()
+        self.assertEqual(get.call_count, 2)
+
+    def test_callers_get_copies(self):
+        with patch.object(Jira, "get", side_effect=_get):
+            self.jira.get_all_fields()[1]["name"] = "Changed"
+            self.jira.metadata.fields().get("customfield_10002")["custom"] = False
+            self.assertEqual(self.jira.get_all_custom_fields(), [FIELDS[1]])
+        self.assertEqual(FIELDS[1]["name"], "Story Points")
+
+    def test_load_during_a_change_is_not_memoized(self):
+        def _slow_get(path, *args, **kwargs):
+            # The field is created while the fields are loaded
+            with patch.object(Jira, "post"):
+                self.jira.create_custom_field("Team", "com.atlassian.jira.plugin.system.customfieldtypes:textfield")
+            return _get(path)
+
+        with patch.object(Jira, "get", side_effect=_slow_get):
+            self.jira.get_all_fields()
+        with patch.object(Jira, "get", side_effect=_get) as get:
+            self.jira.get_all_fields()
+        self.assertEqual(get.call_count, 1)
@@ -0,0 +1,241 @@
+# coding: utf8
+"""Tests for the incremental JQL and worklog syncs"""
+
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from unittest import TestCase
+from unittest.mock import patch
+
+from atlassian import Jira
+from atlassian.jira_sync import JqlSync, JsonFileCheckpointStore, MemoryCheckpointStore, WorklogSync
+
+
+class FakeSearch(object):
+    """Jira search over a list of issues, honouring the updated bound, the order and startAt"""
+
+    def __init__(self):
+        self.issues = []
+        self.queries = []
+        self.returned = 0
+
+    def add(self, issue_id, updated):
+        self.issues = [issue for issue in self.issues if issue["id"] != str(issue_id)]
+        self.issues.append({"id": str(issue_id), "key": f"FOO-{issue_id}", "fields": {"updated": updated}})
+
+    def __call__(self, jql, fields=None, start=0, limit=None, expand=None, **kwargs):
+        self.queries.append(jql)
+        issues = self.issues
+        bound = re.search(r'updated >= "([^"]+)"', jql)
+        if bound:
+            since = datetime.strptime(bound.group(1), "%Y/%m/%d %H:%M").replace(tzinfo=timezone.utc)
+            issues = [issue for issue in issues if self._updated(issue) >= since]
+        issues = sorted(issues, key=lambda issue: (self._updated(issue), issue["key"]))
+        self.returned += len(issues[start : start + limit])
+        return {"issues": issues[start : start + limit], "startAt": start, "total": len(issues)}
+
+    @staticmethod
+    def _updated(issue):
+        return datetime.strptime(issue["fields"]["updated"], "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+class TestJqlSync(TestCase):
+    def setUp(self):
+        self.search = FakeSearch()
+        patcher = patch.object(Jira, "jql", side_effect=self.search)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.jira = Jira("https://jira.example.com")
+
+    def _sync(self, **kwargs):
+        return JqlSync(self.jira, "project = FOO", timezone="UTC", page_size=2, **kwargs)
+
+    def test_only_changes_are_fetched(self):
+        for i in range(5):
+            self.search.add(i, f"2024-01-01T10:0{i}:00.000+0000")
+        sync = self._sync()
+        self.assertEqual([issue["id"] for issue in sync.changes()], ["0", "1", "2", "3", "4"])
+        self.assertEqual(sync.checkpoint["updated"], "2024-01-01T10:04:00.000000+0000")
+        self.assertEqual(sync.checkpoint["ids"], ["4"])
+        self.assertEqual(sync.checkpoint["offset"], 5)
+
+        self.assertEqual(list(sync.changes()), [])
+        self.assertIn('updated >= "2024/01/01 10:04"', self.search.queries[-1])
+
+        self.search.add(1, "2024-01-01T11:00:00.000+0000")
+        self.assertEqual([issue["id"] for issue in sync.changes()], ["1"])
+
+    def test_boundary_minute_deduplication(self):
+        self.search.add(1, "2024-01-01T10:00:10.000+0000")
+        self.search.add(2, "2024-01-01T10:00:20.000+0000")
+        sync = self._sync()
+        self.assertEqual([issue["id"] for issue in sync.changes()], ["1", "2"])
+        # Same minute, later and earlier than the checkpoint
+        self.search.add(3, "2024-01-01T10:00:20.000+0000")
+        self.search.add(4, "2024-01-01T10:00:30.000+0000")
+        self.assertEqual([issue["id"] for issue in sync.changes()], ["3", "4"])
+
+    def test_many_issues_in_the_same_minute(self):
+        for i in range(7):
+            self.search.add(i, "2024-01-01T10:00:00.000+0000")
+        sync = self._sync()
+        self.assertEqual(len(list(sync.changes())), 7)
+        self.search.add(7, "2024-01-01T10:00:00.000+0000")
+        self.assertEqual([issue["id"] for issue in sync.changes()], ["7"])
+
+    def test_failed_issue_is_fetched_again(self):
+        for i in range(3):
+            self.search.add(i, f"2024-01-01T10:0{i}:00.000+0000")
+        sync = self._sync()
+        with self.assertRaises(RuntimeError):
+            for issue in sync.changes():
+                if issue["id"] == "1":
+                    raise RuntimeError("processing failed")
+        self.assertEqual(sync.checkpoint["ids"], ["0"])
+        self.assertEqual([issue["id"] for issue in sync.changes()], ["1", "2"])
+
+    def test_issue_updated_during_the_sync(self):
+        for i in range(6):
+            self.search.add(i, f"2024-01-01T10:0{i}:00.000+0000")
+        sync = self._sync()
+        changed = []
+        for issue in sync.changes():
+            changed.append(issue["id"])
+            if issue["id"] == "1":
+                # Moves to the end of the query, the issues after it shift
+                self.search.add(0, "2024-01-01T11:00:00.000+0000")
+        self.assertEqual(changed, ["0", "1", "2", "3", "4", "5", "0"])
+
+    def test_wide_window_is_not_read_again(self):
+        for i in range(40):
+            self.search.add(i, f"2024-01-01T{10 + i // 10}:{i % 10:02d}:00.000+0000")
+        with patch.object(Jira, "myself", return_value={}):
+            sync = JqlSync(self.jira, "project = FOO", page_size=5)
+            self.assertEqual(len(list(sync.changes())), 40)
+            self.search.add(3, "2024-01-01T14:00:00.000+0000")
+            self.search.add(40, "2024-01-01T14:01:00.000+0000")
+            self.search.returned = 0
+            self.assertEqual([issue["id"] for issue in sync.changes()], ["3", "40"])
+        self.assertIn('updated >= "2023/12/31 11:09"', self.search.queries[-1])
+        # A few single issue probes and the last page, not the 26 hours window
+        self.assertLess(self.search.returned, 15)
+
+    def test_json_file_store(self):
+        self.search.add(1, "2024-01-01T10:00:00.000+0000")
+        with tempfile.TemporaryDirectory() as directory:
+            store = JsonFileCheckpointStore(os.path.join(directory, "sync.json"))
+            self.assertEqual(len(list(self._sync(store=store).changes())), 1)
+            self.assertEqual(list(self._sync(store=store).changes()), [])
+
+    def test_deleted_by_key_diff(self):
+        self.search.add(1, "2024-01-01T10:00:00.000+0000")
+        with patch.object(Jira, "jql_iter", return_value=iter([{"id": "1"}])):
+            self.assertEqual(self._sync().deleted_by_key_diff(["1", "2"]), {"2"})
+
+    def test_deleted_from_audit_log(self):
+        records = {
+            "records": [
+                {
+                    "summary": "Vorgang gelöscht",
+                    "category": "issue management",
+                    "created": "2024-01-01",
+                    "objectItem": {"id": "2", "typeName": "ISSUE"},
+                },
+                {"summary": "User deleted", "category": "user management", "objectItem": {"typeName": "USER"}},
+                {
+                    "summary": "Issue deleted",
+                    "category": "fields",
+                    "objectItem": {"id": "3", "typeName": "CUSTOM_FIELD"},
+                },
+            ],
+            "total": 3,
+        }
+        with patch.object(Jira, "get_audit_records", return_value=records) as get_audit_records:
+            deleted = self._sync().deleted_from_audit_log(from_date="2024-01-01T00:00:00.000+0000")
+        self.assertEqual([issue["id"] for issue in deleted], ["2"])
+        self.assertNotIn("filter", get_audit_records.call_args.kwargs)
+
+    def test_order_by_is_rejected(self):
+        with self.assertRaises(ValueError):
+            JqlSync(self.jira, "project = FOO ORDER BY key")
+
+
+class FakeWorklogFeed(object):
+    """worklog/updated, worklog/deleted and worklog/list over in-memory changes, 3 entries per page"""
+
+    def __init__(self):
+        self.updated = []
+        self.deleted = []
+        self.hidden = set()
+        self.lists = []
+
+    def get(self, path, params=None, absolute=False, **kwargs):
+        if absolute:
+            kind, since, offset = path.split("|")
+            since, offset = int(since), int(offset)
+        else:
+            kind, since, offset = path.rsplit("/", 1)[1], int(params["since"]), 0
+        entries = sorted(
+            (entry for entry in getattr(self, kind) if entry["updatedTime"] > since), key=lambda e: e["updatedTime"]
+        )
+        page = entries[offset : offset + 3]
+        last = offset + 3 >= len(entries)
+        return {"values": page, "lastPage": last, "nextPage": None if last else f"{kind}|{since}|{offset + 3}"}
+
+    def post(self, path, data=None, **kwargs):
+        self.lists.append(data["ids"])
+        deleted = {entry["worklogId"] for entry in self.deleted} | self.hidden
+        return [{"id": str(worklog_id), "timeSpent": "1h"} for worklog_id in data["ids"] if worklog_id not in deleted]
+
+
+class TestWorklogSync(TestCase):
+    def setUp(self):
+        self.jira = Jira("https://jira.example.com", max_workers=2)
+        self.feed = FakeWorklogFeed()
+        self.feed.updated = [{"worklogId": i, "updatedTime": 1000 + i * 10} for i in range(1, 8)]
+        self.feed.deleted = [{"worklogId": 100, "updatedTime": 1025}, {"worklogId": 7, "updatedTime": 1075}]
+        for name in ("get", "post"):
+            patcher = patch.object(Jira, name, side_effect=getattr(self.feed, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _changes(changes):
+        return [(change.kind, change.worklog_id) for change in changes]
+
+    def test_updates_and_deletions_are_merged_in_order(self):
+        sync = WorklogSync(self.jira, batch_size=2)
+        self.assertEqual(
+            self._changes(sync.changes()),
+            [("updated", 1), ("updated", 2), ("deleted", 100)]
+            + [("updated", i) for i in range(3, 7)]
+            + [("deleted", 7)],
+        )
+        # Worklog 7 was deleted before it could be fetched
+        self.assertEqual(self.feed.lists, [[1, 2], [3, 4], [5, 6], [7]])
+        self.assertEqual(sync.checkpoint, {"since": 1075, "ids": ["deleted:7"]})
+
+    def test_worklog_dropped_by_the_hydration_is_reported_deleted(self):
+        # Worklog 3 is deleted after the deleted feed was read, the checkpoint moves past the deletion
+        self.feed.hidden = {3}
+        sync = WorklogSync(self.jira, batch_size=2)
+        changes = self._changes(sync.changes())
+        self.assertIn(("deleted", 3), changes)
+        self.assertNotIn(("updated", 3), changes)
+        self.assertEqual(sync.checkpoint["since"], 1075)
+
+    def test_resume_from_checkpoint(self):
+        store = MemoryCheckpointStore()
+        changes = WorklogSync(self.jira, store=store, save_every=1).changes()
+        self.assertEqual(
+            self._changes(next(changes) for _ in range(3)), [("updated", 1), ("updated", 2), ("deleted", 100)]
+        )
+        # The caller didn't ask for the change after the deletion, so it isn't done with it
+        changes.close()
+        self.assertEqual(store.load("worklogs"), {"since": 1020, "ids": ["updated:2"]})
+        self.feed.updated.append({"worklogId": 8, "updatedTime": 1020})
+        self.assertEqual(
+            self._changes(WorklogSync(self.jira, store=store).changes()),
+            [("updated", 8), ("deleted", 100)] + [("updated", i) for i in range(3, 7)] + [("deleted", 7)],
+        )
@@ -0,0 +1,88 @@
+# coding: utf8
+"""Tests for the JSON codecs"""
+
+import json
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from requests import HTTPError, Response, Session
+
+from atlassian import Confluence, Jira
+from atlassian.json_codec import JsonCodec, OrjsonCodec, default_json_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_response(content):
+    response = Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+class TestJsonCodec(TestCase):
+    def test_stdlib_codec(self):
+        codec = JsonCodec()
+        self.assertEqual(codec.dumps({"a": [1, "ü"]}), json.dumps({"a": [1, "ü"]}))
+        self.assertEqual(codec.decode(_json_response('{"a": "ü"}'.encode("utf-8"))), {"a": "ü"})
+        with self.assertRaises(ValueError):
+            codec.decode(_json_response(b"<html>"))
+
+    def test_decode_from_text(self):
+        response = _json_response('{"a": "ü"}'.encode("utf-8"))
+        response.encoding = "utf-8"
+        with patch.object(JsonCodec, "loads", wraps=JsonCodec().loads) as loads:
+            self.assertEqual(JsonCodec(from_bytes=False).decode(response), {"a": "ü"})
+        self.assertIsInstance(loads.call_args.args[0], str)
+
+    @skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_codec(self):
+        codec = OrjsonCodec()
+        self.assertEqual(json.loads(codec.dumps({1: "a"})), {"1": "a"})
+        self.assertEqual(codec.decode(_json_response(b'{"a": [1, 2.5, null]}')), {"a": [1, 2.5, None]})
+        with self.assertRaises(ValueError):
+            codec.decode(_json_response(b"<html>"))
+        # The default codec decodes with orjson but keeps the json.dumps format of the request bodies
+        default = default_json_codec()
+        self.assertIsInstance(default, OrjsonCodec)
+        self.assertEqual(default.dumps({"a": 1}), '{"a": 1}')
+
+
+class TestClientCodec(TestCase):
+    def test_codec_is_used_for_requests_and_responses(self):
+        codec = JsonCodec()
+        jira = Jira("https://jira.example.com", json_codec=codec)
+        response = _json_response(b'{"key": "FOO-1"}')
+        with (
+            patch.object(Session, "request", return_value=response) as request,
+            patch.object(codec, "dumps", wraps=codec.dumps) as dumps,
+            patch.object(codec, "loads", wraps=codec.loads) as loads,
+        ):
+            self.assertEqual(jira.post("rest/api/2/issue", json={"fields": {}}), {"key": "FOO-1"})
+        dumps.assert_called_once_with({"fields": {}})
+        self.assertEqual(request.call_args.kwargs["data"], '{"fields": {}}')
+        self.assertIsNone(request.call_args.kwargs["json"])
+        self.assertEqual(request.call_args.kwargs["headers"]["Content-Type"], "application/json")
+        self.assertIsInstance(loads.call_args.args[0], bytes)
+
+    def test_empty_body(self):
+        jira = Jira("https://jira.example.com")
+        with patch.object(Session, "request", return_value=_json_response(b"")):
+            self.assertIsNone(jira.get("rest/api/2/issue/FOO-1"))
+
+    def test_product_error_bodies_use_the_codec(self):
+        codec = JsonCodec()
+        confluence = Confluence("https://confluence.example.com", json_codec=codec)
+        response = _json_response(b'{"message": "No space with key"}')
+        response.status_code = 404
+        with (
+            patch.object(Session, "request", return_value=response),
+            patch.object(codec, "loads", wraps=codec.loads) as loads,
+        ):
+            with self.assertRaises(HTTPError) as context:
+                confluence.get("rest/api/space/FOO")
+        self.assertEqual(str(context.exception), "No space with key")
+        loads.assert_called_once()
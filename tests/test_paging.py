@@ -0,0 +1,301 @@
+# coding: utf8
+"""Tests for the paging helpers"""
+
+import itertools
+import re
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from requests import HTTPError, Response
+
+from atlassian import Bitbucket, Confluence, Jira, ServiceDesk
+from atlassian.errors import ApiValueError
+from atlassian.paging import fetch_ahead, prefetch
+
+
+class TestPrefetch(TestCase):
+    def test_prefetch_keeps_order(self):
+        self.assertEqual(list(prefetch(iter(range(10)), buffer_size=3)), list(range(10)))
+
+    def test_prefetch_runs_on_background_thread(self):
+        threads = []
+
+        def _pages():
+            for i in range(3):
+                threads.append(threading.current_thread())
+                yield i
+
+        self.assertEqual(list(prefetch(_pages())), [0, 1, 2])
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_prefetch_reraises_errors(self):
+        def _pages():
+            yield 1
+            raise ValueError("broken page")
+
+        pages = prefetch(_pages())
+        self.assertEqual(next(pages), 1)
+        with self.assertRaises(ValueError):
+            next(pages)
+
+    def test_fetch_ahead_stops_at_last_page(self):
+        fetched = []
+
+        def _fetch(start):
+            fetched.append(start)
+            return {"start": start, "isLastPage": start >= 20}
+
+        pages = list(fetch_ahead(_fetch, itertools.count(0, 10), 4, lambda page: page["isLastPage"]))
+        self.assertEqual([page["start"] for page in pages], [0, 10, 20])
+        self.assertLessEqual(len(fetched), 3 + 4)
+
+
+class TestBitbucketServerPrefetch(TestCase):
+    @staticmethod
+    def _paged_get(path, params=None, **kwargs):
+        start = (params or {}).get("start", 0)
+        values = [{"key": f"PRJ{i}"} for i in range(start, min(start + 2, 7))]
+        response = {"values": values, "start": start, "limit": 2, "isLastPage": start + 2 >= 7}
+        if not response["isLastPage"]:
+            response["nextPageStart"] = start + 2
+        return response
+
+    def test_project_list_with_prefetch(self):
+        bitbucket = Bitbucket("https://bitbucket.example.com", prefetch_pages=3)
+        with patch.object(Bitbucket, "get", side_effect=self._paged_get) as get:
+            projects = [project["key"] for project in bitbucket.project_list()]
+        self.assertEqual(projects, [f"PRJ{i}" for i in range(7)])
+        self.assertGreaterEqual(get.call_count, 4)
+
+    def test_project_list_without_prefetch(self):
+        bitbucket = Bitbucket("https://bitbucket.example.com")
+        with patch.object(Bitbucket, "get", side_effect=self._paged_get) as get:
+            projects = [project["key"] for project in bitbucket.project_list()]
+        self.assertEqual(projects, [f"PRJ{i}" for i in range(7)])
+        self.assertEqual(get.call_count, 4)
+
+
+class TestOffsetFanOut(TestCase):
+    @staticmethod
+    def _search(path, params=None, **kwargs):
+        start = params["startAt"]
+        issues = [{"key": f"FOO-{i}"} for i in range(start, min(start + 3, 10))]
+        return {"issues": issues, "startAt": start, "maxResults": 3, "total": 10}
+
+    def test_jql_get_list_of_tickets_fetches_all_pages(self):
+        jira = Jira("https://jira.example.com", max_workers=3)
+        with patch.object(Jira, "get", side_effect=self._search) as get:
+            issues = jira.jql_get_list_of_tickets("project = FOO")
+        self.assertEqual([issue["key"] for issue in issues], [f"FOO-{i}" for i in range(10)])
+        self.assertEqual(sorted(call.kwargs["params"]["startAt"] for call in get.call_args_list), [0, 3, 6, 9])
+
+    def test_jql_get_list_of_tickets_with_limit_fetches_one_page(self):
+        jira = Jira("https://jira.example.com")
+        with patch.object(Jira, "get", side_effect=self._search) as get:
+            issues = jira.jql_get_list_of_tickets("project = FOO", limit=3)
+        self.assertEqual(len(issues), 3)
+        self.assertEqual(get.call_count, 1)
+
+    def test_service_desk_customers_without_total(self):
+        def _customers(path, params=None, **kwargs):
+            start = params["start"]
+            values = [{"name": f"user{i}"} for i in range(start, min(start + 2, 5))]
+            return {"values": values, "start": start, "limit": 2, "isLastPage": start + 2 >= 5}
+
+        sd = ServiceDesk("https://jira.example.com")
+        with patch.object(ServiceDesk, "get", side_effect=_customers):
+            customers = list(sd.get_all_customers(1, limit=2, workers=2))
+        self.assertEqual([customer["name"] for customer in customers], [f"user{i}" for i in range(5)])
+
+
+class TestJqlIter(TestCase):
+    @staticmethod
+    def _server_search(path, params=None, **kwargs):
+        start = params["startAt"]
+        size = min(params.get("maxResults", 4), 4)
+        issues = [{"key": f"FOO-{i}"} for i in range(start, min(start + size, 10))]
+        return {"issues": issues, "startAt": start, "maxResults": size, "total": 10}
+
+    @staticmethod
+    def _cloud_search(path, params=None, **kwargs):
+        start = int(params.get("nextPageToken", 0))
+        issues = [{"key": f"FOO-{i}"} for i in range(start, min(start + 4, 10))]
+        response = {"issues": issues}
+        if start + 4 < 10:
+            response["nextPageToken"] = str(start + 4)
+        return response
+
+    def test_server_yields_all_issues_lazily(self):
+        jira = Jira("https://jira.example.com")
+        with patch.object(Jira, "get", side_effect=self._server_search) as get:
+            issues = jira.jql_iter("project = FOO")
+            self.assertEqual(next(issues)["key"], "FOO-0")
+            self.assertEqual(get.call_count, 1)
+            self.assertEqual([issue["key"] for issue in issues], [f"FOO-{i}" for i in range(1, 10)])
+        self.assertEqual(get.call_count, 3)
+
+    def test_server_limit_and_page_size(self):
+        jira = Jira("https://jira.example.com")
+        with patch.object(Jira, "get", side_effect=self._server_search) as get:
+            issues = list(jira.jql_iter("project = FOO", start=2, limit=5, page_size=3))
+        self.assertEqual([issue["key"] for issue in issues], [f"FOO-{i}" for i in range(2, 7)])
+        self.assertEqual([call.kwargs["params"]["maxResults"] for call in get.call_args_list], [3, 2])
+
+    def test_cloud_follows_next_page_token(self):
+        jira = Jira("https://jira.example.com", cloud=True)
+        with patch.object(Jira, "get", side_effect=self._cloud_search) as get:
+            issues = list(jira.jql_iter("project = FOO", fields=["summary"]))
+        self.assertEqual([issue["key"] for issue in issues], [f"FOO-{i}" for i in range(10)])
+        self.assertTrue(all(call.args[0].endswith("search/jql") for call in get.call_args_list))
+
+    def test_cloud_rejects_start(self):
+        jira = Jira("https://jira.example.com", cloud=True)
+        with self.assertRaises(ValueError):
+            next(jira.jql_iter("project = FOO", start=10))
+
+
+class TestCqlIter(TestCase):
+    @staticmethod
+    def _search(path, params=None, **kwargs):
+        if params:
+            cursor, size = 0, params.get("limit", 4)
+        else:
+            match = re.search(r"cursor=(\d+)&limit=(\d+)", path)
+            cursor, size = int(match.group(1)), int(match.group(2))
+        results = [{"content": {"id": str(i)}} for i in range(cursor, min(cursor + size, 10))]
+        response = {"results": results, "_links": {}}
+        if cursor + size < 10:
+            response["_links"]["next"] = f"/rest/api/search?next=true&cursor={cursor + size}&limit={size}"
+        return response
+
+    def test_follows_next_links_lazily(self):
+        confluence = Confluence("https://confluence.example.com")
+        with patch.object(Confluence, "get", side_effect=self._search) as get:
+            results = confluence.cql_iter("type = page", limit=3, expand="content.version", prefetch_pages=0)
+            self.assertEqual(next(results)["content"]["id"], "0")
+            self.assertEqual(get.call_count, 1)
+            self.assertEqual([result["content"]["id"] for result in results], [str(i) for i in range(1, 10)])
+        self.assertEqual(get.call_count, 4)
+        self.assertEqual(
+            get.call_args_list[0].kwargs["params"], {"cql": "type = page", "limit": 3, "expand": "content.version"}
+        )
+        self.assertTrue(all("start=" not in call.args[0] for call in get.call_args_list))
+
+    def test_prefetch(self):
+        confluence = Confluence("https://confluence.example.com")
+        with patch.object(Confluence, "get", side_effect=self._search):
+            results = list(confluence.cql_iter("type = page", prefetch_pages=2))
+        self.assertEqual([result["content"]["id"] for result in results], [str(i) for i in range(10)])
+
+    def test_invalid_query(self):
+        response = Response()
+        response.status_code = 400
+        confluence = Confluence("https://confluence.example.com")
+        with patch.object(Confluence, "get", side_effect=HTTPError("Bad request", response=response)):
+            with self.assertRaises(ApiValueError):
+                next(confluence.cql_iter("type = "))
+
+
+class TestBulkIssue(TestCase):
+    @staticmethod
+    def _search(path, params=None, **kwargs):
+        keys = re.search(r"key in \(([^)]*)\)", params["jql"]).group(1).split(", ")
+        issues = [{"key": key} for key in keys if int(key.split("-")[1]) % 10 != 0]
+        start, size = params["startAt"], min(params["maxResults"], 7)
+        return {"issues": issues[start : start + size], "startAt": start, "maxResults": size, "total": len(issues)}
+
+    def test_chunks_are_paged_and_missing_keys_reported(self):
+        jira = Jira("https://jira.example.com", max_workers=3)
+        keys = [f"FOO-{i}" for i in range(1, 51)] + ["not a key", "FOO-1"]
+        with patch.object(Jira, "get", side_effect=self._search) as get:
+            result, missing = jira.bulk_issue(keys, fields="summary", chunk_size=20)
+        self.assertEqual(
+            [issue["key"] for issue in result["issues"]], [f"FOO-{i}" for i in range(1, 51) if i % 10 != 0]
+        )
+        self.assertEqual(missing, ["FOO-10", "FOO-20", "FOO-30", "FOO-40", "FOO-50"])
+        self.assertEqual(len(keys), 52)
+        self.assertTrue(all(len(call.kwargs["params"]["jql"]) < 500 for call in get.call_args_list))
+        self.assertTrue(all(call.kwargs["params"]["validateQuery"] is False for call in get.call_args_list))
+
+    def test_cloud_error_names_missing_keys_exactly(self):
+        def _search(path, params=None, **kwargs):
+            if "FOO-10" in params["jql"]:
+                response = Response()
+                response.status_code = 400
+                raise HTTPError("An issue with key 'FOO-10' does not exist for field 'key'.", response=response)
+            return {"issues": [{"key": "FOO-1"}], "startAt": 0, "maxResults": 2, "total": 1}
+
+        jira = Jira("https://jira.example.com", cloud=True)
+        with patch.object(Jira, "get", side_effect=_search):
+            result, missing = jira.bulk_issue(["FOO-1", "FOO-10"])
+        self.assertEqual([issue["key"] for issue in result["issues"]], ["FOO-1"])
+        self.assertEqual(missing, ["FOO-10"])
+
+    def test_moved_issues_are_not_missing(self):
+        def _get(path, params=None, **kwargs):
+            if path.endswith("issue/OLD-3"):
+                return {"key": "NEW-7"}
+            if path.endswith("issue/OLD-4"):
+                response = Response()
+                response.status_code = 404
+                raise HTTPError("Issue does not exist", response=response)
+            issues = [{"key": "OLD-1"}, {"key": "NEW-7"}]
+            return {"issues": issues, "startAt": 0, "maxResults": 3, "total": 2}
+
+        jira = Jira("https://jira.example.com")
+        with patch.object(Jira, "get", side_effect=_get):
+            result, missing = jira.bulk_issue(["OLD-1", "OLD-3", "OLD-4"])
+        self.assertEqual([issue["key"] for issue in result["issues"]], ["OLD-1", "NEW-7"])
+        self.assertEqual(missing, ["OLD-4"])
+
+
+class TestIssueGraph(TestCase):
+    # FOO-1 <- FOO-2 <- FOO-4, FOO-1 <- FOO-3 (subtask of FOO-1), FOO-4 <- FOO-1 (cycle), FOO-9 not visible
+    LINKS = {"FOO-1": ["FOO-2"], "FOO-2": ["FOO-4", "FOO-9"], "FOO-3": [], "FOO-4": ["FOO-1"]}
+    SUBTASKS = {"FOO-1": ["FOO-3"]}
+
+    def _search(self, path, params=None, **kwargs):
+        self.queries.append(params)
+        keys = re.search(r"key in \(([^)]*)\)", params["jql"]).group(1).split(", ")
+        issues = [
+            {
+                "key": key,
+                "fields": {
+                    "issuelinks": [
+                        {"type": {"name": "Blocks"}, "inwardIssue": {"key": inward}} for inward in self.LINKS[key]
+                    ]
+                    + [{"type": {"name": "Relates"}, "outwardIssue": {"key": "BAR-1"}}],
+                    "subtasks": [{"key": subtask} for subtask in self.SUBTASKS.get(key, [])],
+                },
+            }
+            for key in keys
+            if key in self.LINKS
+        ]
+        return {"issues": issues, "startAt": 0, "maxResults": len(issues), "total": len(issues)}
+
+    def setUp(self):
+        self.jira = Jira("https://jira.example.com")
+        self.queries = []
+
+    def test_graph_is_walked_level_by_level(self):
+        with patch.object(Jira, "get", side_effect=self._search):
+            graph = self.jira.get_issue_graph("FOO-1")
+        self.assertEqual(
+            graph, {"FOO-1": ["FOO-2", "FOO-3"], "FOO-2": ["FOO-4", "FOO-9"], "FOO-3": [], "FOO-4": ["FOO-1"]}
+        )
+        self.assertEqual(list(graph), ["FOO-1", "FOO-2", "FOO-3", "FOO-4"])
+        # One search per level, for the links and subtasks only
+        self.assertEqual(len(self.queries), 3)
+        self.assertTrue(all(query["fields"] == "issuelinks,subtasks" for query in self.queries))
+
+    def test_max_depth_and_directions(self):
+        with patch.object(Jira, "get", side_effect=self._search):
+            graph = self.jira.get_issue_graph(["FOO-1"], directions=("outward",), subtasks=False, max_depth=0)
+        self.assertEqual(graph, {"FOO-1": ["BAR-1"]})
+
+    def test_tree(self):
+        with patch.object(Jira, "get", side_effect=self._search):
+            tree = self.jira.get_issue_tree_recursive("FOO-1")
+        # Depth-first, like the former recursive walk
+        self.assertEqual(tree, [{"FOO-1": "FOO-2"}, {"FOO-2": "FOO-4"}, {"FOO-2": "FOO-9"}, {"FOO-1": "FOO-3"}])
@@ -0,0 +1,78 @@
+# coding: utf8
+"""Tests for the client side rate limiter"""
+
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from atlassian import Jira
+from atlassian.rate_limit import RateLimiter
+
+from .helpers import FakeClock, fake_response
+
+SEARCH = "https://example.atlassian.net/rest/api/2/search?jql=project%3DFOO"
+ISSUE = "https://example.atlassian.net/rest/api/2/issue/FOO-1"
+
+
+class TestRateLimiter(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_keys(self):
+        limiter = RateLimiter()
+        self.assertEqual(limiter.key(SEARCH), ("example.atlassian.net", "rest/api/2/search"))
+        self.assertEqual(limiter.key(ISSUE), ("example.atlassian.net", "rest/api/2"))
+        self.assertEqual(limiter.key("https://host/jira/rest/agile/1.0/board"), ("host", "rest/agile"))
+        self.assertEqual(
+            limiter.key("https://api.bitbucket.org/2.0/repositories/ws/repo"), ("api.bitbucket.org", "2.0/repositories")
+        )
+
+    def test_bucket_paces_requests(self):
+        limiter = RateLimiter(initial_rate=2, burst=1, clock=self.clock)
+        self.assertEqual(limiter.reserve(SEARCH), 0.0)
+        self.assertEqual(limiter.reserve(SEARCH), 0.5)
+        self.assertEqual(limiter.reserve(SEARCH), 1.0)
+        # Other families have their own bucket
+        self.assertEqual(limiter.reserve(ISSUE), 0.0)
+
+    def test_aimd(self):
+        limiter = RateLimiter(initial_rate=4, increase=1, decrease=0.5, clock=self.clock)
+        limiter.observe(SEARCH, fake_response(200))
+        self.assertEqual(limiter.rate(SEARCH), 5)
+        limiter.observe(SEARCH, fake_response(429, {"Retry-After": "1"}))
+        self.assertEqual(limiter.rate(SEARCH), 2.5)
+        limiter.observe(SEARCH, fake_response(200, {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "3"}))
+        self.assertEqual(limiter.rate(SEARCH), 1.25)
+        self.assertEqual(limiter.rate(ISSUE), 4)
+
+    def test_server_fill_rate_caps_rate(self):
+        limiter = RateLimiter(initial_rate=50, clock=self.clock)
+        headers = {"X-RateLimit-FillRate": "10", "X-RateLimit-Interval-Seconds": "2"}
+        limiter.observe(SEARCH, fake_response(200, headers))
+        self.assertEqual(limiter.rate(SEARCH), 5)
+
+    def test_thread_safety(self):
+        limiter = RateLimiter(initial_rate=1, burst=1, clock=self.clock)
+        delays = []
+
+        def _reserve():
+            for _ in range(100):
+                delays.append(limiter.reserve(SEARCH))
+
+        threads = [threading.Thread(target=_reserve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(delays), [float(i) for i in range(400)])
+
+    def test_shared_between_clients(self):
+        limiter = RateLimiter()
+        jira = Jira("https://example.atlassian.net", rate_limiter=limiter)
+        other = Jira("https://example.atlassian.net", rate_limiter=limiter)
+        with patch.object(requests.Session, "request", return_value=fake_response(200)):
+            jira.get("rest/api/2/search")
+            other.get("rest/api/2/search")
+        self.assertEqual(limiter.rate(SEARCH), limiter.initial_rate + 2 * limiter.increase)
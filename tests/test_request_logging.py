@@ -0,0 +1,84 @@
+# coding: utf8
+"""Tests for the request logging formatters"""
+
+import json
+import logging
+from unittest import TestCase
+from unittest.mock import Mock
+
+from requests import Response
+
+from atlassian import Jira
+from atlassian.request_utils import CurlRequestFormatter, JsonLinesRequestFormatter, RedactingRequestFormatter
+from .mockup import mockup_server
+
+
+def _response(content, status_code=200):
+    response = Response()
+    response.status_code = status_code
+    response.reason = "OK"
+    response._content = content
+    return response
+
+
+class TestRequestLogging(TestCase):
+    def test_formatter_not_called_without_debug(self):
+        formatter = Mock()
+        jira = Jira(f"{mockup_server()}/jira", username="username", password="password", request_formatter=formatter)
+        logger = logging.getLogger("atlassian.rest_client")
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            jira.issue("FOO-123")
+        finally:
+            logger.setLevel(level)
+        formatter.format_request.assert_not_called()
+        formatter.format_response.assert_not_called()
+
+    def test_formatter_called_with_debug(self):
+        formatter = Mock()
+        jira = Jira(f"{mockup_server()}/jira", username="username", password="password", request_formatter=formatter)
+        with self.assertLogs("atlassian.rest_client", level=logging.DEBUG):
+            jira.issue("FOO-123")
+        formatter.format_request.assert_called_once()
+        formatter.format_response.assert_called_once()
+
+    def test_curl_formatter(self):
+        message = CurlRequestFormatter().format_request(
+            "POST", "https://jira/rest/api/2/issue", headers={"Accept": "application/json"}, body={"a": 1}
+        )
+        self.assertEqual(
+            message,
+            "curl --silent -X POST -H 'Accept: application/json' --data '{\"a\": 1}' 'https://jira/rest/api/2/issue'",
+        )
+
+    def test_response_body_truncation(self):
+        formatter = JsonLinesRequestFormatter(max_body_length=4)
+        message = json.loads(formatter.format_response("GET", "/rest", _response(b"0123456789")))
+        self.assertEqual(message["body"], "0123... [6 more bytes]")
+        self.assertEqual(message["status_code"], 200)
+
+    def test_redaction(self):
+        formatter = RedactingRequestFormatter(JsonLinesRequestFormatter())
+        message = json.loads(
+            formatter.format_request(
+                "POST",
+                "/rest",
+                headers={"Authorization": "Bearer secret"},
+                body=json.dumps({"user": {"name": "admin", "password": "secret"}}),
+            )
+        )
+        self.assertEqual(message["headers"]["Authorization"], RedactingRequestFormatter.MASK)
+        self.assertEqual(json.loads(message["body"]), {"user": {"name": "admin", "password": "********"}})
+
+    def test_query_parameters_are_redacted(self):
+        formatter = RedactingRequestFormatter(JsonLinesRequestFormatter())
+        url = "https://jira.example.com/rest/api/2/myself?expand=groups&access_token=abc%20def&X-Amz-Signature=f00"
+        message = json.loads(formatter.format_request("GET", url))
+        self.assertEqual(
+            message["url"],
+            "https://jira.example.com/rest/api/2/myself?expand=groups&access_token=********&X-Amz-Signature=********",
+        )
+        message = json.loads(formatter.format_response("GET", url, _response(b"{}")))
+        self.assertNotIn("abc", message["url"])
+        self.assertEqual(formatter._redact_url("https://jira.example.com/rest"), "https://jira.example.com/rest")
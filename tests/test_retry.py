@@ -0,0 +1,89 @@
+# coding: utf8
+"""Tests for the retry scheduler"""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from atlassian import Jira
+from atlassian.retry import BackPressure, RetryScheduler, parse_retry_after
+
+from .helpers import FakeClock, fake_response
+
+
+class TestRetryScheduler(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("5"), 5.0)
+        self.assertEqual(parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_retry_after_is_honoured(self):
+        call = RetryScheduler(clock=self.clock).new_call()
+        self.assertTrue(call.should_retry(fake_response(429, {"Retry-After": "7"})))
+        self.assertEqual(call.delay(), 7.0)
+        self.assertFalse(call.should_retry(fake_response(503)))
+
+    def test_backoff_stops_after_max_retries(self):
+        scheduler = RetryScheduler(backoff_and_retry=True, max_retries=2, backoff_jitter=0.0, clock=self.clock)
+        call = scheduler.new_call()
+        self.assertTrue(call.should_retry(fake_response(503)))
+        self.assertEqual(call.delay(), 1.0)
+        self.assertTrue(call.should_retry(fake_response(503)))
+        self.assertEqual(call.delay(), 2.0)
+        self.assertFalse(call.should_retry(fake_response(503)))
+
+    def test_call_time_budget(self):
+        scheduler = RetryScheduler(max_call_seconds=10, clock=self.clock)
+        call = scheduler.new_call()
+        self.assertTrue(call.should_retry(fake_response(429, {"Retry-After": "6"})))
+        self.assertFalse(call.should_retry(fake_response(429, {"Retry-After": "6"})))
+
+    def test_client_retry_budget_window(self):
+        scheduler = RetryScheduler(max_client_retries=1, budget_window=60, clock=self.clock)
+        self.assertTrue(scheduler.new_call().should_retry(fake_response(429, {"Retry-After": "0"})))
+        self.assertFalse(scheduler.new_call().should_retry(fake_response(429, {"Retry-After": "0"})))
+        self.clock.now += 61
+        self.assertTrue(scheduler.new_call().should_retry(fake_response(429, {"Retry-After": "0"})))
+
+    def test_throttling_holds_back_other_calls(self):
+        scheduler = RetryScheduler(clock=self.clock)
+        throttled = scheduler.new_call()
+        sibling = scheduler.new_call()
+        self.assertEqual(sibling.delay(), 0.0)
+        throttled.should_retry(fake_response(429, {"Retry-After": "30"}))
+        self.assertEqual(sibling.delay(), 30.0)
+        self.assertEqual(scheduler.next_eligible_time(), self.clock.now + 30)
+
+    def test_back_pressure_is_shared_per_session(self):
+        session = requests.Session()
+        jira = Jira("https://jira.example.com", session=session)
+        other = Jira("https://jira.example.com", session=session)
+        self.assertIs(jira.retry_scheduler.back_pressure, other.retry_scheduler.back_pressure)
+        self.assertIsNot(
+            jira.retry_scheduler.back_pressure, Jira("https://jira.example.com").retry_scheduler.back_pressure
+        )
+
+    def test_passed_scheduler_shares_the_session_back_pressure(self):
+        session = requests.Session()
+        jira = Jira("https://jira.example.com", session=session)
+        scheduler = RetryScheduler(max_retries=10)
+        other = Jira("https://jira.example.com", session=session, retry_scheduler=scheduler)
+        self.assertIs(other.retry_scheduler.back_pressure, jira.retry_scheduler.back_pressure)
+        own = BackPressure()
+        scheduler = RetryScheduler(back_pressure=own)
+        Jira("https://jira.example.com", session=session, retry_scheduler=scheduler)
+        self.assertIs(scheduler.back_pressure, own)
+        scheduler = RetryScheduler(clock=self.clock)
+        Jira("https://jira.example.com", session=session, retry_scheduler=scheduler)
+        self.assertIsNot(scheduler.back_pressure, jira.retry_scheduler.back_pressure)
+
+    def test_request_retries_throttledfake_response(self):
+        jira = Jira("https://jira.example.com")
+        responses = [fake_response(429, {"Retry-After": "0"}), fake_response(200)]
+        with patch.object(requests.Session, "request", side_effect=responses) as request:
+            self.assertEqual(jira.get("rest/api/2/myself"), {})
+        self.assertEqual(request.call_count, 2)
@@ -0,0 +1,227 @@
+# coding: utf8
+"""Tests for the streaming downloads"""
+
+import io
+import logging
+import os
+import re
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from requests import HTTPError, Response, Session
+
+from atlassian import Confluence, Jira
+
+
+def _streamed_response(content, status_code=200):
+    response = Response()
+    response.status_code = status_code
+    response.reason = "OK"
+    response.raw = io.BytesIO(content)
+    return response
+
+
+class TestStreaming(TestCase):
+    def test_download_writes_chunks(self):
+        jira = Jira("https://jira.example.com")
+        response = _streamed_response(b"x" * 1000)
+        with (
+            patch.object(Session, "request", return_value=response) as request,
+            patch.object(response, "close", wraps=response.close) as close,
+        ):
+            with io.BytesIO() as buf:
+                size = jira.get_attachment_content(10000, dest_fd=buf, chunk_size=100)
+                self.assertEqual(buf.getvalue(), b"x" * 1000)
+        self.assertEqual(size, 1000)
+        self.assertTrue(request.call_args.kwargs["stream"])
+        close.assert_called_once()
+
+    def test_iter_content_does_not_log_body(self):
+        jira = Jira("https://jira.example.com")
+        with patch.object(Session, "request", return_value=_streamed_response(b"secret payload")):
+            with self.assertLogs("atlassian.rest_client", level=logging.DEBUG) as logs:
+                chunks = list(jira.iter_content("rest/api/2/attachment/content/10000", chunk_size=4))
+        self.assertEqual(b"".join(chunks), b"secret payload")
+        self.assertFalse(any("secret" in line for line in logs.output))
+
+    def test_iter_content_raises_on_error(self):
+        jira = Jira("https://jira.example.com")
+        response = _streamed_response(b'{"errorMessages": ["Attachment does not exist"]}', status_code=404)
+        with patch.object(Session, "request", return_value=response):
+            with self.assertRaises(HTTPError):
+                list(jira.iter_content("rest/api/2/attachment/content/10000"))
+
+
+class TestAttachmentDownloader(TestCase):
+    CONTENT = {"1": b"a" * 300, "2": b"b" * 10, "3": b"c" * 50}
+
+    @staticmethod
+    def _issue(path, params=None, **kwargs):
+        key = path.rsplit("/", 1)[1]
+        attachments = {"FOO-1": [("1", "report.pdf"), ("2", "../notes.txt")], "FOO-2": [("3", "image.png")]}[key]
+        return {
+            "key": key,
+            "fields": {
+                "attachment": [
+                    {
+                        "id": attachment_id,
+                        "filename": filename,
+                        "size": len(TestAttachmentDownloader.CONTENT[attachment_id]),
+                        "content": f"https://jira.example.com/secure/attachment/{attachment_id}/{filename}",
+                    }
+                    for attachment_id, filename in attachments
+                ]
+            },
+        }
+
+    def _request(self, method=None, url=None, **kwargs):
+        attachment_id = re.search(r"/attachment/(\d+)/", url).group(1)
+        self.downloaded.append(attachment_id)
+        return _streamed_response(self.CONTENT[attachment_id])
+
+    def test_downloads_are_streamed_and_restartable(self):
+        jira = Jira("https://jira.example.com", max_workers=2)
+        self.downloaded = []
+        with tempfile.TemporaryDirectory() as directory:
+            with (
+                patch.object(Jira, "get", side_effect=self._issue),
+                patch.object(Session, "request", side_effect=self._request) as request,
+            ):
+                results = jira.download_attachments(issues=["FOO-1", "FOO-2"], path=directory)
+                self.assertTrue(all(call.kwargs["stream"] for call in request.call_args_list))
+                self.assertEqual([result.result for result in results], [300, 10, 50])
+                self.assertEqual(
+                    sorted(os.path.relpath(result.key, directory) for result in results),
+                    [
+                        os.path.join("FOO-1", "1_report.pdf"),
+                        os.path.join("FOO-1", "2_notes.txt"),
+                        os.path.join("FOO-2", "3_image.png"),
+                    ],
+                )
+                with open(os.path.join(directory, "FOO-2", "3_image.png"), "rb") as f:
+                    self.assertEqual(f.read(), self.CONTENT["3"])
+
+                # A truncated file is downloaded again, complete files are skipped
+                with open(os.path.join(directory, "FOO-1", "1_report.pdf"), "wb") as f:
+                    f.write(b"a" * 100)
+                self.downloaded = []
+                results = jira.download_attachments(issues=["FOO-1", "FOO-2"], path=directory)
+            self.assertEqual(self.downloaded, ["1"])
+            self.assertEqual([result.result for result in results], [300, None, None])
+            self.assertFalse(any(name.endswith(".part") for name in os.listdir(os.path.join(directory, "FOO-1"))))
+
+    def test_issues_or_jql_required(self):
+        with self.assertRaises(ValueError):
+            Jira("https://jira.example.com").download_attachments(path="unused")
+
+
+class TestConfluenceAttachmentDownloader(TestCase):
+    CONTENT = {"11": b"a" * 300, "12": b"b" * 10, "13": b"c" * 50}
+    # page id -> attachments (id, title, version time)
+    ATTACHMENTS = {
+        "1": [("11", "report.pdf", "2024-05-01T10:00:00.000Z"), ("12", "../notes.txt", "2024-05-02T10:00:00.000Z")],
+        "2": [("13", "image.png", "2024-05-03T10:00:00.000+02:00")],
+    }
+
+    def _attachment(self, page_id, attachment_id, title, when):
+        return {
+            "id": attachment_id,
+            "title": title,
+            "version": {"when": when},
+            "container": {"id": page_id},
+            "extensions": {"fileSize": len(self.CONTENT[attachment_id])},
+            "_links": {"download": f"/download/attachments/{page_id}/{attachment_id}"},
+        }
+
+    def _get(self, path, params=None, **kwargs):
+        # One attachment per result page, the next ones are behind the next link
+        match = re.match(r"(.*)\?start=(\d+)$", path)
+        path, start = (match.group(1), int(match.group(2))) if match else (path, 0)
+        if path == "rest/api/content/1/child/page":
+            return {"results": [{"id": "2"}], "_links": {}}
+        if path == "rest/api/content/2/child/page":
+            return {"results": [], "_links": {}}
+        if path == "rest/api/content/search":
+            self.cql = params["cql"] if params else self.cql
+            results = [
+                self._attachment(page_id, *attachment)
+                for page_id, attachments in sorted(self.ATTACHMENTS.items())
+                for attachment in attachments
+            ]
+        else:
+            page_id = re.match(r"rest/api/content/(\d+)/child/attachment$", path).group(1)
+            results = [self._attachment(page_id, *attachment) for attachment in self.ATTACHMENTS[page_id]]
+        response = {"results": results[start : start + 1], "_links": {}}
+        if start + 1 < len(results):
+            response["_links"]["next"] = f"{path}?start={start + 1}"
+        return response
+
+    def _request(self, method=None, url=None, **kwargs):
+        attachment_id = url.rsplit("/", 1)[1]
+        self.downloaded.append(attachment_id)
+        return _streamed_response(self.CONTENT[attachment_id])
+
+    def setUp(self):
+        self.downloaded = []
+        for target, name, side_effect in ((Confluence, "get", self._get), (Session, "request", self._request)):
+            patcher = patch.object(target, name, side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.confluence = Confluence("https://confluence.example.com", max_workers=2)
+
+    def test_subtree_downloads_are_streamed_and_restartable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = self.confluence.download_attachments(page_ids=["1"], recursive=True, path=directory)
+            self.assertEqual([result.result for result in results], [300, 10, 50])
+            self.assertEqual(
+                [os.path.relpath(result.key, directory) for result in results],
+                [
+                    os.path.join("1", "11_report.pdf"),
+                    os.path.join("1", "12_notes.txt"),
+                    os.path.join("2", "13_image.png"),
+                ],
+            )
+            image = os.path.join(directory, "2", "13_image.png")
+            with open(image, "rb") as f:
+                self.assertEqual(f.read(), self.CONTENT["13"])
+            self.assertEqual(os.path.getmtime(image), 1714723200)
+
+            # A truncated file and a file of another version are downloaded again, the others are skipped
+            with open(os.path.join(directory, "1", "11_report.pdf"), "wb") as f:
+                f.write(b"a" * 100)
+            os.utime(image, (0, 0))
+            self.downloaded = []
+            results = self.confluence.download_attachments(page_ids=["1"], recursive=True, path=directory)
+            self.assertEqual(sorted(self.downloaded), ["11", "13"])
+            self.assertEqual([result.result for result in results], [300, None, 50])
+            self.assertFalse(any(name.endswith(".part") for name in os.listdir(os.path.join(directory, "1"))))
+
+    def test_overlapping_subtrees_are_downloaded_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = self.confluence.download_attachments(page_ids=["1", "2"], recursive=True, path=directory)
+        self.assertEqual(
+            [os.path.relpath(result.key, directory) for result in results],
+            [os.path.join("1", "11_report.pdf"), os.path.join("1", "12_notes.txt"), os.path.join("2", "13_image.png")],
+        )
+        self.assertEqual([result.status for result in results], ["success"] * 3)
+        self.assertEqual(sorted(self.downloaded), ["11", "12", "13"])
+
+    def test_space_downloads_use_one_search(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = self.confluence.download_attachments(space="DOC", path=directory)
+            self.assertEqual(sorted(os.listdir(directory)), ["1", "2"])
+        self.assertEqual([result.status for result in results], ["success"] * 3)
+        self.assertEqual(self.cql, 'space = "DOC" and type = attachment')
+
+    def test_page_download_reads_all_attachment_pages(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = self.confluence.download_attachments_from_page("1", path=directory)
+            self.assertEqual(result["attachments_downloaded"], 2)
+            self.assertEqual(sorted(os.listdir(directory)), ["notes.txt", "report.pdf"])
+        files = self.confluence.download_attachments_from_page("1", to_memory=True)
+        self.assertEqual(files["report.pdf"].read(), self.CONTENT["11"])
+
+    def test_page_ids_or_space_required(self):
+        with self.assertRaises(ValueError):
+            self.confluence.download_attachments(path="unused")
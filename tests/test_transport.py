@@ -0,0 +1,58 @@
+# coding: utf8
+"""Tests for the shared transport configuration"""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from atlassian import Jira, ServiceDesk
+from atlassian.transport import TransportConfig
+
+
+class TestTransportConfig(TestCase):
+    def test_clients_share_pool_per_host(self):
+        transport = TransportConfig(pool_maxsize=32)
+        jira = Jira("https://example.atlassian.net", username="user", password="token", transport=transport)
+        sd = ServiceDesk("https://example.atlassian.net", username="other", password="secret", transport=transport)
+        other = Jira("https://other.atlassian.net", transport=transport)
+
+        adapter = jira.session.get_adapter("https://example.atlassian.net/rest/api/2/myself")
+        self.assertIs(adapter, sd.session.get_adapter("https://example.atlassian.net/rest/servicedeskapi/info"))
+        self.assertIsNot(adapter, other.session.get_adapter("https://other.atlassian.net/rest/api/2/myself"))
+        self.assertEqual(adapter._pool_maxsize, 32)
+        # Authentication stays per client
+        self.assertNotEqual(jira.session.auth, sd.session.auth)
+
+    def test_close_keeps_shared_pool(self):
+        transport = TransportConfig()
+        jira = Jira("https://example.atlassian.net", transport=transport)
+        other = Jira("https://example.atlassian.net", transport=transport)
+        pool = transport.adapter("https://example.atlassian.net").poolmanager.connection_from_url(
+            "https://example.atlassian.net"
+        )
+        jira.close()
+        self.assertIs(
+            other.session.get_adapter("https://example.atlassian.net/").poolmanager.connection_from_url(
+                "https://example.atlassian.net"
+            ),
+            pool,
+        )
+
+    def test_adapter_with_retries_uses_shared_pool(self):
+        transport = TransportConfig()
+        shared = transport.adapter("https://example.atlassian.net")
+        adapter = transport.adapter("https://example.atlassian.net/jira", max_retries=3)
+        self.assertIsNot(adapter, shared)
+        self.assertIs(adapter.poolmanager, shared.poolmanager)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertEqual(adapter._pool_maxsize, shared._pool_maxsize)
+
+    def test_adapter_with_retries_creates_no_pool(self):
+        transport = TransportConfig()
+        transport.adapter("https://example.atlassian.net")
+        with patch("requests.adapters.PoolManager") as pool_manager:
+            transport.adapter("https://example.atlassian.net", max_retries=3)
+        pool_manager.assert_not_called()
+
+    def test_keep_alive_disabled(self):
+        jira = Jira("https://example.atlassian.net", transport=TransportConfig(keep_alive=False))
+        self.assertEqual(jira.session.headers["Connection"], "close")